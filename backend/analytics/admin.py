@@ -1,4 +1,36 @@
 from django.contrib import admin
 
-# Ya no hay modelos en analytics para registrar
-# Todo se maneja en evaluaciones/admin.py
+from .models import AgregadoCursoEstudiante, AgregadoRecurso, CurvaD2R, PatronEstudiante
+
+# Las sesiones de atención se manejan en evaluaciones/admin.py.
+# Aquí solo están los agregados del panel del docente (de solo lectura en la práctica).
+
+
+class AgregadoRecursoAdmin(admin.ModelAdmin):
+    list_display = ('recurso', 'curso', 'sesiones', 'sesiones_baja', 'evaluaciones', 'evaluaciones_aprobadas', 'actualizado')
+    list_filter = ('curso',)
+    readonly_fields = ('actualizado',)
+
+
+class AgregadoCursoEstudianteAdmin(admin.ModelAdmin):
+    list_display = ('estudiante', 'curso', 'sesiones', 'evaluaciones', 'ultimo_con', 'en_riesgo', 'actualizado')
+    list_filter = ('curso', 'en_riesgo')
+    search_fields = ('estudiante__email',)
+    readonly_fields = ('actualizado',)
+
+
+class PatronEstudianteAdmin(admin.ModelAdmin):
+    list_display = ('estudiante', 'curso', 'patron', 'prioridad', 'con', 'promedio_atencion', 'calculado')
+    list_filter = ('curso', 'patron')
+    search_fields = ('estudiante__email',)
+
+
+class CurvaD2RAdmin(admin.ModelAdmin):
+    list_display = ('test', 'filas', 'pendiente_tr', 'pendiente_ta', 'varianza_tr', 'calculado')
+    readonly_fields = ('calculado',)
+
+
+admin.site.register(AgregadoRecurso, AgregadoRecursoAdmin)
+admin.site.register(AgregadoCursoEstudiante, AgregadoCursoEstudianteAdmin)
+admin.site.register(PatronEstudiante, PatronEstudianteAdmin)
+admin.site.register(CurvaD2R, CurvaD2RAdmin)
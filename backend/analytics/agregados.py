@@ -0,0 +1,279 @@
+# backend/analytics/agregados.py
+"""
+Agregados materializados del panel del docente.
+
+Cada sesión de atención, resultado D2-R o resultado de evaluación nuevo suma sus valores
+a AgregadoRecurso y AgregadoCursoEstudiante con UPDATE ... SET x = x + delta, de modo que
+el panel de un curso se arma leyendo unas pocas filas, sin recorrer las tablas de origen.
+recalcular_curso() reconstruye todo desde cero (datos previos o desincronizados).
+"""
+from collections import defaultdict
+
+from django.contrib.auth import get_user_model
+from django.db import transaction
+from django.db.models import Avg, Count, F, Q, Sum
+from django.utils import timezone
+
+from courses.models import Curso, EvaluacionAdaptativa, Recurso, ResultadoEvaluacion
+from evaluaciones.models import ResultadoD2R, SesionAtencion
+from .models import AgregadoCursoEstudiante, AgregadoRecurso
+
+User = get_user_model()
+
+# Mismos umbrales que el resto del sistema
+UMBRAL_ATENCION_BAJA = 70      # 'sesiones_bajas' en las recomendaciones
+PORCENTAJE_APROBACION = 70     # enviar_respuestas_evaluacion
+TASA_APROBACION_MINIMA = 0.5
+
+# Rangos de CON para la distribución del curso (el D2-R considera alto CON >= 100)
+RANGOS_CON = [(None, 50), (50, 100), (100, 150), (150, 200), (200, None)]
+
+
+def promedio(suma, n):
+    return round(suma / n, 2) if n else None
+
+
+def calcular_riesgo(agregado) -> bool:
+    """En riesgo: atención media baja en los videos o menos de la mitad de evaluaciones aprobadas."""
+    atencion = promedio(agregado.suma_atencion, agregado.sesiones)
+    if atencion is not None and atencion < UMBRAL_ATENCION_BAJA:
+        return True
+    if agregado.evaluaciones and agregado.evaluaciones_aprobadas / agregado.evaluaciones < TASA_APROBACION_MINIMA:
+        return True
+    return False
+
+
+def porcentaje_evaluacion(puntaje, preguntas) -> float:
+    total = len(preguntas or [])
+    return round((puntaje / total) * 100, 2) if total else 0.0
+
+
+def _sumar(modelo, claves, defaults=None, **deltas):
+    modelo.objects.get_or_create(**claves, defaults=defaults or {})
+    modelo.objects.filter(**claves).update(
+        actualizado=timezone.now(),
+        **{campo: F(campo) + valor for campo, valor in deltas.items()}
+    )
+
+
+def _actualizar_riesgo(curso_id, estudiante_id) -> None:
+    with transaction.atomic():
+        agregado = AgregadoCursoEstudiante.objects.select_for_update().get(
+            curso_id=curso_id, estudiante_id=estudiante_id
+        )
+        en_riesgo = calcular_riesgo(agregado)
+        if en_riesgo != agregado.en_riesgo:
+            agregado.en_riesgo = en_riesgo
+            agregado.save(update_fields=['en_riesgo', 'actualizado'])
+
+
+def registrar_sesion(sesion) -> None:
+    curso_id = Recurso.objects.filter(pk=sesion.recurso_id).values_list('modulo__curso_id', flat=True).first()
+    if curso_id is None:
+        return
+    pct = float(sesion.porcentaje_atencion or 0)
+
+    _sumar(AgregadoRecurso, {'recurso_id': sesion.recurso_id}, {'curso_id': curso_id},
+           sesiones=1, suma_atencion=pct, sesiones_baja=int(pct < UMBRAL_ATENCION_BAJA))
+    _sumar(AgregadoCursoEstudiante, {'curso_id': curso_id, 'estudiante_id': sesion.estudiante_id},
+           sesiones=1, suma_atencion=pct)
+    _actualizar_riesgo(curso_id, sesion.estudiante_id)
+
+
+def registrar_resultado_evaluacion(resultado) -> None:
+    """Suma un resultado calificado (para CAT, llamar solo cuando la evaluación terminó)."""
+    datos = (
+        EvaluacionAdaptativa.objects.filter(pk=resultado.evaluacion_id)
+        .values_list('recurso_id', 'recurso__modulo__curso_id', 'preguntas_json')
+        .first()
+    )
+    if datos is None:
+        return
+    recurso_id, curso_id, preguntas = datos
+    porcentaje = porcentaje_evaluacion(resultado.puntaje, preguntas)
+    aprobada = int(porcentaje >= PORCENTAJE_APROBACION)
+
+    _sumar(AgregadoRecurso, {'recurso_id': recurso_id}, {'curso_id': curso_id},
+           evaluaciones=1, evaluaciones_aprobadas=aprobada, suma_porcentaje=porcentaje)
+    _sumar(AgregadoCursoEstudiante, {'curso_id': curso_id, 'estudiante_id': resultado.estudiante_id},
+           evaluaciones=1, evaluaciones_aprobadas=aprobada)
+    _actualizar_riesgo(curso_id, resultado.estudiante_id)
+
+
+def registrar_d2r(resultado) -> None:
+    """El CON más reciente del estudiante vale para todos sus cursos (y el del test, si lo tiene)."""
+    cursos = set(Curso.objects.filter(estudiantes__id=resultado.estudiante_id).values_list('id', flat=True))
+    if resultado.curso_id:
+        cursos.add(resultado.curso_id)
+    for curso_id in cursos:
+        claves = {'curso_id': curso_id, 'estudiante_id': resultado.estudiante_id}
+        AgregadoCursoEstudiante.objects.get_or_create(**claves)
+        AgregadoCursoEstudiante.objects.filter(**claves).update(ultimo_con=resultado.con, actualizado=timezone.now())
+
+
+def recalcular_curso(curso_id) -> None:
+    """Reconstruye los agregados de un curso leyendo las tablas de origen."""
+    sesiones = SesionAtencion.objects.filter(recurso__modulo__curso_id=curso_id)
+    por_recurso = {
+        fila['recurso_id']: fila
+        for fila in sesiones.values('recurso_id').annotate(
+            n=Count('id'),
+            suma=Sum('porcentaje_atencion'),
+            bajas=Count('id', filter=Q(porcentaje_atencion__lt=UMBRAL_ATENCION_BAJA)),
+        )
+    }
+    por_estudiante = {
+        fila['estudiante_id']: fila
+        for fila in sesiones.values('estudiante_id').annotate(n=Count('id'), suma=Sum('porcentaje_atencion'))
+    }
+
+    evals_recurso = defaultdict(lambda: [0, 0, 0.0])
+    evals_estudiante = defaultdict(lambda: [0, 0])
+    resultados = (
+        ResultadoEvaluacion.objects.filter(evaluacion__recurso__modulo__curso_id=curso_id)
+        .terminados()
+        .values_list('evaluacion__recurso_id', 'estudiante_id', 'puntaje', 'evaluacion__preguntas_json')
+    )
+    for recurso_id, estudiante_id, puntaje, preguntas in resultados.iterator(chunk_size=500):
+        porcentaje = porcentaje_evaluacion(puntaje, preguntas)
+        aprobada = int(porcentaje >= PORCENTAJE_APROBACION)
+        r = evals_recurso[recurso_id]
+        r[0] += 1
+        r[1] += aprobada
+        r[2] += porcentaje
+        e = evals_estudiante[estudiante_id]
+        e[0] += 1
+        e[1] += aprobada
+
+    inscritos = set(User.objects.filter(cursos_inscritos__id=curso_id).values_list('id', flat=True))
+    estudiantes = inscritos | set(por_estudiante) | set(evals_estudiante)
+    estudiantes |= set(ResultadoD2R.objects.filter(curso_id=curso_id).values_list('estudiante_id', flat=True))
+
+    ultimo_con = {}
+    for estudiante_id, con in (
+        ResultadoD2R.objects.filter(estudiante_id__in=estudiantes)
+        .order_by('estudiante_id', '-fecha').values_list('estudiante_id', 'con')
+    ):
+        ultimo_con.setdefault(estudiante_id, con)
+
+    agregados_recurso = []
+    for recurso_id in set(por_recurso) | set(evals_recurso):
+        s = por_recurso.get(recurso_id, {})
+        n_eval, aprobadas, suma_pct = evals_recurso.get(recurso_id, (0, 0, 0.0))
+        agregados_recurso.append(AgregadoRecurso(
+            recurso_id=recurso_id, curso_id=curso_id,
+            sesiones=s.get('n', 0), suma_atencion=s.get('suma') or 0.0, sesiones_baja=s.get('bajas', 0),
+            evaluaciones=n_eval, evaluaciones_aprobadas=aprobadas, suma_porcentaje=suma_pct,
+        ))
+
+    agregados_estudiante = []
+    for estudiante_id in estudiantes:
+        s = por_estudiante.get(estudiante_id, {})
+        n_eval, aprobadas = evals_estudiante.get(estudiante_id, (0, 0))
+        agregado = AgregadoCursoEstudiante(
+            curso_id=curso_id, estudiante_id=estudiante_id,
+            sesiones=s.get('n', 0), suma_atencion=s.get('suma') or 0.0,
+            evaluaciones=n_eval, evaluaciones_aprobadas=aprobadas,
+            ultimo_con=ultimo_con.get(estudiante_id),
+        )
+        agregado.en_riesgo = calcular_riesgo(agregado)
+        agregados_estudiante.append(agregado)
+
+    with transaction.atomic():
+        AgregadoRecurso.objects.filter(
+            Q(curso_id=curso_id) | Q(recurso_id__in=[a.recurso_id for a in agregados_recurso])
+        ).delete()
+        AgregadoCursoEstudiante.objects.filter(curso_id=curso_id).delete()
+        AgregadoRecurso.objects.bulk_create(agregados_recurso, batch_size=500)
+        AgregadoCursoEstudiante.objects.bulk_create(agregados_estudiante, batch_size=500)
+
+
+def panel_curso(curso) -> dict:
+    """Resumen del curso para el docente, leído solo de los agregados."""
+    recursos_agregados = {a.recurso_id: a for a in AgregadoRecurso.objects.filter(curso=curso)}
+
+    modulos = []
+    total = defaultdict(float)
+    for modulo in curso.modulos.all().prefetch_related('recursos'):
+        recursos = []
+        m = defaultdict(float)
+        for recurso in modulo.recursos.all():
+            a = recursos_agregados.get(recurso.id)
+            if a is None:
+                a = AgregadoRecurso(recurso_id=recurso.id, curso=curso)
+            recursos.append({
+                'id': recurso.id,
+                'titulo': recurso.titulo,
+                'tipo': recurso.tipo,
+                'sesiones': a.sesiones,
+                'atencion_promedio': promedio(a.suma_atencion, a.sesiones),
+                'sesiones_baja': a.sesiones_baja,
+                'evaluaciones': a.evaluaciones,
+                'tasa_aprobacion': promedio(a.evaluaciones_aprobadas * 100, a.evaluaciones),
+                'porcentaje_promedio': promedio(a.suma_porcentaje, a.evaluaciones),
+            })
+            for campo in ('sesiones', 'suma_atencion', 'sesiones_baja', 'evaluaciones',
+                          'evaluaciones_aprobadas', 'suma_porcentaje'):
+                m[campo] += getattr(a, campo)
+        for campo, valor in m.items():
+            total[campo] += valor
+        modulos.append({
+            'id': modulo.id,
+            'nombre': modulo.nombre,
+            'sesiones': int(m['sesiones']),
+            'atencion_promedio': promedio(m['suma_atencion'], m['sesiones']),
+            'recursos': recursos,
+        })
+
+    estudiantes = AgregadoCursoEstudiante.objects.filter(curso=curso)
+    rangos = {}
+    for desde, hasta in RANGOS_CON:
+        filtro = Q(ultimo_con__isnull=False)
+        if desde is not None:
+            filtro &= Q(ultimo_con__gte=desde)
+        if hasta is not None:
+            filtro &= Q(ultimo_con__lt=hasta)
+        rangos[f"con_{desde}_{hasta}"] = Count('id', filter=filtro)
+    d2r = estudiantes.aggregate(
+        con_promedio=Avg('ultimo_con'),
+        con_estudiantes=Count('ultimo_con'),
+        **rangos,
+    )
+
+    en_riesgo = [
+        {
+            'estudiante_id': a.estudiante_id,
+            'email': a.estudiante.email,
+            'nombre': a.estudiante.get_full_name(),
+            'atencion_promedio': promedio(a.suma_atencion, a.sesiones),
+            'tasa_aprobacion': promedio(a.evaluaciones_aprobadas * 100, a.evaluaciones),
+            'ultimo_con': a.ultimo_con,
+        }
+        for a in estudiantes.filter(en_riesgo=True).select_related('estudiante').order_by('estudiante_id')
+    ]
+
+    return {
+        'curso': {'id': curso.id, 'nombre': curso.nombre},
+        'estudiantes': curso.estudiantes.count(),
+        'atencion': {
+            'sesiones': int(total['sesiones']),
+            'promedio': promedio(total['suma_atencion'], total['sesiones']),
+            'sesiones_baja': int(total['sesiones_baja']),
+        },
+        'evaluaciones': {
+            'total': int(total['evaluaciones']),
+            'aprobadas': int(total['evaluaciones_aprobadas']),
+            'tasa_aprobacion': promedio(total['evaluaciones_aprobadas'] * 100, total['evaluaciones']),
+            'porcentaje_promedio': promedio(total['suma_porcentaje'], total['evaluaciones']),
+        },
+        'd2r_con': {
+            'estudiantes': d2r['con_estudiantes'],
+            'promedio': round(d2r['con_promedio'], 2) if d2r['con_promedio'] is not None else None,
+            'distribucion': [
+                {'desde': desde, 'hasta': hasta, 'estudiantes': d2r[f"con_{desde}_{hasta}"]}
+                for desde, hasta in RANGOS_CON
+            ],
+        },
+        'modulos': modulos,
+        'en_riesgo': en_riesgo,
+    }
@@ -0,0 +1,140 @@
+# backend/analytics/curvas.py
+"""
+Curvas de rendimiento dentro del test D2-R: fatiga y consistencia a lo largo de las filas.
+
+Para cada test se guarda (CurvaD2R) el TR/TA de cada fila, la pendiente de la recta de
+mínimos cuadrados (negativa = el estudiante rinde menos a medida que avanza) y la varianza
+del TR y de sus diferencias fila a fila. Las curvas que faltan se calculan juntas: una
+consulta trae las filas de todos los tests pendientes, numpy resuelve todas las pendientes
+a la vez y se insertan con un bulk_create. Las filas de un test no cambian, así que una
+curva guardada no se invalida nunca.
+"""
+import numpy as np
+
+from evaluaciones.d2r import COLUMNAS_FILA, NUM_FILAS, matriz_desde_tuplas
+from evaluaciones.models import DetalleFilaD2R
+from .models import CurvaD2R
+
+# Pendiente de TR (estímulos por fila) a partir de la cual se considera que hay fatiga
+UMBRAL_FATIGA = -0.5
+
+LOTE = 2000
+
+
+def _media(valores, n):
+    """Media por test ignorando NaN; NaN donde no hay valores."""
+    with np.errstate(invalid='ignore', divide='ignore'):
+        return np.where(n > 0, np.nansum(valores, axis=-1) / n, np.nan)
+
+
+def calcular_curvas(matriz):
+    """
+    Pendientes y varianzas de cada test de una matriz (tests x NUM_FILAS x 4) de
+    evaluaciones.d2r. Devuelve un dict de arrays alineados con los tests (NaN = no aplica).
+    """
+    tr = matriz[..., 0]
+    ta = matriz[..., 1]
+    presente = ~np.isnan(tr)
+    n = presente.sum(axis=1)
+
+    x = np.where(presente, np.arange(1, NUM_FILAS + 1), np.nan)
+    x_centrada = x - _media(x, n)[:, None]
+    sxx = np.nansum(x_centrada ** 2, axis=1)
+
+    def pendiente(y):
+        covarianza = np.nansum(x_centrada * (y - _media(y, n)[:, None]), axis=1)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            return np.where(n >= 2, covarianza / sxx, np.nan)
+
+    diferencias = np.diff(tr, axis=1)
+    n_diferencias = (~np.isnan(diferencias)).sum(axis=1)
+
+    return {
+        'filas': n,
+        'pendiente_tr': pendiente(tr),
+        'pendiente_ta': pendiente(ta),
+        'varianza_tr': _media((tr - _media(tr, n)[:, None]) ** 2, n),
+        'varianza_diferencias': _media(
+            (diferencias - _media(diferencias, n_diferencias)[:, None]) ** 2, n_diferencias
+        ),
+    }
+
+
+def _opcional(valor):
+    return None if np.isnan(valor) else round(float(valor), 4)
+
+
+def guardar_curvas(test_ids):
+    """Calcula y guarda las curvas de los tests indicados que aún no la tienen. Devuelve cuántas creó."""
+    ya_calculadas = set(CurvaD2R.objects.filter(test_id__in=test_ids).values_list('test_id', flat=True))
+    pendientes = [t for t in test_ids if t not in ya_calculadas]
+    if not pendientes:
+        return 0
+
+    tuplas = list(DetalleFilaD2R.objects.filter(test_id__in=pendientes).values_list(
+        'test_id', 'numero_fila', *COLUMNAS_FILA
+    ))
+    if not tuplas:
+        return 0
+    ids, matriz = matriz_desde_tuplas(tuplas)
+    indices = calcular_curvas(matriz)
+
+    curvas = []
+    for i, test_id in enumerate(ids.tolist()):
+        n = int(indices['filas'][i])
+        curvas.append(CurvaD2R(
+            test_id=test_id,
+            filas=n,
+            tr=matriz[i, :n, 0].astype(int).tolist(),
+            ta=matriz[i, :n, 1].astype(int).tolist(),
+            pendiente_tr=_opcional(indices['pendiente_tr'][i]),
+            pendiente_ta=_opcional(indices['pendiente_ta'][i]),
+            varianza_tr=round(float(indices['varianza_tr'][i]), 4),
+            varianza_diferencias=_opcional(indices['varianza_diferencias'][i]),
+        ))
+    # Dos peticiones simultáneas pueden calcular la misma curva: gana la primera
+    CurvaD2R.objects.bulk_create(curvas, batch_size=500, ignore_conflicts=True)
+    return len(curvas)
+
+
+def obtener_curvas(test_ids):
+    """{test_id: CurvaD2R} de los tests indicados, calculando las que falten."""
+    test_ids = list(test_ids)
+    curvas = {c.test_id: c for c in CurvaD2R.objects.filter(test_id__in=test_ids)}
+    faltantes = [t for t in test_ids if t not in curvas]
+    if faltantes:
+        for inicio in range(0, len(faltantes), LOTE):
+            guardar_curvas(faltantes[inicio:inicio + LOTE])
+        curvas.update({c.test_id: c for c in CurvaD2R.objects.filter(test_id__in=faltantes)})
+    return curvas
+
+
+def resumen_cohorte(curvas):
+    """Curva media por fila, pendiente media y cuántos tests muestran fatiga."""
+    if not curvas:
+        return {'tests': 0, 'tr_medio': [], 'ta_medio': [], 'pendiente_tr_media': None,
+                'varianza_diferencias_media': None, 'tests_con_fatiga': 0}
+
+    tr = np.full((len(curvas), NUM_FILAS), np.nan)
+    ta = np.full((len(curvas), NUM_FILAS), np.nan)
+    for i, curva in enumerate(curvas):
+        tr[i, :curva.filas] = curva.tr
+        ta[i, :curva.filas] = curva.ta
+    por_fila = (~np.isnan(tr)).sum(axis=0)
+    ultima = int(np.flatnonzero(por_fila)[-1]) + 1 if por_fila.any() else 0
+
+    pendientes = np.array([c.pendiente_tr for c in curvas], dtype=np.float64)
+    diferencias = np.array([c.varianza_diferencias for c in curvas], dtype=np.float64)
+
+    def media(valores):
+        valores = valores[~np.isnan(valores)]
+        return round(float(valores.mean()), 4) if valores.size else None
+
+    return {
+        'tests': len(curvas),
+        'tr_medio': np.round(_media(tr.T, por_fila), 2)[:ultima].tolist(),
+        'ta_medio': np.round(_media(ta.T, por_fila), 2)[:ultima].tolist(),
+        'pendiente_tr_media': media(pendientes),
+        'varianza_diferencias_media': media(diferencias),
+        'tests_con_fatiga': int((pendientes <= UMBRAL_FATIGA).sum()),
+    }
@@ -0,0 +1,25 @@
+from django.core.management.base import BaseCommand
+
+from analytics.curvas import LOTE, guardar_curvas
+from evaluaciones.models import ResultadoD2R
+
+
+class Command(BaseCommand):
+    help = (
+        "Calcula las curvas por fila (fatiga y consistencia) de los tests D2-R que aún no la tienen. "
+        "El endpoint las calcula bajo demanda; esto adelanta el trabajo, por ejemplo con cron."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--curso", type=int, default=None, help="Limitar el cálculo a un curso")
+
+    def handle(self, *args, **options):
+        pendientes = ResultadoD2R.objects.filter(curva__isnull=True)
+        if options["curso"] is not None:
+            pendientes = pendientes.filter(curso_id=options["curso"])
+        ids = list(pendientes.order_by("id").values_list("id", flat=True))
+
+        total = 0
+        for inicio in range(0, len(ids), LOTE):
+            total += guardar_curvas(ids[inicio:inicio + LOTE])
+        self.stdout.write(self.style.SUCCESS(f"Curvas calculadas para {total} tests"))
@@ -0,0 +1,17 @@
+from django.core.management.base import BaseCommand
+
+from analytics.patrones import calcular_patrones
+
+
+class Command(BaseCommand):
+    help = (
+        "Calcula el patrón D2-R/atención (PATRON_A–D) de cada estudiante de los cursos activos. "
+        "Pensado para ejecutarse periódicamente (por ejemplo con cron cada noche)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--curso", type=int, default=None, help="Limitar el cálculo a un curso")
+
+    def handle(self, *args, **options):
+        total = calcular_patrones(curso_id=options["curso"])
+        self.stdout.write(self.style.SUCCESS(f"Patrones calculados para {total} inscripciones"))
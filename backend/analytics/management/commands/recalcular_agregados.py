@@ -0,0 +1,21 @@
+from django.core.management.base import BaseCommand
+
+from analytics.agregados import recalcular_curso
+from courses.models import Curso
+
+
+class Command(BaseCommand):
+    help = "Reconstruye los agregados del panel del docente (atención, D2-R y evaluaciones por curso y recurso)"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--curso", type=int, default=None, help="Limitar la reconstrucción a un curso")
+
+    def handle(self, *args, **options):
+        cursos = Curso.objects.all()
+        if options["curso"] is not None:
+            cursos = cursos.filter(pk=options["curso"])
+        total = 0
+        for curso_id in cursos.values_list("id", flat=True).iterator():
+            recalcular_curso(curso_id)
+            total += 1
+        self.stdout.write(self.style.SUCCESS(f"Agregados reconstruidos para {total} cursos"))
@@ -0,0 +1,57 @@
+# Generated by Django 5.2.8 on 2026-10-19 11:35
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('analytics', '0002_delete_atencionsesion'),
+        ('courses', '0009_versioncatalogo'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AgregadoRecurso',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('sesiones', models.PositiveIntegerField(default=0)),
+                ('suma_atencion', models.FloatField(default=0.0)),
+                ('sesiones_baja', models.PositiveIntegerField(default=0)),
+                ('evaluaciones', models.PositiveIntegerField(default=0)),
+                ('evaluaciones_aprobadas', models.PositiveIntegerField(default=0)),
+                ('suma_porcentaje', models.FloatField(default=0.0)),
+                ('actualizado', models.DateTimeField(auto_now=True)),
+                ('curso', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='agregados_recursos', to='courses.curso')),
+                ('recurso', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='agregado', to='courses.recurso')),
+            ],
+            options={
+                'verbose_name': 'Agregado por Recurso',
+                'verbose_name_plural': 'Agregados por Recurso',
+            },
+        ),
+        migrations.CreateModel(
+            name='AgregadoCursoEstudiante',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('sesiones', models.PositiveIntegerField(default=0)),
+                ('suma_atencion', models.FloatField(default=0.0)),
+                ('evaluaciones', models.PositiveIntegerField(default=0)),
+                ('evaluaciones_aprobadas', models.PositiveIntegerField(default=0)),
+                ('ultimo_con', models.FloatField(blank=True, null=True)),
+                ('en_riesgo', models.BooleanField(default=False)),
+                ('actualizado', models.DateTimeField(auto_now=True)),
+                ('curso', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='agregados_estudiantes', to='courses.curso')),
+                ('estudiante', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='agregados_cursos', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name': 'Agregado por Curso y Estudiante',
+                'verbose_name_plural': 'Agregados por Curso y Estudiante',
+                'indexes': [models.Index(fields=['curso', 'en_riesgo'], name='agregado_curso_riesgo_idx')],
+                'constraints': [models.UniqueConstraint(fields=('curso', 'estudiante'), name='agregado_curso_estudiante_unico')],
+            },
+        ),
+    ]
@@ -0,0 +1,37 @@
+# Generated by Django 5.2.8 on 2026-10-19 11:37
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('analytics', '0003_agregados_panel'),
+        ('courses', '0009_versioncatalogo'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PatronEstudiante',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('patron', models.CharField(choices=[('PATRON_A', 'A - Dificultades de concentración base'), ('PATRON_B', 'B - Buena capacidad, baja atención en videos'), ('PATRON_C', 'C - Comprometido, concentración limitada'), ('PATRON_D', 'D - Óptimo'), ('SIN_D2R', 'Sin test D2R'), ('SIN_SESIONES', 'Sin sesiones de video')], max_length=20)),
+                ('prioridad', models.CharField(max_length=10)),
+                ('con', models.FloatField(blank=True, null=True)),
+                ('promedio_atencion', models.FloatField(blank=True, null=True)),
+                ('sesiones', models.PositiveIntegerField(default=0)),
+                ('calculado', models.DateTimeField()),
+                ('curso', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='patrones_estudiantes', to='courses.curso')),
+                ('estudiante', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='patrones', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name': 'Patrón de Estudiante',
+                'verbose_name_plural': 'Patrones de Estudiantes',
+                'indexes': [models.Index(fields=['curso', 'patron'], name='patron_curso_patron_idx')],
+                'constraints': [models.UniqueConstraint(fields=('curso', 'estudiante'), name='patron_curso_estudiante_unico')],
+            },
+        ),
+    ]
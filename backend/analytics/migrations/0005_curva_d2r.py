@@ -0,0 +1,34 @@
+# Generated by Django 5.2.8 on 2026-10-19 11:49
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('analytics', '0004_patron_estudiante'),
+        ('evaluaciones', '0005_d2r_baremo'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CurvaD2R',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('filas', models.PositiveSmallIntegerField()),
+                ('tr', models.JSONField(default=list)),
+                ('ta', models.JSONField(default=list)),
+                ('pendiente_tr', models.FloatField(blank=True, null=True)),
+                ('pendiente_ta', models.FloatField(blank=True, null=True)),
+                ('varianza_tr', models.FloatField(default=0.0)),
+                ('varianza_diferencias', models.FloatField(blank=True, null=True)),
+                ('calculado', models.DateTimeField(auto_now_add=True)),
+                ('test', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='curva', to='evaluaciones.resultadod2r')),
+            ],
+            options={
+                'verbose_name': 'Curva D2-R',
+                'verbose_name_plural': 'Curvas D2-R',
+            },
+        ),
+    ]
@@ -7,3 +7,129 @@ from django.contrib.auth import get_user_model
 User = get_user_model()
 
 
+
+# --- AGREGADOS MATERIALIZADOS PARA EL PANEL DEL DOCENTE ---
+# Se actualizan de forma incremental con señales (ver agregados.py y signals.py)
+# y se reconstruyen con: python manage.py recalcular_agregados
+
+
+class AgregadoRecurso(models.Model):
+    """Totales de atención y evaluaciones de un recurso (todas las sesiones y resultados)."""
+    recurso = models.OneToOneField('courses.Recurso', on_delete=models.CASCADE, related_name='agregado')
+    curso = models.ForeignKey('courses.Curso', on_delete=models.CASCADE, related_name='agregados_recursos')
+
+    sesiones = models.PositiveIntegerField(default=0)
+    suma_atencion = models.FloatField(default=0.0)
+    sesiones_baja = models.PositiveIntegerField(default=0)
+
+    evaluaciones = models.PositiveIntegerField(default=0)
+    evaluaciones_aprobadas = models.PositiveIntegerField(default=0)
+    suma_porcentaje = models.FloatField(default=0.0)
+
+    actualizado = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name = 'Agregado por Recurso'
+        verbose_name_plural = 'Agregados por Recurso'
+
+    def __str__(self):
+        return f"Agregado recurso {self.recurso_id}"
+
+
+class AgregadoCursoEstudiante(models.Model):
+    """Totales de un estudiante dentro de un curso; base de la distribución D2R y del riesgo."""
+    curso = models.ForeignKey('courses.Curso', on_delete=models.CASCADE, related_name='agregados_estudiantes')
+    estudiante = models.ForeignKey(User, on_delete=models.CASCADE, related_name='agregados_cursos')
+
+    sesiones = models.PositiveIntegerField(default=0)
+    suma_atencion = models.FloatField(default=0.0)
+
+    evaluaciones = models.PositiveIntegerField(default=0)
+    evaluaciones_aprobadas = models.PositiveIntegerField(default=0)
+
+    # CON del último test D2R del estudiante
+    ultimo_con = models.FloatField(null=True, blank=True)
+
+    en_riesgo = models.BooleanField(default=False)
+    actualizado = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name = 'Agregado por Curso y Estudiante'
+        verbose_name_plural = 'Agregados por Curso y Estudiante'
+        constraints = [
+            models.UniqueConstraint(fields=['curso', 'estudiante'], name='agregado_curso_estudiante_unico'),
+        ]
+        indexes = [
+            models.Index(fields=['curso', 'en_riesgo'], name='agregado_curso_riesgo_idx'),
+        ]
+
+    def __str__(self):
+        return f"Agregado curso {self.curso_id} - estudiante {self.estudiante_id}"
+
+
+class PatronEstudiante(models.Model):
+    """
+    Foto del patrón D2-R/atención (PATRON_A–D) de cada estudiante en cada curso activo.
+    La calcula por lotes: python manage.py calcular_patrones (ver patrones.py).
+    """
+    PATRON_CHOICES = [
+        ('PATRON_A', 'A - Dificultades de concentración base'),
+        ('PATRON_B', 'B - Buena capacidad, baja atención en videos'),
+        ('PATRON_C', 'C - Comprometido, concentración limitada'),
+        ('PATRON_D', 'D - Óptimo'),
+        ('SIN_D2R', 'Sin test D2R'),
+        ('SIN_SESIONES', 'Sin sesiones de video'),
+    ]
+
+    curso = models.ForeignKey('courses.Curso', on_delete=models.CASCADE, related_name='patrones_estudiantes')
+    estudiante = models.ForeignKey(User, on_delete=models.CASCADE, related_name='patrones')
+
+    patron = models.CharField(max_length=20, choices=PATRON_CHOICES)
+    prioridad = models.CharField(max_length=10)
+    con = models.FloatField(null=True, blank=True)
+    promedio_atencion = models.FloatField(null=True, blank=True)
+    sesiones = models.PositiveIntegerField(default=0)
+
+    calculado = models.DateTimeField()
+
+    class Meta:
+        verbose_name = 'Patrón de Estudiante'
+        verbose_name_plural = 'Patrones de Estudiantes'
+        constraints = [
+            models.UniqueConstraint(fields=['curso', 'estudiante'], name='patron_curso_estudiante_unico'),
+        ]
+        indexes = [
+            models.Index(fields=['curso', 'patron'], name='patron_curso_patron_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.estudiante} - {self.patron} (curso {self.curso_id})"
+
+
+class CurvaD2R(models.Model):
+    """
+    Curva de rendimiento dentro de un test D2-R (TR/TA por fila, pendiente y variabilidad).
+    Las filas de un test no cambian después del envío, así que la curva se calcula una vez
+    y queda guardada como caché por test (ver curvas.py).
+    """
+    test = models.OneToOneField('evaluaciones.ResultadoD2R', on_delete=models.CASCADE, related_name='curva')
+
+    filas = models.PositiveSmallIntegerField()
+    tr = models.JSONField(default=list)
+    ta = models.JSONField(default=list)
+
+    # Pendiente de la recta de mínimos cuadrados (estímulos por fila); negativa = fatiga
+    pendiente_tr = models.FloatField(null=True, blank=True)
+    pendiente_ta = models.FloatField(null=True, blank=True)
+    # Varianza del TR por fila y de las diferencias entre filas consecutivas
+    varianza_tr = models.FloatField(default=0.0)
+    varianza_diferencias = models.FloatField(null=True, blank=True)
+
+    calculado = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        verbose_name = 'Curva D2-R'
+        verbose_name_plural = 'Curvas D2-R'
+
+    def __str__(self):
+        return f"Curva test {self.test_id}"
@@ -0,0 +1,137 @@
+# backend/analytics/patrones.py
+"""
+Cálculo por lotes de los patrones D2-R/atención (PATRON_A–D) de todos los estudiantes
+de los cursos activos.
+
+Aplica las mismas reglas que courses.views.detectar_patron_estudiante, pero en una sola
+pasada vectorizada: dos consultas traen el último CON de cada estudiante y sus últimas
+SESIONES_RECIENTES sesiones, numpy clasifica a todos a la vez y el resultado se guarda
+en PatronEstudiante para consultarlo por (curso, patron) con un índice.
+"""
+import numpy as np
+from django.contrib.auth import get_user_model
+from django.db import transaction
+from django.db.models import F, Window
+from django.db.models.functions import RowNumber
+from django.utils import timezone
+
+from courses.models import Curso
+from courses.views import ATENCION_ALTA, CON_ALTO, PERCENTIL_CON_ALTO, SESIONES_RECIENTES
+from evaluaciones.models import ResultadoD2R, SesionAtencion
+from .models import PatronEstudiante
+
+User = get_user_model()
+
+PRIORIDAD_PATRON = {
+    'SIN_D2R': 'alta',
+    'SIN_SESIONES': 'media',
+    'PATRON_A': 'alta',
+    'PATRON_B': 'media',
+    'PATRON_C': 'media',
+    'PATRON_D': 'baja',
+}
+
+
+def _ultimos_por_estudiante(queryset, orden, limite):
+    """Filas con número de fila <= limite dentro de cada estudiante (función ventana)."""
+    return queryset.annotate(
+        n_fila=Window(RowNumber(), partition_by=[F('estudiante_id')], order_by=orden)
+    ).filter(n_fila__lte=limite)
+
+
+def clasificar(tiene_d2r, con, n_sesiones, promedio, percentil_con=None):
+    """
+    Versión vectorizada de detectar_patron_estudiante: arrays alineados por estudiante.
+    percentil_con lleva NaN donde el resultado no tiene percentil (se usa el CON bruto).
+    """
+    if percentil_con is None:
+        percentil_con = np.full(np.shape(con), np.nan)
+    d2r_alto = np.where(np.isnan(percentil_con), con >= CON_ALTO, percentil_con >= PERCENTIL_CON_ALTO)
+    atencion_alta = promedio >= ATENCION_ALTA
+    return np.select(
+        [
+            ~tiene_d2r,
+            n_sesiones == 0,
+            ~d2r_alto & ~atencion_alta,
+            d2r_alto & ~atencion_alta,
+            ~d2r_alto & atencion_alta,
+        ],
+        ['SIN_D2R', 'SIN_SESIONES', 'PATRON_A', 'PATRON_B', 'PATRON_C'],
+        default='PATRON_D',
+    )
+
+
+def calcular_patrones(curso_id=None) -> int:
+    """Recalcula la foto de patrones de los cursos activos (o de uno). Devuelve las filas guardadas."""
+    cursos = Curso.objects.filter(activo=True)
+    if curso_id is not None:
+        cursos = cursos.filter(pk=curso_id)
+
+    inscripciones = list(cursos.filter(estudiantes__isnull=False).values_list('id', 'estudiantes'))
+    ahora = timezone.now()
+    objetos = _clasificar_inscripciones(inscripciones, cursos, ahora) if inscripciones else []
+
+    with transaction.atomic():
+        PatronEstudiante.objects.bulk_create(
+            objetos,
+            batch_size=1000,
+            update_conflicts=True,
+            unique_fields=['curso', 'estudiante'],
+            update_fields=['patron', 'prioridad', 'con', 'promedio_atencion', 'sesiones', 'calculado'],
+        )
+        # Bajas de inscripción o cursos desactivados desde la última ejecución
+        obsoletos = PatronEstudiante.objects.filter(calculado__lt=ahora)
+        if curso_id is not None:
+            obsoletos = obsoletos.filter(curso_id=curso_id)
+        obsoletos.delete()
+
+    return len(objetos)
+
+
+def _clasificar_inscripciones(inscripciones, cursos, ahora):
+    pares = np.array(inscripciones, dtype=np.int64)
+    ids, indice = np.unique(pares[:, 1], return_inverse=True)
+    alumnos = User.objects.filter(cursos_inscritos__in=cursos)
+
+    # Último CON (y su percentil) de cada estudiante
+    tiene_d2r = np.zeros(len(ids), dtype=bool)
+    con = np.zeros(len(ids))
+    percentil_con = np.full(len(ids), np.nan)
+    filas = list(_ultimos_por_estudiante(
+        ResultadoD2R.objects.filter(estudiante__in=alumnos), F('fecha').desc(), 1
+    ).values_list('estudiante_id', 'con', 'percentil_con'))
+    if filas:
+        # None -> NaN al convertir a float
+        est, valores, percentiles = np.array(filas, dtype=np.float64).T
+        pos = np.searchsorted(ids, est.astype(np.int64))
+        tiene_d2r[pos] = True
+        con[pos] = valores
+        percentil_con[pos] = percentiles
+
+    # Promedio de atención de las últimas sesiones de cada estudiante
+    n_sesiones = np.zeros(len(ids), dtype=np.int64)
+    suma = np.zeros(len(ids))
+    filas = list(_ultimos_por_estudiante(
+        SesionAtencion.objects.filter(estudiante__in=alumnos), F('fecha').desc(), SESIONES_RECIENTES
+    ).values_list('estudiante_id', 'porcentaje_atencion'))
+    if filas:
+        est, valores = np.array(filas, dtype=np.float64).T
+        pos = np.searchsorted(ids, est.astype(np.int64))
+        n_sesiones = np.bincount(pos, minlength=len(ids))
+        suma = np.bincount(pos, weights=valores, minlength=len(ids))
+    with np.errstate(invalid='ignore', divide='ignore'):
+        promedio = np.round(suma / n_sesiones, 2)
+
+    patrones = clasificar(tiene_d2r, con, n_sesiones, np.nan_to_num(promedio), percentil_con)
+
+    return [
+        PatronEstudiante(
+            curso_id=int(c), estudiante_id=int(ids[i]),
+            patron=str(patrones[i]), prioridad=PRIORIDAD_PATRON[str(patrones[i])],
+            con=float(con[i]) if tiene_d2r[i] else None,
+            promedio_atencion=float(promedio[i]) if n_sesiones[i] else None,
+            sesiones=int(n_sesiones[i]),
+            calculado=ahora,
+        )
+        for (c, _), i in zip(inscripciones, indice)
+    ]
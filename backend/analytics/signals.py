@@ -0,0 +1,33 @@
+# backend/analytics/signals.py
+from django.db.models.signals import post_save
+from django.dispatch import receiver
+
+from courses.models import EvaluacionAdaptativa, ResultadoEvaluacion
+from evaluaciones.models import ResultadoD2R, SesionAtencion
+from . import agregados
+
+
+@receiver(post_save, sender=SesionAtencion)
+def sesion_registrada(sender, instance, created, **kwargs):
+    if created:
+        agregados.registrar_sesion(instance)
+
+
+@receiver(post_save, sender=ResultadoD2R)
+def d2r_registrado(sender, instance, created, **kwargs):
+    if created:
+        agregados.registrar_d2r(instance)
+
+
+@receiver(post_save, sender=ResultadoEvaluacion)
+def resultado_evaluacion_guardado(sender, instance, created, update_fields=None, **kwargs):
+    # Las evaluaciones clásicas se califican al crearse. En CAT el resultado se crea vacío
+    # y se guarda tras cada respuesta; solo el guardado final escribe 'analisis_ia'.
+    es_cat = EvaluacionAdaptativa.objects.filter(
+        pk=instance.evaluacion_id, nivel=EvaluacionAdaptativa.NIVEL_CAT
+    ).exists()
+    if es_cat:
+        if not created and update_fields and 'analisis_ia' in update_fields:
+            agregados.registrar_resultado_evaluacion(instance)
+    elif created:
+        agregados.registrar_resultado_evaluacion(instance)
@@ -1,3 +1,216 @@
-from django.test import TestCase
+import numpy as np
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.http import HttpResponse, StreamingHttpResponse
+from django.test import RequestFactory, override_settings
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APITestCase
 
-# Create your tests here.
+from analytics.agregados import recalcular_curso
+from analytics.models import AgregadoCursoEstudiante, AgregadoRecurso, CurvaD2R
+from core.metricas import MetricasMiddleware, medir_llm, registro
+from courses.models import Curso, EvaluacionAdaptativa, Modulo, Recurso, ResultadoEvaluacion
+from evaluaciones.models import DetalleFilaD2R, ResultadoD2R, SesionAtencion
+
+User = get_user_model()
+
+
+class DatosCursoMixin:
+    """Curso con dos estudiantes: uno atento y aprobado, otro distraído y reprobado."""
+
+    def setUp(self):
+        self.docente = User.objects.create_user(
+            email='doc@test.com', username='doc', password='x', rol='docente'
+        )
+        self.curso = Curso.objects.create(nombre='Curso', profesor=self.docente)
+        modulo = Modulo.objects.create(curso=self.curso, nombre='Módulo', orden=0)
+        self.recurso = Recurso.objects.create(modulo=modulo, titulo='Video', tipo='video')
+
+        self.estudiantes = []
+        for i, atencion in enumerate([90.0, 40.0]):
+            est = User.objects.create_user(
+                email=f'est{i}@test.com', username=f'est{i}', password='x', rol='estudiante'
+            )
+            self.curso.estudiantes.add(est)
+            SesionAtencion.objects.create(
+                estudiante=est, recurso=self.recurso, duracion_total=60,
+                segundos_distraido=10, porcentaje_atencion=atencion, nivel='MEDIA',
+            )
+            ResultadoD2R.objects.create(
+                estudiante=est, tr_total=100, ta_total=120 - 40 * i, eo_total=0, ec_total=0,
+                tot=100, con=120 - 40 * i,
+            )
+            evaluacion = EvaluacionAdaptativa.objects.create(
+                recurso=self.recurso, nivel='Medio', generada_para=est,
+                preguntas_json=[{'pregunta': 'p', 'opciones': [], 'correcta': 'A'}] * 4,
+            )
+            ResultadoEvaluacion.objects.create(
+                evaluacion=evaluacion, estudiante=est, respuestas_json=[], puntaje=4 - 3 * i,
+            )
+            self.estudiantes.append(est)
+
+        self.client.force_authenticate(self.docente)
+
+
+class PanelCursoTests(DatosCursoMixin, APITestCase):
+    """Los agregados incrementales deben coincidir con una reconstrucción completa."""
+
+    def foto(self):
+        return (
+            list(AgregadoRecurso.objects.values_list(
+                'recurso_id', 'sesiones', 'suma_atencion', 'sesiones_baja',
+                'evaluaciones', 'evaluaciones_aprobadas', 'suma_porcentaje',
+            )),
+            sorted(AgregadoCursoEstudiante.objects.values_list(
+                'estudiante_id', 'sesiones', 'suma_atencion', 'evaluaciones',
+                'evaluaciones_aprobadas', 'ultimo_con', 'en_riesgo',
+            )),
+        )
+
+    def test_incremental_igual_a_reconstruccion(self):
+        incremental = self.foto()
+        recalcular_curso(self.curso.id)
+        self.assertEqual(incremental, self.foto())
+
+    def test_panel(self):
+        data = self.client.get(f'/api/analytics/cursos/{self.curso.id}/panel/').json()
+
+        self.assertEqual(data['estudiantes'], 2)
+        self.assertEqual(data['atencion']['promedio'], 65.0)
+        self.assertEqual(data['evaluaciones']['tasa_aprobacion'], 50.0)
+        self.assertEqual(data['modulos'][0]['recursos'][0]['sesiones'], 2)
+        self.assertEqual(data['d2r_con']['estudiantes'], 2)
+        self.assertEqual([e['estudiante_id'] for e in data['en_riesgo']], [self.estudiantes[1].id])
+
+    def test_panel_solo_para_el_profesor_del_curso(self):
+        otro = User.objects.create_user(email='otro@test.com', username='otro', password='x', rol='docente')
+        self.client.force_authenticate(otro)
+        response = self.client.get(f'/api/analytics/cursos/{self.curso.id}/panel/')
+        self.assertEqual(response.status_code, 403)
+
+
+class PatronesTests(DatosCursoMixin, APITestCase):
+    """El cálculo por lotes debe dar el mismo patrón que detectar_patron_estudiante."""
+
+    def test_lote_igual_a_detector_individual(self):
+        from courses.views import (
+            detectar_patron_estudiante, obtener_estadisticas_atencion,
+            obtener_sesiones_atencion, obtener_ultimo_d2r,
+        )
+        from analytics.patrones import calcular_patrones
+
+        sin_datos = User.objects.create_user(email='nuevo@test.com', username='nuevo', password='x', rol='estudiante')
+        self.curso.estudiantes.add(sin_datos)
+
+        self.assertEqual(calcular_patrones(), 3)
+        for est in self.estudiantes + [sin_datos]:
+            sesiones = obtener_sesiones_atencion(est)
+            esperado = detectar_patron_estudiante(
+                obtener_ultimo_d2r(est), sesiones, obtener_estadisticas_atencion(sesiones)
+            )['patron']
+            self.assertEqual(est.patrones.get(curso=self.curso).patron, esperado)
+
+        data = self.client.get(f'/api/analytics/cursos/{self.curso.id}/patrones/?patron=PATRON_A').json()
+        self.assertEqual([e['estudiante_id'] for e in data['estudiantes']], [self.estudiantes[1].id])
+
+
+class CurvasD2RTests(DatosCursoMixin, APITestCase):
+    """Curvas por fila calculadas en lote y guardadas una vez por test."""
+
+    def crear_test(self, estudiante, tr_filas):
+        test = ResultadoD2R.objects.create(
+            estudiante=estudiante, curso=self.curso, tr_total=0, ta_total=0, eo_total=0, ec_total=0, tot=0, con=0,
+        )
+        DetalleFilaD2R.objects.bulk_create([
+            DetalleFilaD2R(test=test, numero_fila=i, tr=tr, ta=tr - 5, eo=1, ec=0)
+            for i, tr in enumerate(tr_filas, start=1)
+        ])
+        return test
+
+    def test_curvas_y_cohorte(self):
+        decreciente = [50 - 2 * i + (i % 2) for i in range(14)]
+        constante = [40] * 10
+        fatiga = self.crear_test(self.estudiantes[0], decreciente)
+        estable = self.crear_test(self.estudiantes[1], constante)
+        self.crear_test(self.estudiantes[1], [45])
+
+        url = f'/api/analytics/cursos/{self.curso.id}/curvas-d2r/'
+        data = self.client.get(url).json()
+        tests = {t['test_id']: t for t in data['tests']}
+
+        self.assertAlmostEqual(tests[fatiga.id]['pendiente_tr'], np.polyfit(range(1, 15), decreciente, 1)[0], places=4)
+        self.assertAlmostEqual(tests[fatiga.id]['varianza_diferencias'], np.var(np.diff(decreciente)), places=4)
+        self.assertTrue(tests[fatiga.id]['fatiga'])
+        self.assertEqual((tests[estable.id]['pendiente_tr'], tests[estable.id]['varianza_tr']), (0.0, 0.0))
+        self.assertEqual(data['cohorte']['tests'], 3)
+        self.assertEqual(data['cohorte']['tests_con_fatiga'], 1)
+        self.assertEqual(len(data['cohorte']['tr_medio']), 14)
+        self.assertEqual(data['cohorte']['tr_medio'][0], round((decreciente[0] + 40 + 45) / 3, 2))
+
+        # Ya guardadas: el curso entero sale con un número fijo de consultas
+        self.assertEqual(CurvaD2R.objects.count(), 3)
+        with CaptureQueriesContext(connection) as ctx:
+            self.client.get(url)
+        self.assertLessEqual(len(ctx.captured_queries), 3)
+
+
+class MetricasTests(DatosCursoMixin, APITestCase):
+    """Middleware de métricas por vista y /api/metricas/."""
+
+    def setUp(self):
+        super().setUp()
+        registro.reiniciar()
+
+    def test_consultas_por_vista_en_formato_prometheus(self):
+        self.client.force_authenticate(self.estudiantes[0])
+        self.client.get('/api/analytics/mis-sesiones/')
+
+        admin = User.objects.create_user(email='adm@test.com', username='adm', password='x', rol='admin')
+        self.client.force_authenticate(admin)
+        response = self.client.get('/api/metricas/')
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response['Content-Type'].startswith('text/plain'))
+        texto = response.content.decode()
+        self.assertIn('peticiones_total{vista="mis_sesiones",metodo="GET",estado="200"} 1', texto)
+        self.assertIn('peticion_consultas_db_count{vista="mis_sesiones",metodo="GET"} 1', texto)
+        self.assertIn('# TYPE peticion_duracion_segundos histogram', texto)
+        self.assertIn('login_pool_capacidad ', texto)
+        self.assertIn('log_descartados_total ', texto)
+
+    def test_acceso_con_token_de_metricas(self):
+        self.client.force_authenticate(None)
+        self.assertIn(self.client.get('/api/metricas/').status_code, (401, 403))
+        with override_settings(METRICAS_TOKEN='secreto'):
+            response = self.client.get('/api/metricas/', HTTP_AUTHORIZATION='Bearer secreto')
+        self.assertEqual(response.status_code, 200)
+        with override_settings(METRICAS_TOKEN='secreto'):
+            response = self.client.get('/api/metricas/', HTTP_AUTHORIZATION='Bearer secret0')
+        self.assertIn(response.status_code, (401, 403))
+
+    def test_consultas_de_respuesta_streaming(self):
+        def vista(request):
+            def lineas():
+                for _ in range(3):
+                    yield f'{User.objects.count()}\n'
+            return StreamingHttpResponse(lineas())
+
+        response = MetricasMiddleware(vista)(RequestFactory().get('/x/'))
+        # Hasta que se envía el cuerpo no hay nada que registrar
+        self.assertNotIn(('sin_ruta', 'GET'), registro.histogramas['peticion_consultas_db'])
+
+        cuerpo = b''.join(response.streaming_content)
+        response.close()
+        self.assertEqual(registro.histogramas['peticion_consultas_db'][('sin_ruta', 'GET')].suma, 3)
+        self.assertEqual(registro.histogramas['respuesta_bytes'][('sin_ruta', 'GET')].suma, len(cuerpo))
+
+    def test_tiempo_de_ia(self):
+        def vista(request):
+            with medir_llm():
+                pass
+            return HttpResponse('ok')
+
+        MetricasMiddleware(vista)(RequestFactory().get('/x/'))
+        MetricasMiddleware(lambda request: HttpResponse('ok'))(RequestFactory().get('/x/'))
+        llm = registro.histogramas['peticion_llm_segundos'][('sin_ruta', 'GET')]
+        self.assertEqual(llm.total, 1)
+        self.assertEqual(registro.histogramas['respuesta_bytes'][('sin_ruta', 'GET')].suma, 4)
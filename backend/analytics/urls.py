@@ -5,7 +5,10 @@ from django.urls import path
 from .views import (
     registrar_atencion,
     obtener_mis_sesiones,
-    obtener_detalle_sesion
+    obtener_detalle_sesion,
+    panel_curso,
+    patrones_curso,
+    curvas_d2r_curso,
 )
 
 urlpatterns = [
@@ -17,4 +20,13 @@ urlpatterns = [
 
     # GET - Obtener detalles de una sesión específica
     path('sesion/<int:sesion_id>/', obtener_detalle_sesion, name='detalle_sesion'),
+
+    # GET - Panel del docente para un curso (desde agregados materializados)
+    path('cursos/<int:curso_id>/panel/', panel_curso, name='panel_curso'),
+
+    # GET - Estudiantes del curso por patrón (?patron=PATRON_A), desde el cálculo por lotes
+    path('cursos/<int:curso_id>/patrones/', patrones_curso, name='patrones_curso'),
+
+    # GET - Curvas de fatiga/consistencia por fila de los tests D2-R del curso
+    path('cursos/<int:curso_id>/curvas-d2r/', curvas_d2r_curso, name='curvas_d2r_curso'),
 ]
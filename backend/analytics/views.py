@@ -1,6 +1,8 @@
 # backend/analytics/views.py
 # ✅ VERSIÓN CORREGIDA - Guarda en evaluaciones.SesionAtencion (NO en analytics)
 
+import logging
+
 from rest_framework.decorators import api_view, permission_classes
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
@@ -10,6 +12,8 @@ from courses.models import Recurso
 # ✅ Usamos los modelos correctos de evaluaciones
 from evaluaciones.models import SesionAtencion, DetalleAtencion
 
+logger = logging.getLogger(__name__)
+
 
 @api_view(['POST'])
 @permission_classes([IsAuthenticated])
@@ -103,7 +107,11 @@ def registrar_atencion(request):
                 DetalleAtencion.objects.bulk_create(detalles_bulk)
                 detalles_guardados = len(detalles_bulk)
 
-        print(f"✅ Sesión guardada: ID={sesion.id}, Nivel={nivel}, Detalles={detalles_guardados}")
+        # Un evento por video visto: se muestrea
+        logger.info(
+            "Sesión de atención guardada",
+            extra={"sesion_id": sesion.id, "nivel": nivel, "detalles": detalles_guardados, "muestreo": 0.1},
+        )
 
         return Response({
             "status": "success",
@@ -114,15 +122,13 @@ def registrar_atencion(request):
         }, status=status.HTTP_201_CREATED)
 
     except ValueError as e:
-        print(f"❌ Error de validación: {e}")
+        logger.warning("Datos de atención inválidos: %s", e)
         return Response(
             {"error": f"Error en formato de datos: {str(e)}"},
             status=status.HTTP_400_BAD_REQUEST
         )
     except Exception as e:
-        print(f"❌ Error guardando atención: {e}")
-        import traceback
-        traceback.print_exc()
+        logger.exception("Error guardando atención")
         return Response(
             {"error": str(e)},
             status=status.HTTP_500_INTERNAL_SERVER_ERROR
@@ -196,3 +202,136 @@ def obtener_detalle_sesion(request, sesion_id):
             for d in detalles
         ]
     })
+
+
+def _curso_del_docente(request, curso_id):
+    """Devuelve (curso, None) si el usuario puede ver los datos del curso, o (None, Response de error)."""
+    from courses.models import Curso
+
+    user = request.user
+    if getattr(user, 'rol', '') not in ['admin', 'docente'] and not user.is_staff:
+        return None, Response({"error": "No autorizado"}, status=status.HTTP_403_FORBIDDEN)
+
+    try:
+        curso = Curso.objects.get(pk=curso_id)
+    except Curso.DoesNotExist:
+        return None, Response({"error": "Curso no encontrado"}, status=status.HTTP_404_NOT_FOUND)
+
+    # Un docente solo ve los datos de sus propios cursos
+    if getattr(user, 'rol', '') == 'docente' and not user.is_staff and curso.profesor_id != user.id:
+        return None, Response({"error": "No autorizado"}, status=status.HTTP_403_FORBIDDEN)
+
+    return curso, None
+
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def panel_curso(request, curso_id):
+    """
+    Panel del docente para un curso: atención por módulo y recurso, distribución de CON (D2-R),
+    tasa de aprobación de las evaluaciones adaptativas y estudiantes en riesgo.
+
+    Se arma solo con los agregados materializados (analytics.agregados), nunca recorriendo
+    las sesiones o resultados de todos los estudiantes.
+    """
+    from .agregados import panel_curso as armar_panel
+
+    curso, error = _curso_del_docente(request, curso_id)
+    if error:
+        return error
+
+    return Response(armar_panel(curso))
+
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def patrones_curso(request, curso_id):
+    """
+    Estudiantes del curso con su patrón D2-R/atención según el último cálculo por lotes
+    (python manage.py calcular_patrones).
+
+    Query params:
+    - patron: PATRON_A, PATRON_B, PATRON_C, PATRON_D, SIN_D2R o SIN_SESIONES (opcional)
+    """
+    from .models import PatronEstudiante
+
+    curso, error = _curso_del_docente(request, curso_id)
+    if error:
+        return error
+
+    patrones = PatronEstudiante.objects.filter(curso=curso)
+    patron = request.query_params.get('patron')
+    if patron:
+        if patron not in dict(PatronEstudiante.PATRON_CHOICES):
+            return Response({"error": "patron inválido"}, status=status.HTTP_400_BAD_REQUEST)
+        patrones = patrones.filter(patron=patron)
+
+    data = [
+        {
+            'estudiante_id': p.estudiante_id,
+            'email': p.estudiante.email,
+            'nombre': p.estudiante.get_full_name(),
+            'patron': p.patron,
+            'prioridad': p.prioridad,
+            'con': p.con,
+            'promedio_atencion': p.promedio_atencion,
+            'sesiones': p.sesiones,
+            'calculado': p.calculado,
+        }
+        for p in patrones.select_related('estudiante').order_by('patron', 'estudiante_id')
+    ]
+
+    return Response({
+        'curso': curso.id,
+        'total': len(data),
+        'estudiantes': data,
+    })
+
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def curvas_d2r_curso(request, curso_id):
+    """
+    Curvas de fatiga y consistencia de los tests D2-R del curso: TR/TA por fila, pendiente
+    y varianza de cada test, más el resumen de la cohorte (curva media por fila).
+
+    Query params (opcionales):
+    - estudiante: id del estudiante
+    - desde / hasta: YYYY-MM-DD o ISO 8601
+    """
+    from core.filtros import filtrar_por_ids, filtrar_rango_fechas
+    from evaluaciones.models import ResultadoD2R
+    from .curvas import UMBRAL_FATIGA, obtener_curvas, resumen_cohorte
+
+    curso, error = _curso_del_docente(request, curso_id)
+    if error:
+        return error
+
+    tests = ResultadoD2R.objects.filter(curso=curso)
+    tests = filtrar_por_ids(tests, request.query_params, {'estudiante': 'estudiante_id'})
+    tests = filtrar_rango_fechas(tests, request.query_params)
+    tests = list(tests.order_by('-fecha').values_list('id', 'estudiante_id', 'fecha'))
+
+    curvas = obtener_curvas(t[0] for t in tests)
+    data = [
+        {
+            'test_id': test_id,
+            'estudiante_id': estudiante_id,
+            'fecha': fecha,
+            'tr': curva.tr,
+            'ta': curva.ta,
+            'pendiente_tr': curva.pendiente_tr,
+            'pendiente_ta': curva.pendiente_ta,
+            'varianza_tr': curva.varianza_tr,
+            'varianza_diferencias': curva.varianza_diferencias,
+            'fatiga': curva.pendiente_tr is not None and curva.pendiente_tr <= UMBRAL_FATIGA,
+        }
+        for test_id, estudiante_id, fecha in tests
+        if (curva := curvas.get(test_id))
+    ]
+
+    return Response({
+        'curso': curso.id,
+        'cohorte': resumen_cohorte([curvas[t['test_id']] for t in data]),
+        'tests': data,
+    })
@@ -0,0 +1,14 @@
+# backend/core/cache_compartida.py
+"""
+Caché compartida entre procesos.
+
+La caché 'default' es LocMem: cada worker de gunicorn tiene la suya, así que sirve para
+datos que se invalidan solos (claves con versión) pero no para revocaciones, contadores de
+intentos ni locks. Eso va en la caché 'compartida' (CACHES en core/settings.py): Redis si
+hay REDIS_URL, o la tabla de caché de la base (manage.py createcachetable) si no.
+"""
+from django.core.cache import caches
+from django.utils.connection import ConnectionProxy
+
+# Igual que django.core.cache.cache: resuelve la instancia del hilo en cada uso
+cache_compartida = ConnectionProxy(caches, 'compartida')
@@ -0,0 +1,52 @@
+from datetime import datetime, time, timedelta
+
+from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_datetime
+from rest_framework.exceptions import ValidationError
+
+
+def _parsear_fecha(valor, nombre, fin_del_dia=False):
+    """
+    Devuelve un datetime aware. Una fecha sola (YYYY-MM-DD) se convierte al inicio del día,
+    o al inicio del día siguiente si fin_del_dia=True, para filtrar por rango sobre el índice.
+    """
+    fecha_hora = parse_datetime(valor)
+    if fecha_hora is None:
+        fecha = parse_date(valor)
+        if fecha is None:
+            raise ValidationError({nombre: 'Formato de fecha inválido (use YYYY-MM-DD o ISO 8601)'})
+        if fin_del_dia:
+            fecha = fecha + timedelta(days=1)
+        fecha_hora = datetime.combine(fecha, time.min)
+    if timezone.is_naive(fecha_hora):
+        fecha_hora = timezone.make_aware(fecha_hora)
+    return fecha_hora
+
+
+def filtrar_rango_fechas(queryset, params, campo='fecha'):
+    """Aplica ?desde= y ?hasta= (YYYY-MM-DD o ISO 8601, ambos inclusive) sobre 'campo'."""
+    desde = params.get('desde')
+    hasta = params.get('hasta')
+    if desde:
+        queryset = queryset.filter(**{campo + '__gte': _parsear_fecha(desde, 'desde')})
+    if hasta:
+        if parse_datetime(hasta) is None:
+            queryset = queryset.filter(**{campo + '__lt': _parsear_fecha(hasta, 'hasta', fin_del_dia=True)})
+        else:
+            queryset = queryset.filter(**{campo + '__lte': _parsear_fecha(hasta, 'hasta')})
+    return queryset
+
+
+def filtrar_por_ids(queryset, params, filtros):
+    """
+    Aplica filtros de igualdad por id: filtros = {'parametro': 'lookup'}.
+    Ej: {'curso': 'recurso__modulo__curso_id'} -> ?curso=3
+    """
+    for parametro, lookup in filtros.items():
+        valor = params.get(parametro)
+        if valor in (None, ''):
+            continue
+        if not str(valor).isdigit():
+            raise ValidationError({parametro: 'Debe ser un id numérico'})
+        queryset = queryset.filter(**{lookup: int(valor)})
+    return queryset
@@ -0,0 +1,40 @@
+# backend/core/limites.py
+"""
+Límites de frecuencia con ventana fija sobre la caché compartida (core.cache_compartida).
+
+Cada clave cuenta eventos en una ventana de `ventana` segundos (add + incr sobre la caché).
+Los contadores los ven todos los workers: con una caché por proceso cada worker llevaría
+su propia cuenta y el límite real sería N veces el configurado. Con Redis add e incr son
+atómicos; con la tabla de caché de la base incr es leer y escribir, así que dos fallos
+exactamente simultáneos pueden contarse como uno.
+
+Sirve para cortar ráfagas antes del trabajo caro, por ejemplo el hash de la contraseña en
+el login.
+"""
+from core.cache_compartida import cache_compartida
+
+
+def _clave(nombre):
+    return f"limite:{nombre}"
+
+
+def contar(nombre, ventana):
+    """Suma un evento a la ventana actual y devuelve el total."""
+    clave = _clave(nombre)
+    if cache_compartida.add(clave, 1, ventana):
+        return 1
+    try:
+        return cache_compartida.incr(clave)
+    except ValueError:
+        # La ventana venció entre add e incr
+        cache_compartida.add(clave, 1, ventana)
+        return 1
+
+
+def excedido(nombre, limite):
+    """True si la ventana actual ya tiene `limite` eventos o más (no cuenta uno nuevo)."""
+    return (cache_compartida.get(_clave(nombre)) or 0) >= limite
+
+
+def reiniciar(nombre):
+    cache_compartida.delete(_clave(nombre))
@@ -0,0 +1,260 @@
+# backend/core/metricas.py
+"""
+Métricas de rendimiento por vista, en formato de texto de Prometheus (/api/metricas/).
+
+MetricasMiddleware mide cada petición y la suma a histogramas en memoria, agrupados por
+vista (nombre de la ruta, no la URL concreta) y método:
+- duración total de la petición,
+- cantidad y tiempo de consultas SQL (connection.execute_wrapper),
+- tamaño de la respuesta,
+- tiempo esperando al modelo de IA (las llamadas a Gemini se envuelven en medir_llm()).
+
+En una StreamingHttpResponse (las exportaciones) las consultas corren mientras se envía el
+cuerpo, después de que la vista retorna: el middleware envuelve el iterador y registra la
+petición cuando termina de enviarse, con esas consultas, la duración y los bytes incluidos.
+
+Los histogramas son de este proceso: con varios workers de gunicorn cada uno expone los
+suyos y Prometheus los suma por instancia. Se reinician al reiniciar el proceso.
+"""
+import bisect
+import contextvars
+import hmac
+import logging
+import threading
+import time
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.db import connection
+from django.http import HttpResponse
+from rest_framework import permissions
+from rest_framework.decorators import api_view, permission_classes, renderer_classes
+from rest_framework.renderers import BaseRenderer
+
+# Límites superiores de los buckets de cada histograma
+BUCKETS_SEGUNDOS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)
+BUCKETS_CONSULTAS = (0, 1, 2, 5, 10, 20, 50, 100, 200, 500)
+BUCKETS_BYTES = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304)
+
+# Tope de combinaciones vista/método: una ruta mal resuelta no debe crear series sin fin
+MAX_SERIES = 500
+
+_llm_segundos = contextvars.ContextVar('llm_segundos', default=None)
+
+
+class Histograma:
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.conteos = [0] * (len(buckets) + 1)
+        self.suma = 0.0
+        self.total = 0
+
+    def observar(self, valor):
+        self.conteos[bisect.bisect_left(self.buckets, valor)] += 1
+        self.suma += valor
+        self.total += 1
+
+
+class Registro:
+    """Histogramas por (vista, método) y peticiones por (vista, método, estado)."""
+
+    HISTOGRAMAS = {
+        'peticion_duracion_segundos': ('Duración total de la petición', BUCKETS_SEGUNDOS),
+        'peticion_consultas_db': ('Consultas SQL por petición', BUCKETS_CONSULTAS),
+        'peticion_db_segundos': ('Tiempo en consultas SQL por petición', BUCKETS_SEGUNDOS),
+        'respuesta_bytes': ('Tamaño del cuerpo de la respuesta', BUCKETS_BYTES),
+        'peticion_llm_segundos': ('Tiempo esperando al modelo de IA (solo peticiones que lo llaman)', BUCKETS_SEGUNDOS),
+    }
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reiniciar()
+
+    def reiniciar(self):
+        with self._lock:
+            self.histogramas = {nombre: {} for nombre in self.HISTOGRAMAS}
+            self.peticiones = {}
+
+    def registrar(self, vista, metodo, estado, valores):
+        with self._lock:
+            if (vista, metodo) not in self.histogramas['peticion_duracion_segundos'] and \
+                    len(self.histogramas['peticion_duracion_segundos']) >= MAX_SERIES:
+                vista = 'otras'
+            etiquetas = (vista, metodo)
+            for nombre, valor in valores.items():
+                if valor is None:
+                    continue
+                serie = self.histogramas[nombre]
+                if etiquetas not in serie:
+                    serie[etiquetas] = Histograma(self.HISTOGRAMAS[nombre][1])
+                serie[etiquetas].observar(valor)
+            clave = (vista, metodo, str(estado))
+            self.peticiones[clave] = self.peticiones.get(clave, 0) + 1
+
+    def exportar(self):
+        lineas = []
+        with self._lock:
+            lineas += _cabecera('peticiones_total', 'Peticiones atendidas', 'counter')
+            for (vista, metodo, estado), n in sorted(self.peticiones.items()):
+                lineas.append(f'peticiones_total{_etiquetas(vista=vista, metodo=metodo, estado=estado)} {n}')
+            for nombre, (ayuda, _) in self.HISTOGRAMAS.items():
+                lineas += _cabecera(nombre, ayuda, 'histogram')
+                for (vista, metodo), h in sorted(self.histogramas[nombre].items()):
+                    acumulado = 0
+                    for limite, n in zip(h.buckets + ('+Inf',), h.conteos):
+                        acumulado += n
+                        lineas.append(f'{nombre}_bucket{_etiquetas(vista=vista, metodo=metodo, le=limite)} {acumulado}')
+                    lineas.append(f'{nombre}_sum{_etiquetas(vista=vista, metodo=metodo)} {round(h.suma, 6)}')
+                    lineas.append(f'{nombre}_count{_etiquetas(vista=vista, metodo=metodo)} {h.total}')
+        return lineas
+
+
+registro = Registro()
+
+
+def _cabecera(nombre, ayuda, tipo):
+    return [f'# HELP {nombre} {ayuda}', f'# TYPE {nombre} {tipo}']
+
+
+def _etiquetas(**valores):
+    partes = []
+    for clave, valor in valores.items():
+        valor = str(valor).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+        partes.append(f'{clave}="{valor}"')
+    return '{' + ','.join(partes) + '}'
+
+
+@contextmanager
+def medir_llm():
+    """Suma al tiempo de IA de la petición en curso lo que tarde el bloque."""
+    inicio = time.perf_counter()
+    try:
+        yield
+    finally:
+        acumulado = _llm_segundos.get()
+        if acumulado is not None:
+            acumulado[0] += time.perf_counter() - inicio
+            acumulado[1] += 1
+
+
+class _MedidorSQL:
+    def __init__(self):
+        self.consultas = 0
+        self.segundos = 0.0
+
+    def __call__(self, execute, sql, params, many, context):
+        inicio = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.segundos += time.perf_counter() - inicio
+            self.consultas += 1
+
+
+def nombre_vista(request):
+    match = getattr(request, 'resolver_match', None)
+    if match is None:
+        return 'sin_ruta'
+    return match.view_name or match.route
+
+
+class MetricasMiddleware:
+    """Mide cada petición y la registra en `registro`."""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        medidor = _MedidorSQL()
+        llm = [0.0, 0]  # segundos, llamadas
+        token = _llm_segundos.set(llm)
+        inicio = time.perf_counter()
+        try:
+            with connection.execute_wrapper(medidor):
+                response = self.get_response(request)
+        finally:
+            _llm_segundos.reset(token)
+
+        def registrar(tamano):
+            registro.registrar(nombre_vista(request), request.method, response.status_code, {
+                'peticion_duracion_segundos': time.perf_counter() - inicio,
+                'peticion_consultas_db': medidor.consultas,
+                'peticion_db_segundos': medidor.segundos,
+                'respuesta_bytes': tamano,
+                'peticion_llm_segundos': llm[0] if llm[1] else None,
+            })
+
+        if response.streaming:
+            response.streaming_content = self._medir_streaming(response.streaming_content, medidor, registrar)
+        else:
+            registrar(len(response.content))
+        return response
+
+    @staticmethod
+    def _medir_streaming(contenido, medidor, registrar):
+        """Cuenta las consultas que corren al consumir el iterador y registra al terminar."""
+        tamano = 0
+        try:
+            with connection.execute_wrapper(medidor):
+                for parte in contenido:
+                    tamano += len(parte)
+                    yield parte
+        finally:
+            registrar(tamano)
+
+
+def _metricas_proceso():
+    """Estado del pool de hash del login y líneas de log descartadas en este proceso."""
+    from core.registro import ColaHandler
+    from users.contrasenas import pool_login
+
+    lineas = []
+    estado = pool_login.estadisticas()
+    for clave, tipo, ayuda in (
+        ('en_curso', 'gauge', 'Hashes de login corriendo o en cola'),
+        ('capacidad', 'gauge', 'Hashes de login admitidos a la vez (hilos + cola)'),
+        ('completadas_total', 'counter', 'Hashes de login completados'),
+        ('rechazadas_total', 'counter', 'Logins rechazados por pool saturado'),
+    ):
+        nombre = f'login_pool_{clave}'
+        lineas += _cabecera(nombre, ayuda, tipo)
+        lineas.append(f"{nombre} {estado[clave.removesuffix('_total')]}")
+
+    descartados = sum(
+        h.descartados for h in logging.getLogger().handlers if isinstance(h, ColaHandler)
+    )
+    lineas += _cabecera('log_descartados_total', 'Líneas de log descartadas por cola llena', 'counter')
+    lineas.append(f'log_descartados_total {descartados}')
+    return lineas
+
+
+class TextoPrometheus(BaseRenderer):
+    media_type = 'text/plain'
+    format = 'prometheus'
+    charset = 'utf-8'
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        return data if isinstance(data, (str, bytes)) else str(data)
+
+
+class TokenMetricas(permissions.BasePermission):
+    """Admin, o el recolector de Prometheus con 'Authorization: Bearer <METRICAS_TOKEN>'."""
+
+    def has_permission(self, request, view):
+        user = request.user
+        if user and (getattr(user, 'rol', '') == 'admin' or user.is_staff):
+            return True
+        esperado = getattr(settings, 'METRICAS_TOKEN', '')
+        if not esperado:
+            return False
+        recibido = request.headers.get('Authorization', '')
+        # Comparación en tiempo constante: no filtra por tiempos cuántos caracteres coinciden
+        return hmac.compare_digest(recibido.encode(), f'Bearer {esperado}'.encode())
+
+
+@api_view(['GET'])
+@permission_classes([TokenMetricas])
+@renderer_classes([TextoPrometheus])
+def metricas(request):
+    lineas = registro.exportar() + _metricas_proceso()
+    return HttpResponse('\n'.join(lineas) + '\n', content_type='text/plain; version=0.0.4; charset=utf-8')
@@ -0,0 +1,13 @@
+from rest_framework.pagination import CursorPagination
+
+
+class CursorPaginacion(CursorPagination):
+    """
+    Paginación por cursor para todos los ViewSets: páginas acotadas y consultas
+    por rango sobre un campo indexado (sin OFFSET que crezca con la tabla).
+    Cada ViewSet define su campo de orden con el atributo 'ordering'.
+    """
+    page_size = 50
+    page_size_query_param = 'page_size'
+    max_page_size = 200
+    ordering = '-id'
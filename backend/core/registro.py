@@ -0,0 +1,125 @@
+# backend/core/registro.py
+"""
+Logging estructurado de la API.
+
+- Cada línea es un JSON: fecha, nivel, logger, mensaje, request_id y los campos pasados
+  con extra={...}.
+- IdPeticionMiddleware asigna a cada petición un id (el de la cabecera X-Request-ID si
+  viene, o uno nuevo) que aparece en todas las líneas que se escriben mientras se atiende y
+  se devuelve en la respuesta.
+- Los eventos de mucho volumen se muestrean: extra={'muestreo': 0.1} deja pasar ~10 %.
+  Advertencias y errores nunca se descartan.
+- ColaHandler encola el registro y un hilo aparte escribe en stdout. La petición no espera
+  la escritura; si la cola se llena se descartan líneas en vez de bloquear.
+
+La configuración está en LOGGING (core/settings.py); el nivel se cambia con LOG_LEVEL.
+"""
+import atexit
+import contextvars
+import copy
+import json
+import logging
+import queue
+import random
+import sys
+import uuid
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener
+
+_request_id = contextvars.ContextVar('request_id', default=None)
+
+# Atributos propios de LogRecord: el resto son campos 'extra' del llamador
+_ATRIBUTOS_RECORD = set(vars(logging.LogRecord('', 0, '', 0, '', (), None))) | {'message', 'asctime', 'request_id'}
+
+TAMANO_COLA = 10000
+
+_formato_base = logging.Formatter()
+
+
+def request_id_actual():
+    return _request_id.get()
+
+
+class IdPeticionFilter(logging.Filter):
+    def filter(self, record):
+        record.request_id = _request_id.get()
+        return True
+
+
+class MuestreoFilter(logging.Filter):
+    """Descarta al azar los registros con extra={'muestreo': tasa} (solo por debajo de WARNING)."""
+
+    def filter(self, record):
+        tasa = getattr(record, 'muestreo', None)
+        if tasa is None or record.levelno >= logging.WARNING:
+            return True
+        return random.random() < tasa
+
+
+class FormatoJSON(logging.Formatter):
+    def format(self, record):
+        datos = {
+            'fecha': datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec='milliseconds'),
+            'nivel': record.levelname,
+            'logger': record.name,
+            'mensaje': record.getMessage(),
+        }
+        request_id = getattr(record, 'request_id', None)
+        if request_id:
+            datos['request_id'] = request_id
+        for clave, valor in vars(record).items():
+            if clave not in _ATRIBUTOS_RECORD and clave != 'muestreo':
+                datos[clave] = valor
+        if record.exc_info:
+            datos['excepcion'] = self.formatException(record.exc_info)
+        elif record.exc_text:
+            datos['excepcion'] = record.exc_text
+        return json.dumps(datos, ensure_ascii=False, default=str)
+
+
+class ColaHandler(QueueHandler):
+    """QueueHandler con cola acotada y su propio hilo escritor hacia stdout."""
+
+    def __init__(self, tamano=TAMANO_COLA):
+        super().__init__(queue.Queue(maxsize=tamano))
+        self.descartados = 0
+        salida = logging.StreamHandler(sys.stdout)
+        salida.setFormatter(FormatoJSON())
+        self._listener = QueueListener(self.queue, salida, respect_handler_level=False)
+        self._listener.start()
+        atexit.register(self._listener.stop)
+
+    def prepare(self, record):
+        # El mensaje y la traza se resuelven aquí, en el hilo de la petición: los argumentos
+        # pueden cambiar después y el traceback no debe cruzar de hilo
+        record = copy.copy(record)
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = _formato_base.formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+    def enqueue(self, record):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.descartados += 1
+
+
+class IdPeticionMiddleware:
+    """Asigna un id a cada petición (X-Request-ID) para correlacionar sus líneas de log."""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        request_id = (request.headers.get('X-Request-ID') or '')[:64] or uuid.uuid4().hex
+        token = _request_id.set(request_id)
+        request.request_id = request_id
+        try:
+            response = self.get_response(request)
+        finally:
+            _request_id.reset(token)
+        response['X-Request-ID'] = request_id
+        return response
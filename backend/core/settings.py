@@ -52,6 +52,10 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    # Primero: el id de petición tiene que existir para todo lo que se registre después
+    'core.registro.IdPeticionMiddleware',
+    # Tiempo, consultas SQL, tamaño y tiempo de IA por vista (core/metricas.py)
+    'core.metricas.MetricasMiddleware',
     'corsheaders.middleware.CorsMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'whitenoise.middleware.WhiteNoiseMiddleware',
@@ -95,6 +99,28 @@ else:
         }
     }
 
+# 'default' es por proceso; 'compartida' la ven todos los workers (core/cache_compartida.py)
+REDIS_URL = os.getenv("REDIS_URL", "")
+if REDIS_URL:
+    CACHE_COMPARTIDA = {
+        'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+        'LOCATION': REDIS_URL,
+    }
+else:
+    # Requiere `python manage.py createcachetable` (el release del Procfile lo ejecuta)
+    CACHE_COMPARTIDA = {
+        'BACKEND': 'django.core.cache.backends.db.DatabaseCache',
+        'LOCATION': 'cache_compartida',
+    }
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'web-proyecto',
+    },
+    'compartida': CACHE_COMPARTIDA,
+}
+
 AUTH_PASSWORD_VALIDATORS = [
     {'NAME': 'django.contrib.auth.password_validation.UserAttributeSimilarityValidator'},
     {'NAME': 'django.contrib.auth.password_validation.MinimumLengthValidator'},
@@ -150,16 +176,63 @@ CORS_ALLOW_HEADERS = list(default_headers) + [
 
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': [
-        'rest_framework.authentication.TokenAuthentication',
+        # TokenAuthentication con caché (sin consulta por petición)
+        'users.autenticacion.TokenCacheAuthentication',
         'rest_framework.authentication.SessionAuthentication',
     ],
     'DEFAULT_PERMISSION_CLASSES': [
         'rest_framework.permissions.IsAuthenticated',
     ],
+    'DEFAULT_PAGINATION_CLASS': 'core.pagination.CursorPaginacion',
+    'DEFAULT_FILTER_BACKENDS': [
+        'rest_framework.filters.OrderingFilter',
+    ],
 }
 
+# Logging estructurado (core/registro.py): JSON por línea, con request_id, muestreo y
+# escritura en un hilo aparte
+LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO").upper()
+LOGGING = {
+    "version": 1,
+    "disable_existing_loggers": False,
+    "filters": {
+        "request_id": {"()": "core.registro.IdPeticionFilter"},
+        "muestreo": {"()": "core.registro.MuestreoFilter"},
+    },
+    "handlers": {
+        "cola": {
+            "()": "core.registro.ColaHandler",
+            "filters": ["request_id", "muestreo"],
+        },
+    },
+    "root": {"handlers": ["cola"], "level": LOG_LEVEL},
+    "loggers": {
+        "django": {"handlers": ["cola"], "level": os.getenv("DJANGO_LOG_LEVEL", "WARNING"), "propagate": False},
+        "users": {"level": LOG_LEVEL},
+        "courses": {"level": LOG_LEVEL},
+        "evaluaciones": {"level": LOG_LEVEL},
+        "analytics": {"level": LOG_LEVEL},
+    },
+}
+
+# Token con el que Prometheus lee /api/metricas/ (Authorization: Bearer ...); vacío = solo admin
+METRICAS_TOKEN = os.getenv("METRICAS_TOKEN", "")
+
+# Vencimiento de los tokens de la API (users.models.TokenAcceso)
+TOKEN_DURACION_HORAS = int(os.getenv("TOKEN_DURACION_HORAS", str(24 * 7)))
+TOKEN_INACTIVIDAD_HORAS = int(os.getenv("TOKEN_INACTIVIDAD_HORAS", "48"))
+
+# Pool acotado de hash del login por proceso (users.contrasenas.pool_login)
+LOGIN_HILOS_HASH = int(os.getenv("LOGIN_HILOS_HASH", "2"))
+LOGIN_COLA_HASH = int(os.getenv("LOGIN_COLA_HASH", "16"))
+LOGIN_ESPERA_HASH = float(os.getenv("LOGIN_ESPERA_HASH", "10"))
+
 GOOGLE_API_KEY = os.getenv("GOOGLE_API_KEY", "")
 GEMINI_API_KEY = os.getenv("GEMINI_API_KEY", "")
 
 SECURE_PROXY_SSL_HEADER = ("HTTP_X_FORWARDED_PROTO", "https")
+# Proxies propios delante de la app (el router de Heroku = 1). Cada uno agrega a la derecha de
+# X-Forwarded-For la IP de quien le habló; lo que esté más a la izquierda lo escribe el cliente.
+# Con 0 se usa REMOTE_ADDR (users.views.ip_cliente)
+PROXIES_CONFIABLES = int(os.getenv("PROXIES_CONFIABLES", "1"))
 USE_X_FORWARDED_HOST = True
@@ -1,9 +1,14 @@
 from django.contrib import admin
 from django.urls import path, include
 
+from core.metricas import metricas
+
 urlpatterns = [
     path('admin/', admin.site.urls),
 
+    # Métricas por vista en formato Prometheus (admin o METRICAS_TOKEN)
+    path('api/metricas/', metricas, name='metricas'),
+
     # Rutas principales (api_router tiene: users, cursos, modulos, recursos, resultados-d2r, atencion)
     path('api/', include('core.api_router')),
 
@@ -1,5 +1,5 @@
 from django.contrib import admin
-from .models import Curso, Modulo, Recurso, PreguntaVideo
+from .models import Curso, Modulo, Recurso, PreguntaVideo, EstadisticaPregunta, HabilidadEstudiante
 
 # Configuración para editar Preguntas DENTRO de la pantalla del Recurso (Video)
 class PreguntaVideoInline(admin.TabularInline):
@@ -30,15 +30,25 @@ class ModuloInline(admin.TabularInline):
     show_change_link = True
 
 class CursoAdmin(admin.ModelAdmin):
-    list_display = ('nombre', 'profesor', 'count_estudiantes', 'activo')
+    # num_estudiantes es un contador guardado en el curso: no hay un COUNT por fila
+    list_display = ('nombre', 'profesor', 'num_estudiantes', 'activo')
     list_filter = ('profesor', 'activo')
+    list_select_related = ('profesor',)
     search_fields = ('nombre', 'profesor__email')
     filter_horizontal = ('estudiantes',) # Selector múltiple para alumnos
+    readonly_fields = ('num_estudiantes',)
     inlines = [ModuloInline]
 
-    def count_estudiantes(self, obj):
-        return obj.estudiantes.count()
-    count_estudiantes.short_description = 'Estudiantes'
+class EstadisticaPreguntaAdmin(admin.ModelAdmin):
+    list_display = ('texto_pregunta', 'recurso', 'nivel', 'num_respuestas', 'dificultad', 'discriminacion', 'actualizado')
+    list_filter = ('nivel', 'recurso__modulo__curso')
+    search_fields = ('texto_pregunta', 'recurso__titulo')
+    readonly_fields = ('actualizado',)
+
+class HabilidadEstudianteAdmin(admin.ModelAdmin):
+    list_display = ('estudiante', 'recurso', 'theta', 'varianza', 'respuestas_acumuladas', 'actualizado')
+    search_fields = ('estudiante__email', 'recurso__titulo')
+    readonly_fields = ('actualizado',)
 
 class ModuloAdmin(admin.ModelAdmin):
     list_display = ('nombre', 'curso', 'orden')
@@ -51,3 +61,5 @@ admin.site.register(Modulo, ModuloAdmin)
 admin.site.register(Recurso, RecursoAdmin) # ✅ Usamos el RecursoAdmin personalizado
 # Opcional: Registrar PreguntaVideo por separado si quieres ver todas las preguntas juntas
 admin.site.register(PreguntaVideo)
+admin.site.register(EstadisticaPregunta, EstadisticaPreguntaAdmin)
+admin.site.register(HabilidadEstudiante, HabilidadEstudianteAdmin)
@@ -0,0 +1,252 @@
+# backend/courses/analisis_items.py
+"""
+Análisis de ítems sobre las evaluaciones adaptativas.
+
+Convierte los pares (preguntas_json, respuestas_json) de ResultadoEvaluacion en una
+matriz numérica por recurso y nivel (filas = intentos, columnas = preguntas) y calcula
+en forma vectorizada:
+
+- dificultad: proporción de aciertos de cada pregunta
+- discriminación: correlación punto biserial entre acertar la pregunta y el puntaje en el resto
+- frecuencias de opciones: cuántas veces se eligió A, B, C y D
+
+Los resultados se guardan en EstadisticaPregunta para consultarlos sin volver a leer los JSON.
+"""
+from __future__ import annotations
+
+import hashlib
+import json
+import math
+from collections import defaultdict
+
+import numpy as np
+from django.db import transaction
+from django.db.models import Q
+
+from .models import EstadisticaPregunta, EvaluacionAdaptativa, ResultadoEvaluacion
+from .views_evaluaciones import normalizar_respuesta_correcta
+
+LETRAS = "ABCD"
+
+# Umbrales para marcar una pregunta como "problemática" (muy difícil, trivial o que no discrimina)
+DIFICULTAD_MINIMA = 0.2
+DIFICULTAD_MAXIMA = 0.95
+DISCRIMINACION_MINIMA = 0.1
+RESPUESTAS_MINIMAS = 5
+
+# Dificultad (logits) asumida para cada nivel cuando el ítem aún no tiene estadísticas
+DIFICULTAD_NIVEL = {"Fácil": -1.0, "Medio": 0.0, "Difícil": 1.0}
+
+
+def huella_pregunta(pregunta: dict) -> str:
+    """Identificador estable de un ítem: el mismo texto con otras opciones u otra clave es otro ítem."""
+    base = json.dumps(
+        [
+            str(pregunta.get("pregunta", "")).strip(),
+            [str(o).strip() for o in (pregunta.get("opciones") or [])],
+            normalizar_respuesta_correcta(pregunta.get("correcta")),
+        ],
+        ensure_ascii=False,
+    )
+    return hashlib.sha1(base.encode("utf-8")).hexdigest()
+
+
+def dificultad_logit(nivel, num_respuestas, dificultad) -> float:
+    """Dificultad b del ítem: la empírica si tiene RESPUESTAS_MINIMAS respuestas, si no la del nivel."""
+    if num_respuestas >= RESPUESTAS_MINIMAS and dificultad is not None:
+        p = min(max(dificultad, 0.02), 0.98)
+        return math.log((1.0 - p) / p)
+    return DIFICULTAD_NIVEL.get(nivel, 0.0)
+
+
+def _letra_a_indice(valor) -> int:
+    letra = normalizar_respuesta_correcta(valor)
+    return LETRAS.index(letra) if letra else -1
+
+
+def construir_matriz(intentos):
+    """
+    Construye la matriz de respuestas de un grupo (recurso, nivel).
+
+    intentos: iterable de (preguntas_json, respuestas_json).
+    Devuelve (items, elecciones, claves):
+    - items: lista de dicts con huella/texto/opciones/correcta, una por columna
+    - elecciones: int8 (n_intentos, n_items) con el índice de la opción elegida, -1 si no respondió
+    - claves: int8 (n_items,) con el índice de la opción correcta
+    """
+    columnas = {}
+    items = []
+    filas = []
+
+    for preguntas, respuestas in intentos:
+        preguntas = preguntas or []
+        respuestas = respuestas if isinstance(respuestas, list) else []
+        fila = {}
+        for i, pregunta in enumerate(preguntas):
+            if not isinstance(pregunta, dict):
+                continue
+            huella = huella_pregunta(pregunta)
+            col = columnas.get(huella)
+            if col is None:
+                col = len(items)
+                columnas[huella] = col
+                items.append({
+                    "huella": huella,
+                    "texto_pregunta": str(pregunta.get("pregunta", "")).strip(),
+                    "opciones": list(pregunta.get("opciones") or []),
+                    "correcta": normalizar_respuesta_correcta(pregunta.get("correcta")) or "A",
+                })
+            fila[col] = _letra_a_indice(respuestas[i]) if i < len(respuestas) else -1
+        filas.append(fila)
+
+    elecciones = np.full((len(filas), len(items)), -1, dtype=np.int8)
+    for r, fila in enumerate(filas):
+        if fila:
+            cols = np.fromiter(fila.keys(), dtype=np.intp, count=len(fila))
+            elecciones[r, cols] = np.fromiter(fila.values(), dtype=np.int8, count=len(fila))
+
+    claves = np.array([LETRAS.index(it["correcta"]) for it in items], dtype=np.int8)
+    return items, elecciones, claves
+
+
+def calcular_estadisticas(elecciones: np.ndarray, claves: np.ndarray):
+    """
+    Estadísticas de ítem vectorizadas sobre una matriz de elecciones.
+
+    Devuelve (n_respuestas, dificultad, discriminacion, frecuencias) como arrays por columna;
+    dificultad y discriminacion son NaN donde no se pueden calcular.
+    """
+    respondida = elecciones >= 0
+    aciertos = (elecciones == claves[None, :]) & respondida
+    c = aciertos.astype(np.float64)
+    m = respondida.astype(np.float64)
+
+    n = m.sum(axis=0)
+    total = c.sum(axis=1, keepdims=True)
+    resto = (total - c) * m  # puntaje del intento sin contar la propia pregunta
+
+    with np.errstate(invalid="ignore", divide="ignore"):
+        dificultad = c.sum(axis=0) / n
+
+        media_c = dificultad
+        media_r = resto.sum(axis=0) / n
+        cov = (c * resto).sum(axis=0) / n - media_c * media_r
+        var_c = media_c - media_c ** 2
+        var_r = (resto ** 2).sum(axis=0) / n - media_r ** 2
+        discriminacion = cov / np.sqrt(var_c * var_r)
+
+    discriminacion[~np.isfinite(discriminacion)] = np.nan
+
+    frecuencias = np.stack([(elecciones == k).sum(axis=0) for k in range(len(LETRAS))])
+    return n.astype(np.int64), dificultad, discriminacion, frecuencias
+
+
+def _a_float(valor):
+    return None if np.isnan(valor) else round(float(valor), 4)
+
+
+def recalcular_estadisticas(recurso_id=None) -> int:
+    """
+    Recalcula y guarda EstadisticaPregunta para todos los recursos (o uno solo).
+    Devuelve el número de preguntas actualizadas.
+    """
+    resultados = ResultadoEvaluacion.objects.all()
+    if recurso_id is not None:
+        resultados = resultados.filter(evaluacion__recurso_id=recurso_id)
+
+    grupos = defaultdict(list)
+    filas = resultados.values_list(
+        "evaluacion__recurso_id", "evaluacion__nivel", "evaluacion__preguntas_json", "respuestas_json"
+    ).iterator(chunk_size=500)
+    for rec_id, nivel, preguntas, respuestas in filas:
+        if nivel != EvaluacionAdaptativa.NIVEL_CAT:
+            grupos[(rec_id, nivel)].append((preguntas, respuestas))
+            continue
+        # En CAT cada pregunta viene del banco de un nivel distinto: se reparte por su nivel de origen
+        respuestas = respuestas if isinstance(respuestas, list) else []
+        partes = defaultdict(lambda: ([], []))
+        for i, pregunta in enumerate(preguntas or []):
+            if isinstance(pregunta, dict):
+                ps, rs = partes[pregunta.get("nivel")]
+                ps.append(pregunta)
+                rs.append(respuestas[i] if i < len(respuestas) else None)
+        for nivel_item, parte in partes.items():
+            grupos[(rec_id, nivel_item)].append(parte)
+
+    objetos = []
+    for (rec_id, nivel), intentos in grupos.items():
+        items, elecciones, claves = construir_matriz(intentos)
+        if not items:
+            continue
+        n, dificultad, discriminacion, frecuencias = calcular_estadisticas(elecciones, claves)
+
+        for j, item in enumerate(items):
+            objetos.append(EstadisticaPregunta(
+                recurso_id=rec_id,
+                nivel=nivel,
+                huella=item["huella"],
+                texto_pregunta=item["texto_pregunta"],
+                opciones=item["opciones"],
+                correcta=item["correcta"],
+                num_respuestas=int(n[j]),
+                dificultad=_a_float(dificultad[j]),
+                discriminacion=_a_float(discriminacion[j]),
+                frecuencias_opciones={LETRAS[k]: int(frecuencias[k, j]) for k in range(len(LETRAS))},
+                dificultad_valor=dificultad_logit(nivel, int(n[j]), _a_float(dificultad[j])),
+            ))
+
+    with transaction.atomic():
+        EstadisticaPregunta.objects.bulk_create(
+            objetos,
+            batch_size=500,
+            update_conflicts=True,
+            unique_fields=["recurso", "nivel", "huella"],
+            update_fields=[
+                "texto_pregunta", "opciones", "correcta", "num_respuestas",
+                "dificultad", "discriminacion", "frecuencias_opciones", "dificultad_valor", "actualizado",
+            ],
+        )
+
+    return len(objetos)
+
+
+def es_problematica(estadistica: EstadisticaPregunta) -> bool:
+    if estadistica.num_respuestas < RESPUESTAS_MINIMAS:
+        return False
+    if estadistica.dificultad is not None and not (DIFICULTAD_MINIMA <= estadistica.dificultad <= DIFICULTAD_MAXIMA):
+        return True
+    if estadistica.discriminacion is not None and estadistica.discriminacion < DISCRIMINACION_MINIMA:
+        return True
+    return False
+
+
+def filtro_no_problematicas() -> Q:
+    """Lo mismo que `not es_problematica(e)`, como condición SQL para filtrar el banco."""
+    return Q(num_respuestas__lt=RESPUESTAS_MINIMAS) | (
+        (Q(dificultad__isnull=True) | Q(dificultad__gte=DIFICULTAD_MINIMA, dificultad__lte=DIFICULTAD_MAXIMA))
+        & (Q(discriminacion__isnull=True) | Q(discriminacion__gte=DISCRIMINACION_MINIMA))
+    )
+
+
+def registrar_en_banco(recurso, nivel, preguntas) -> None:
+    """
+    Agrega preguntas generadas al banco (EstadisticaPregunta sin respuestas todavía) para que
+    el modo CAT pueda servirlas sin volver a llamar a la IA. Las que ya existen no se tocan.
+    """
+    objetos = []
+    for pregunta in preguntas or []:
+        if not isinstance(pregunta, dict):
+            continue
+        correcta = normalizar_respuesta_correcta(pregunta.get("correcta"))
+        if not correcta:
+            continue
+        objetos.append(EstadisticaPregunta(
+            recurso=recurso,
+            nivel=nivel,
+            huella=huella_pregunta(pregunta),
+            texto_pregunta=str(pregunta.get("pregunta", "")).strip(),
+            opciones=list(pregunta.get("opciones") or []),
+            correcta=correcta,
+            dificultad_valor=DIFICULTAD_NIVEL.get(nivel, 0.0),
+        ))
+    EstadisticaPregunta.objects.bulk_create(objetos, ignore_conflicts=True)
@@ -0,0 +1,149 @@
+# backend/courses/catalogo_cache.py
+"""
+Respuestas condicionales (ETag / Last-Modified) y caché de los árboles de curso serializados.
+
+El catálogo cambia poco: cada guardado o borrado de Curso, Modulo, Recurso o PreguntaVideo
+incrementa VersionCatalogo (ver signals.py). Los ETag y las claves de caché incluyen esa
+versión, así que nunca hace falta invalidar nada a mano: una versión nueva simplemente no
+encuentra entradas viejas.
+"""
+import hashlib
+
+from django.core.cache import cache
+from django.db.models import F
+from django.http import Http404
+from django.utils import timezone
+from django.utils.http import http_date, parse_http_date_safe
+from rest_framework import status
+from rest_framework.response import Response
+
+from .expansion import parsear_lista
+from .models import VersionCatalogo
+
+CACHE_TIMEOUT = 60 * 60
+
+
+def obtener_version() -> VersionCatalogo:
+    version, _ = VersionCatalogo.objects.get_or_create(pk=1)
+    return version
+
+
+def incrementar_version() -> None:
+    actualizados = VersionCatalogo.objects.filter(pk=1).update(
+        version=F('version') + 1, actualizado=timezone.now()
+    )
+    if not actualizados:
+        VersionCatalogo.objects.get_or_create(pk=1)
+
+
+def rol_de(user) -> str:
+    if user.is_staff:
+        return 'admin'
+    return getattr(user, 'rol', '') or 'estudiante'
+
+
+def calcular_etag(*partes) -> str:
+    base = '|'.join(str(p) for p in partes)
+    return '"%s"' % hashlib.sha1(base.encode('utf-8')).hexdigest()
+
+
+def no_modificado(request, etag, ultima_modificacion) -> bool:
+    if_none_match = request.headers.get('If-None-Match')
+    if if_none_match:
+        return etag in [e.strip() for e in if_none_match.split(',')] or if_none_match.strip() == '*'
+    if_modified_since = parse_http_date_safe(request.headers.get('If-Modified-Since', ''))
+    return if_modified_since is not None and int(ultima_modificacion.timestamp()) <= if_modified_since
+
+
+def respuesta_condicional(response, etag, ultima_modificacion):
+    response['ETag'] = etag
+    response['Last-Modified'] = http_date(ultima_modificacion.timestamp())
+    # El navegador puede guardar la respuesta pero debe revalidarla siempre
+    response['Cache-Control'] = 'private, no-cache'
+    return response
+
+
+def respuesta_304(etag, ultima_modificacion):
+    return respuesta_condicional(Response(status=status.HTTP_304_NOT_MODIFIED), etag, ultima_modificacion)
+
+
+class CatalogoCondicionalMixin:
+    """
+    GET con ETag fuerte derivado de (versión del catálogo, usuario, URL completa):
+    si el cliente ya tiene esa versión responde 304 sin consultar ni serializar nada más.
+    """
+
+    def etag_catalogo(self, request, version):
+        return calcular_etag(version.version, request.user.pk, rol_de(request.user), request.get_full_path())
+
+    def list(self, request, *args, **kwargs):
+        return self._condicional(request, super().list, *args, **kwargs)
+
+    def retrieve(self, request, *args, **kwargs):
+        return self._condicional(request, super().retrieve, *args, **kwargs)
+
+    def _condicional(self, request, handler, *args, **kwargs):
+        version = obtener_version()
+        etag = self.etag_catalogo(request, version)
+        if no_modificado(request, etag, version.actualizado):
+            return respuesta_304(etag, version.actualizado)
+        response = handler(request, *args, **kwargs)
+        if response.status_code == status.HTTP_200_OK:
+            respuesta_condicional(response, etag, version.actualizado)
+        return response
+
+
+class CursoCacheMixin(CatalogoCondicionalMixin):
+    """
+    Además del ETag, guarda en caché cada curso serializado con clave
+    (curso, versión, rol, expand/fields): las recargas repetidas no serializan.
+    """
+
+    def clave_curso(self, curso_id, version):
+        expand = self.obtener_expansion()
+        fields = parsear_lista(self.request.query_params.get('fields'))
+        variante = calcular_etag(
+            '*' if expand is None else sorted(expand), sorted(fields or [])
+        ).strip('"')[:12]
+        return f"catalogo:curso:{curso_id}:v{version.version}:{rol_de(self.request.user)}:{variante}"
+
+    def serializar_cursos(self, ids, version):
+        claves = {curso_id: self.clave_curso(curso_id, version) for curso_id in ids}
+        en_cache = cache.get_many(list(claves.values()))
+
+        faltantes = [curso_id for curso_id in ids if claves[curso_id] not in en_cache]
+        if faltantes:
+            cursos = self.get_queryset().filter(id__in=faltantes)
+            nuevos = {c['id']: c for c in self.get_serializer(cursos, many=True).data}
+            cache.set_many({claves[i]: datos for i, datos in nuevos.items()}, CACHE_TIMEOUT)
+            en_cache.update({claves[i]: datos for i, datos in nuevos.items()})
+
+        return [en_cache[claves[curso_id]] for curso_id in ids if claves[curso_id] in en_cache]
+
+    def list(self, request, *args, **kwargs):
+        version = obtener_version()
+        # Se pagina solo sobre los ids; el árbol de cada curso sale de la caché o se serializa aparte
+        queryset = self.filter_queryset(self.get_queryset()).select_related(None).prefetch_related(None).only('id')
+        page = self.paginate_queryset(queryset)
+        ids = [curso.id for curso in (page if page is not None else queryset)]
+
+        etag = calcular_etag(self.etag_catalogo(request, version), ids)
+        if no_modificado(request, etag, version.actualizado):
+            return respuesta_304(etag, version.actualizado)
+
+        data = self.serializar_cursos(ids, version)
+        response = self.get_paginated_response(data) if page is not None else Response(data)
+        return respuesta_condicional(response, etag, version.actualizado)
+
+    def retrieve(self, request, *args, **kwargs):
+        version = obtener_version()
+        try:
+            curso_id = int(kwargs['pk'])
+        except (TypeError, ValueError):
+            raise Http404
+        if not self.get_queryset().filter(pk=curso_id).exists():
+            raise Http404
+        etag = self.etag_catalogo(request, version)
+        if no_modificado(request, etag, version.actualizado):
+            return respuesta_304(etag, version.actualizado)
+        return respuesta_condicional(Response(self.serializar_cursos([curso_id], version)[0]), etag, version.actualizado)
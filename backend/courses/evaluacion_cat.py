@@ -0,0 +1,196 @@
+# backend/courses/evaluacion_cat.py
+"""
+Evaluación adaptativa computarizada (CAT): se sirve una pregunta a la vez desde el banco
+de preguntas ya generadas (EstadisticaPregunta), se actualiza la habilidad tras cada
+respuesta y se termina en cuanto la estimación alcanza la precisión objetivo.
+
+El banco se llena fuera de las peticiones: cada evaluación generada con generar_evaluacion_adaptativa
+agrega sus preguntas (registrar_en_banco) y el comando completar_banco_cat completa con la IA los
+recursos que no llegan a BANCO_MINIMO. Iniciar o responder nunca llama a la IA; si el banco no
+alcanza, iniciar lanza BancoInsuficiente.
+
+El estado vive en los modelos existentes:
+- EvaluacionAdaptativa (nivel = CAT): preguntas_json = preguntas servidas, contexto_atencion["cat"] = theta/varianza
+- ResultadoEvaluacion: respuestas_json y puntaje acumulados
+"""
+from __future__ import annotations
+
+import math
+
+from django.db import transaction
+from django.db.models import F
+from django.db.models.functions import Abs
+
+from .analisis_items import filtro_no_problematicas, registrar_en_banco
+from .models import EstadisticaPregunta, EvaluacionAdaptativa, HabilidadEstudiante, ResultadoEvaluacion
+from .motor_adaptativo import (
+    DERIVA,
+    DIFICULTAD_NIVEL,
+    ERROR_ESTANDAR_OBJETIVO,
+    PREGUNTAS_MAX,
+    actualizar_con_respuestas,
+    obtener_habilidad,
+)
+from .views_evaluaciones import es_modo_sin_ia, generar_preguntas_ia, normalizar_respuesta_correcta
+
+CAT_PREGUNTAS_MIN = 3
+
+# Preguntas mínimas en el banco del recurso para ofrecer una evaluación CAT
+BANCO_MINIMO = 15
+PREGUNTAS_POR_NIVEL = 5
+
+
+class BancoInsuficiente(Exception):
+    pass
+
+
+def asegurar_banco(recurso) -> int:
+    """
+    Completa con la IA el banco de un recurso que no llega a BANCO_MINIMO (comando
+    completar_banco_cat). Devuelve las preguntas agregadas; las del modo sin IA no se guardan.
+    """
+    antes = EstadisticaPregunta.objects.filter(recurso=recurso).count()
+    if antes >= BANCO_MINIMO:
+        return 0
+    for nivel in DIFICULTAD_NIVEL:
+        preguntas, mensaje = generar_preguntas_ia(recurso, nivel, PREGUNTAS_POR_NIVEL)
+        if es_modo_sin_ia(mensaje):
+            continue
+        registrar_en_banco(recurso, nivel, preguntas)
+    return EstadisticaPregunta.objects.filter(recurso=recurso).count() - antes
+
+
+def siguiente_item(recurso, theta: float, servidas) -> EstadisticaPregunta | None:
+    """Pregunta del banco no servida aún, no problemática, con dificultad más cercana a theta."""
+    return (
+        EstadisticaPregunta.objects.filter(recurso=recurso)
+        .filter(filtro_no_problematicas())
+        .exclude(huella__in=list(servidas))
+        .order_by(Abs(F("dificultad_valor") - theta), "id")
+        .only("huella", "nivel", "texto_pregunta", "opciones", "correcta", "dificultad_valor")
+        .first()
+    )
+
+
+def _pregunta_para_guardar(item: EstadisticaPregunta) -> dict:
+    return {
+        "pregunta": item.texto_pregunta,
+        "opciones": item.opciones,
+        "correcta": item.correcta,
+        "huella": item.huella,
+        "nivel": item.nivel,
+        "b": round(item.dificultad_valor, 4),
+    }
+
+
+def pregunta_para_estudiante(evaluacion: EvaluacionAdaptativa) -> dict:
+    """Última pregunta servida, sin la respuesta correcta."""
+    preguntas = evaluacion.preguntas_json or []
+    p = preguntas[-1]
+    return {"indice": len(preguntas) - 1, "pregunta": p["pregunta"], "opciones": p["opciones"]}
+
+
+def iniciar(user, recurso, contexto_atencion, contexto_d2r):
+    """
+    Crea la evaluación CAT y su resultado, y sirve la primera pregunta. Devuelve (evaluacion, resultado).
+    Lanza BancoInsuficiente si el recurso no tiene BANCO_MINIMO preguntas en el banco.
+    """
+    if EstadisticaPregunta.objects.filter(recurso=recurso).count() < BANCO_MINIMO:
+        raise BancoInsuficiente()
+
+    habilidad = obtener_habilidad(user, recurso, contexto_atencion.get("nivel", "media"))
+    theta = habilidad.theta
+    varianza = habilidad.varianza + DERIVA
+
+    primera = siguiente_item(recurso, theta, servidas=())
+    if primera is None:
+        return None, None
+
+    with transaction.atomic():
+        evaluacion = EvaluacionAdaptativa.objects.create(
+            recurso=recurso,
+            nivel=EvaluacionAdaptativa.NIVEL_CAT,
+            preguntas_json=[_pregunta_para_guardar(primera)],
+            generada_para=user,
+            contexto_d2r=contexto_d2r,
+            contexto_atencion={**contexto_atencion, "cat": {"theta": theta, "varianza": varianza, "finalizada": False}},
+        )
+        resultado = ResultadoEvaluacion.objects.create(
+            evaluacion=evaluacion,
+            estudiante=user,
+            respuestas_json=[],
+            puntaje=0,
+        )
+    return evaluacion, resultado
+
+
+def responder(user, evaluacion_id, respuesta):
+    """
+    Califica la respuesta a la última pregunta servida y decide si continuar.
+    Devuelve (evaluacion, resultado, correcta, finalizada). Lanza EvaluacionAdaptativa.DoesNotExist.
+    """
+    with transaction.atomic():
+        evaluacion = EvaluacionAdaptativa.objects.select_for_update().get(
+            id=evaluacion_id, generada_para=user, nivel=EvaluacionAdaptativa.NIVEL_CAT
+        )
+        resultado = ResultadoEvaluacion.objects.get(evaluacion=evaluacion, estudiante=user)
+        estado = dict((evaluacion.contexto_atencion or {}).get("cat") or {})
+        if estado.get("finalizada"):
+            return evaluacion, resultado, None, True
+
+        preguntas = list(evaluacion.preguntas_json or [])
+        respuestas = list(resultado.respuestas_json or [])
+        actual = preguntas[len(respuestas)]
+
+        enviada = normalizar_respuesta_correcta(respuesta)
+        correcta = enviada is not None and enviada == normalizar_respuesta_correcta(actual.get("correcta"))
+        respuestas.append(enviada)
+
+        theta, varianza = actualizar_con_respuestas(
+            estado["theta"], estado["varianza"], [actual["b"]], [1 if correcta else 0], deriva=0.0
+        )
+        estado.update(theta=theta, varianza=varianza)
+
+        n = len(respuestas)
+        convergio = n >= CAT_PREGUNTAS_MIN and math.sqrt(varianza) <= ERROR_ESTANDAR_OBJETIVO
+        siguiente = None
+        if not convergio and n < PREGUNTAS_MAX:
+            siguiente = siguiente_item(evaluacion.recurso, theta, servidas=[p.get("huella") for p in preguntas])
+
+        finalizada = siguiente is None
+        if siguiente is not None:
+            preguntas.append(_pregunta_para_guardar(siguiente))
+        estado["finalizada"] = finalizada
+
+        evaluacion.preguntas_json = preguntas
+        evaluacion.contexto_atencion = {**(evaluacion.contexto_atencion or {}), "cat": estado}
+        evaluacion.save(update_fields=["preguntas_json", "contexto_atencion"])
+
+        resultado.respuestas_json = respuestas
+        resultado.puntaje = resultado.puntaje + (1 if correcta else 0)
+        update_fields = ["respuestas_json", "puntaje"]
+        if finalizada:
+            total = len(respuestas)
+            porcentaje = round((resultado.puntaje / total) * 100, 2) if total else 0.0
+            resultado.analisis_ia = (
+                f"CAT: {int(resultado.puntaje)}/{total} ({porcentaje}%). Habilidad estimada: {theta:.2f}."
+            )
+            update_fields.append("analisis_ia")
+
+            # theta/varianza de este CAT parten del valor al iniciar; sobre la fila bloqueada se
+            # aplican sus respuestas para no pisar lo que otra evaluación haya actualizado entretanto
+            aciertos = [
+                1 if r is not None and r == normalizar_respuesta_correcta(p.get("correcta")) else 0
+                for p, r in zip(preguntas, respuestas)
+            ]
+            habilidad = HabilidadEstudiante.objects.select_for_update().get(
+                estudiante=user, recurso_id=evaluacion.recurso_id
+            )
+            habilidad.theta, habilidad.varianza = actualizar_con_respuestas(
+                habilidad.theta, habilidad.varianza, [p["b"] for p in preguntas[:total]], aciertos
+            )
+            habilidad.respuestas_acumuladas += total
+            habilidad.save(update_fields=["theta", "varianza", "respuestas_acumuladas", "actualizado"])
+        resultado.save(update_fields=update_fields)
+
+    return evaluacion, resultado, correcta, finalizada
@@ -0,0 +1,52 @@
+# backend/courses/expansion.py
+"""
+Soporte de ?expand= y ?fields= para la API del catálogo (cursos, módulos, recursos).
+
+- expand: rutas separadas por coma de los niveles anidados o campos pesados a incluir,
+  por ejemplo ?expand=modulos.recursos.preguntas o ?expand=modulos.recursos.contenido_texto
+- fields: campos de primer nivel a devolver, por ejemplo ?fields=id,nombre,icon
+
+Una expansión None significa "todo expandido" (representación completa).
+"""
+
+
+def parsear_lista(valor):
+    if valor is None:
+        return None
+    return {p.strip() for p in valor.split(',') if p.strip()}
+
+
+def expandido(expand, nombre):
+    """True si el campo 'nombre' (o algo debajo de él) fue pedido."""
+    if expand is None:
+        return True
+    return any(p == nombre or p.startswith(nombre + '.') for p in expand)
+
+
+def sub_expansion(expand, nombre):
+    """Rutas pedidas por debajo de 'nombre', relativas a él."""
+    if expand is None:
+        return None
+    prefijo = nombre + '.'
+    return {p[len(prefijo):] for p in expand if p.startswith(prefijo)}
+
+
+class ExpansionViewMixin:
+    """
+    Pone 'expand' y 'fields' en el contexto del serializer.
+
+    Si no se envía ?expand=, el listado usa la representación superficial y el
+    detalle la completa (así las pantallas de detalle siguen funcionando igual).
+    """
+
+    def obtener_expansion(self):
+        expand = parsear_lista(self.request.query_params.get('expand'))
+        if expand is None and self.action == 'list':
+            return set()
+        return expand
+
+    def get_serializer_context(self):
+        context = super().get_serializer_context()
+        context['expand'] = self.obtener_expansion()
+        context['fields'] = parsear_lista(self.request.query_params.get('fields'))
+        return context
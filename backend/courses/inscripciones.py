@@ -0,0 +1,148 @@
+# backend/courses/inscripciones.py
+"""
+Importación de listas de estudiantes (CSV) a un curso.
+
+Columnas: email (obligatoria), nombre, apellido, username, password.
+- Los emails que no existen se crean como estudiantes con un solo bulk_create; las
+  contraseñas se hashean en lote (users.contrasenas). Si la fila no trae password se
+  genera una y se devuelve en 'credenciales' para entregarla al estudiante.
+- Todas las inscripciones se insertan de una vez en la tabla intermedia del M2M.
+"""
+import csv
+import io
+import secrets
+
+from django.contrib.auth import get_user_model
+from django.core.exceptions import ValidationError as DjangoValidationError
+from django.core.validators import validate_email
+from django.db import transaction
+from django.db.models.functions import Lower
+
+from users.contrasenas import hashear_en_lote
+from .catalogo_cache import incrementar_version
+from .models import Curso
+
+User = get_user_model()
+
+MAX_FILAS = 5000
+
+# Nombres de columna aceptados -> campo
+COLUMNAS = {
+    'email': 'email', 'correo': 'email',
+    'nombre': 'first_name', 'first_name': 'first_name',
+    'apellido': 'last_name', 'last_name': 'last_name',
+    'username': 'username', 'usuario': 'username',
+    'password': 'password', 'contrasena': 'password', 'contraseña': 'password',
+}
+
+
+class ErrorImportacion(Exception):
+    pass
+
+
+def leer_csv(texto):
+    """Devuelve [(numero_fila, {campo: valor})]. Lanza ErrorImportacion si el archivo no sirve."""
+    lector = csv.DictReader(io.StringIO(texto.lstrip('\ufeff')))
+    if not lector.fieldnames:
+        raise ErrorImportacion('El archivo está vacío')
+    campos = {c: COLUMNAS.get(c.strip().lower()) for c in lector.fieldnames}
+    if 'email' not in campos.values():
+        raise ErrorImportacion('Falta la columna "email"')
+
+    filas = []
+    for numero, fila in enumerate(lector, start=2):
+        if len(filas) >= MAX_FILAS:
+            raise ErrorImportacion(f'Máximo {MAX_FILAS} estudiantes por archivo')
+        datos = {campo: (fila.get(col) or '').strip() for col, campo in campos.items() if campo}
+        if any(datos.values()):
+            filas.append((numero, datos))
+    return filas
+
+
+def importar_estudiantes(curso: Curso, texto: str) -> dict:
+    filas = leer_csv(texto)
+
+    errores = []
+    por_email = {}
+    for numero, datos in filas:
+        email = datos.get('email', '').lower()
+        try:
+            validate_email(email)
+        except DjangoValidationError:
+            errores.append({'fila': numero, 'error': f'Email inválido: "{email}"'})
+            continue
+        if email in por_email:
+            errores.append({'fila': numero, 'error': f'Email repetido en el archivo: {email}'})
+            continue
+        por_email[email] = (numero, datos)
+
+    existentes = {
+        u['email_normalizado']: u
+        for u in User.objects.annotate(email_normalizado=Lower('email'))
+        .filter(email_normalizado__in=list(por_email)).values('id', 'email_normalizado', 'rol')
+    }
+    for email, usuario in existentes.items():
+        if usuario['rol'] != 'estudiante':
+            numero, _ = por_email.pop(email)
+            errores.append({'fila': numero, 'error': f'{email} ya existe con rol "{usuario["rol"]}"'})
+
+    nuevos = {email: fila for email, fila in por_email.items() if email not in existentes}
+    usernames = {email: datos.get('username') or email for email, (_, datos) in nuevos.items()}
+    ocupados = set(User.objects.filter(username__in=list(usernames.values())).values_list('username', flat=True))
+    vistos = set()
+    for email, username in list(usernames.items()):
+        if username in ocupados or username in vistos:
+            numero, _ = nuevos.pop(email)
+            por_email.pop(email)
+            usernames.pop(email)
+            errores.append({'fila': numero, 'error': f'El username "{username}" ya está en uso'})
+        vistos.add(username)
+
+    credenciales = []
+    contrasenas = []
+    for email, (_, datos) in nuevos.items():
+        password = datos.get('password')
+        if not password:
+            password = secrets.token_urlsafe(9)
+            credenciales.append({'email': email, 'password': password})
+        contrasenas.append(password)
+    hashes = hashear_en_lote(contrasenas)
+
+    usuarios = [
+        User(
+            email=email,
+            username=usernames[email],
+            first_name=datos.get('first_name', '')[:150],
+            last_name=datos.get('last_name', '')[:150],
+            rol='estudiante',
+            password=hash_,
+        )
+        for (email, (_, datos)), hash_ in zip(nuevos.items(), hashes)
+    ]
+
+    Inscripcion = Curso.estudiantes.through
+    campo_usuario = Curso.estudiantes.field.m2m_reverse_field_name() + '_id'
+    with transaction.atomic():
+        User.objects.bulk_create(usuarios, batch_size=500)
+        ids = [u['id'] for u in existentes.values() if u['rol'] == 'estudiante']
+        ids += list(User.objects.filter(email__in=list(nuevos)).values_list('id', flat=True))
+        ya_inscritos = set(
+            Inscripcion.objects.filter(curso_id=curso.id, **{f'{campo_usuario}__in': ids})
+            .values_list(campo_usuario, flat=True)
+        )
+        Inscripcion.objects.bulk_create(
+            [Inscripcion(curso_id=curso.id, **{campo_usuario: i}) for i in ids if i not in ya_inscritos],
+            batch_size=1000,
+            ignore_conflicts=True,
+        )
+        # bulk_create no dispara m2m_changed: se hace aquí lo mismo que la señal
+        Curso.objects.filter(pk=curso.pk).actualizar_num_estudiantes()
+        incrementar_version()
+
+    return {
+        'creados': len(usuarios),
+        'inscritos': len(ids) - len(ya_inscritos),
+        'ya_inscritos': len(ya_inscritos),
+        'errores': sorted(errores, key=lambda e: e['fila']),
+        'credenciales': credenciales,
+    }
@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from courses.analisis_items import recalcular_estadisticas
+
+
+class Command(BaseCommand):
+    help = "Recalcula las estadísticas de ítem (dificultad, discriminación, distractores) de las evaluaciones adaptativas"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--recurso", type=int, default=None, help="Limitar el cálculo a un recurso")
+
+    def handle(self, *args, **options):
+        total = recalcular_estadisticas(recurso_id=options["recurso"])
+        self.stdout.write(self.style.SUCCESS(f"Estadísticas actualizadas para {total} preguntas"))
@@ -0,0 +1,24 @@
+from django.core.management.base import BaseCommand
+from django.db.models import Count
+
+from courses.evaluacion_cat import BANCO_MINIMO, asegurar_banco
+from courses.models import Recurso
+
+
+class Command(BaseCommand):
+    help = "Genera con la IA preguntas para los recursos cuyo banco no alcanza para una evaluación CAT"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--recurso", type=int, default=None, help="Limitar a un recurso")
+
+    def handle(self, *args, **options):
+        recursos = Recurso.objects.annotate(n=Count("estadisticas_preguntas")).filter(n__lt=BANCO_MINIMO)
+        if options["recurso"] is not None:
+            recursos = recursos.filter(pk=options["recurso"])
+
+        total = 0
+        for recurso in recursos.order_by("id"):
+            agregadas = asegurar_banco(recurso)
+            total += agregadas
+            self.stdout.write(f"{recurso.titulo}: {agregadas} preguntas nuevas")
+        self.stdout.write(self.style.SUCCESS(f"Banco completado con {total} preguntas"))
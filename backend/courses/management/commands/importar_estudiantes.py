@@ -0,0 +1,35 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from courses.inscripciones import ErrorImportacion, importar_estudiantes
+from courses.models import Curso
+
+
+class Command(BaseCommand):
+    help = "Crea e inscribe en un curso a los estudiantes de un CSV (email, nombre, apellido, username, password)"
+
+    def add_arguments(self, parser):
+        parser.add_argument("curso", type=int, help="Id del curso")
+        parser.add_argument("archivo", help="Ruta del CSV (UTF-8)")
+
+    def handle(self, *args, **options):
+        try:
+            curso = Curso.objects.get(pk=options["curso"])
+        except Curso.DoesNotExist:
+            raise CommandError(f"No existe el curso {options['curso']}")
+
+        with open(options["archivo"], encoding="utf-8-sig") as f:
+            texto = f.read()
+
+        try:
+            resultado = importar_estudiantes(curso, texto)
+        except ErrorImportacion as e:
+            raise CommandError(str(e))
+
+        for error in resultado["errores"]:
+            self.stderr.write(f"Fila {error['fila']}: {error['error']}")
+        for cred in resultado["credenciales"]:
+            self.stdout.write(f"{cred['email']},{cred['password']}")
+        self.stdout.write(self.style.SUCCESS(
+            f"{resultado['creados']} creados, {resultado['inscritos']} inscritos, "
+            f"{resultado['ya_inscritos']} ya inscritos, {len(resultado['errores'])} errores"
+        ))
@@ -0,0 +1,19 @@
+# Generated by Django 5.2.8 on 2026-10-19 11:21
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('courses', '0004_recursorecomendado_razon_recomendacion'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='recursorecomendado',
+            index=models.Index(fields=['estudiante', 'visto', '-prioridad', '-fecha_recomendacion'], name='recrec_est_visto_prio_idx'),
+        ),
+    ]
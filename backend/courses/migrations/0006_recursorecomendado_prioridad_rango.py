@@ -0,0 +1,42 @@
+# Generated by Django 5.2.8 on 2026-10-19 11:21
+
+from django.conf import settings
+from django.db import migrations, models
+
+PRIORIDAD_RANGO = {'alta': 0, 'media': 1, 'baja': 2}
+
+
+def rellenar_prioridad_rango(apps, schema_editor):
+    RecursoRecomendado = apps.get_model('courses', 'RecursoRecomendado')
+    # Un UPDATE por valor de prioridad; lo que no sea alta/baja queda en el default (media)
+    for prioridad, rango in PRIORIDAD_RANGO.items():
+        RecursoRecomendado.objects.filter(prioridad=prioridad).update(prioridad_rango=rango)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('courses', '0005_recursorecomendado_visto_idx'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AlterModelOptions(
+            name='recursorecomendado',
+            options={'ordering': ['prioridad_rango', '-fecha_recomendacion'], 'verbose_name': 'Recurso Recomendado por IA', 'verbose_name_plural': 'Recursos Recomendados por IA'},
+        ),
+        migrations.RemoveIndex(
+            model_name='recursorecomendado',
+            name='recrec_est_visto_prio_idx',
+        ),
+        migrations.AddField(
+            model_name='recursorecomendado',
+            name='prioridad_rango',
+            field=models.PositiveSmallIntegerField(default=1, editable=False),
+        ),
+        migrations.RunPython(rellenar_prioridad_rango, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='recursorecomendado',
+            index=models.Index(fields=['estudiante', 'visto', 'prioridad_rango', '-fecha_recomendacion'], name='recrec_est_visto_rango_idx'),
+        ),
+    ]
@@ -0,0 +1,37 @@
+# Generated by Django 5.2.8 on 2026-10-19 11:22
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('courses', '0006_recursorecomendado_prioridad_rango'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='EstadisticaPregunta',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('nivel', models.CharField(max_length=10)),
+                ('huella', models.CharField(max_length=40)),
+                ('texto_pregunta', models.TextField()),
+                ('opciones', models.JSONField(default=list)),
+                ('correcta', models.CharField(max_length=1)),
+                ('num_respuestas', models.PositiveIntegerField(default=0)),
+                ('dificultad', models.FloatField(blank=True, help_text='Proporción de aciertos (0-1)', null=True)),
+                ('discriminacion', models.FloatField(blank=True, help_text='Correlación ítem-resto (punto biserial)', null=True)),
+                ('frecuencias_opciones', models.JSONField(default=dict, help_text='Veces que se eligió cada opción')),
+                ('actualizado', models.DateTimeField(auto_now=True)),
+                ('recurso', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='estadisticas_preguntas', to='courses.recurso')),
+            ],
+            options={
+                'verbose_name': 'Estadística de Pregunta',
+                'verbose_name_plural': 'Estadísticas de Preguntas',
+                'ordering': ['recurso', 'nivel', 'dificultad'],
+                'constraints': [models.UniqueConstraint(fields=('recurso', 'nivel', 'huella'), name='estpreg_unica_por_recurso_nivel')],
+            },
+        ),
+    ]
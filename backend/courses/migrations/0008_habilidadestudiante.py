@@ -0,0 +1,33 @@
+# Generated by Django 5.2.8 on 2026-10-19 11:23
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('courses', '0007_estadisticapregunta'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='HabilidadEstudiante',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('theta', models.FloatField(default=0.0, help_text='Habilidad estimada')),
+                ('varianza', models.FloatField(default=1.0, help_text='Incertidumbre de la estimación')),
+                ('respuestas_acumuladas', models.PositiveIntegerField(default=0)),
+                ('actualizado', models.DateTimeField(auto_now=True)),
+                ('estudiante', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='habilidades', to=settings.AUTH_USER_MODEL)),
+                ('recurso', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='habilidades', to='courses.recurso')),
+            ],
+            options={
+                'verbose_name': 'Habilidad del Estudiante',
+                'verbose_name_plural': 'Habilidades de Estudiantes',
+                'constraints': [models.UniqueConstraint(fields=('estudiante', 'recurso'), name='habilidad_unica_por_recurso')],
+            },
+        ),
+    ]
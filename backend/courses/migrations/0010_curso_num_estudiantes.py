@@ -0,0 +1,30 @@
+# Generated by Django 5.2.8 on 2026-10-19 11:40
+
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def rellenar_num_estudiantes(apps, schema_editor):
+    Curso = apps.get_model('courses', 'Curso')
+    inscritos = (
+        Curso.estudiantes.through.objects.filter(curso_id=OuterRef('pk'))
+        .values('curso_id').annotate(n=Count('pk')).values('n')[:1]
+    )
+    Curso.objects.update(num_estudiantes=Coalesce(Subquery(inscritos), 0))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('courses', '0009_versioncatalogo'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='curso',
+            name='num_estudiantes',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.RunPython(rellenar_num_estudiantes, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,42 @@
+# Generated by Django 5.2.8 on 2026-10-19 12:21
+
+import math
+
+from django.db import migrations, models
+
+DIFICULTAD_NIVEL = {'Fácil': -1.0, 'Medio': 0.0, 'Difícil': 1.0}
+RESPUESTAS_MINIMAS = 5
+
+
+def rellenar_dificultad_valor(apps, schema_editor):
+    EstadisticaPregunta = apps.get_model('courses', 'EstadisticaPregunta')
+    # Ítems sin estadísticas suficientes: un UPDATE por nivel
+    for nivel, valor in DIFICULTAD_NIVEL.items():
+        EstadisticaPregunta.objects.filter(nivel=nivel).update(dificultad_valor=valor)
+
+    # Con estadísticas: logit de la proporción de aciertos (como analisis_items.dificultad_logit)
+    empiricas = EstadisticaPregunta.objects.filter(
+        num_respuestas__gte=RESPUESTAS_MINIMAS, dificultad__isnull=False
+    ).only('id', 'dificultad')
+    objetos = []
+    for estadistica in empiricas.iterator(chunk_size=1000):
+        p = min(max(estadistica.dificultad, 0.02), 0.98)
+        estadistica.dificultad_valor = math.log((1.0 - p) / p)
+        objetos.append(estadistica)
+    EstadisticaPregunta.objects.bulk_update(objetos, ['dificultad_valor'], batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('courses', '0010_curso_num_estudiantes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='estadisticapregunta',
+            name='dificultad_valor',
+            field=models.FloatField(default=0.0, help_text='Dificultad en logits: empírica o la del nivel'),
+        ),
+        migrations.RunPython(rellenar_dificultad_valor, migrations.RunPython.noop),
+    ]
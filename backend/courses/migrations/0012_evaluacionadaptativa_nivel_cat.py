@@ -0,0 +1,18 @@
+# Generated by Django 5.2.8 on 2026-10-19 12:22
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('courses', '0011_estadisticapregunta_dificultad_valor'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='evaluacionadaptativa',
+            name='nivel',
+            field=models.CharField(choices=[('facil', 'Fácil - 5 preguntas'), ('medio', 'Medio - 10 preguntas'), ('dificil', 'Difícil - 15 preguntas'), ('CAT', 'Adaptativa ítem a ítem (CAT)')], max_length=10),
+        ),
+    ]
@@ -1,8 +1,31 @@
 from django.db import models
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
 from django.conf import settings
 
 # --- MODELOS BASE DEL CURSO ---
 
+class CursoQuerySet(models.QuerySet):
+    def inscrito(self, user):
+        return self.filter(estudiantes=user)
+
+    def visibles_para(self, user):
+        # Admin ve todo; docente, los cursos que dicta; estudiante, aquellos en los que está inscrito
+        if user.is_staff or getattr(user, 'rol', '') == 'admin':
+            return self.all()
+        if getattr(user, 'rol', '') == 'docente':
+            return self.filter(profesor=user)
+        return self.inscrito(user)
+
+    def actualizar_num_estudiantes(self):
+        """Recalcula num_estudiantes de estos cursos con un solo UPDATE."""
+        inscritos = (
+            Curso.estudiantes.through.objects.filter(curso_id=OuterRef('pk'))
+            .values('curso_id').annotate(n=Count('pk')).values('n')[:1]
+        )
+        return self.update(num_estudiantes=Coalesce(Subquery(inscritos), 0))
+
+
 class Curso(models.Model):
     nombre = models.CharField(max_length=200)
     descripcion = models.TextField(blank=True)
@@ -24,9 +47,14 @@ class Curso(models.Model):
         limit_choices_to={'rol': 'estudiante'}
     )
 
+    # Contador de inscripciones, mantenido por la señal m2m_changed de 'estudiantes'
+    num_estudiantes = models.PositiveIntegerField(default=0, editable=False)
+
     creado_en = models.DateTimeField(auto_now_add=True)
     activo = models.BooleanField(default=True)
 
+    objects = CursoQuerySet.as_manager()
+
     def __str__(self):
         return self.nombre
 
@@ -88,10 +116,14 @@ class EvaluacionAdaptativa(models.Model):
     """
     Evaluación generada dinámicamente por la IA según el nivel del estudiante
     """
+    # Evaluación adaptativa ítem a ítem (CAT): preguntas_json guarda solo las preguntas ya servidas
+    NIVEL_CAT = 'CAT'
+
     NIVEL_CHOICES = [
         ('facil', 'Fácil - 5 preguntas'),
         ('medio', 'Medio - 10 preguntas'),
         ('dificil', 'Difícil - 15 preguntas'),
+        (NIVEL_CAT, 'Adaptativa ítem a ítem (CAT)'),
     ]
 
     recurso = models.ForeignKey(Recurso, on_delete=models.CASCADE, related_name='evaluaciones_adaptativas')
@@ -116,6 +148,18 @@ class EvaluacionAdaptativa(models.Model):
         return f"Eval {self.nivel} - {self.recurso.titulo} ({self.generada_para.email})"
 
 
+class ResultadoEvaluacionQuerySet(models.QuerySet):
+    def terminados(self):
+        """
+        Excluye los CAT en curso o abandonados: evaluacion_cat.iniciar crea el resultado vacío
+        y solo queda completo cuando contexto_atencion["cat"]["finalizada"] pasa a True.
+        """
+        return self.exclude(
+            models.Q(evaluacion__nivel=EvaluacionAdaptativa.NIVEL_CAT)
+            & ~models.Q(evaluacion__contexto_atencion__cat__finalizada=True)
+        )
+
+
 class ResultadoEvaluacion(models.Model):
     """
     Resultado de una evaluación adaptativa realizada por el estudiante
@@ -134,6 +178,8 @@ class ResultadoEvaluacion(models.Model):
     fecha_realizacion = models.DateTimeField(auto_now_add=True)
     intento_numero = models.IntegerField(default=1, help_text="Número de intento para este recurso")
 
+    objects = ResultadoEvaluacionQuerySet.as_manager()
+
     class Meta:
         ordering = ['-fecha_realizacion']
         verbose_name = 'Resultado de Evaluación'
@@ -160,11 +206,16 @@ class RecursoRecomendado(models.Model):
         ('baja', 'Baja - Contenido complementario'),
     ]
 
+    # Rango numérico de la prioridad (menor = más urgente). "prioridad" es texto y
+    # ordenarlo da media > baja > alta, así que se ordena e indexa por este rango.
+    PRIORIDAD_RANGO = {'alta': 0, 'media': 1, 'baja': 2}
+
     estudiante = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='recursos_recomendados')
     recurso_original = models.ForeignKey(Recurso, on_delete=models.CASCADE, related_name='recomendaciones_generadas')
 
     tipo = models.CharField(max_length=20, choices=TIPO_CHOICES)
     prioridad = models.CharField(max_length=10, choices=PRIORIDAD_CHOICES, default='media')
+    prioridad_rango = models.PositiveSmallIntegerField(default=1, editable=False)
 
     titulo = models.CharField(max_length=200)
     descripcion = models.TextField()
@@ -178,11 +229,22 @@ class RecursoRecomendado(models.Model):
     razon_recomendacion = models.TextField(blank=True, null=True, help_text="Explicación de por qué se recomendó")
 
     class Meta:
-        ordering = ['-prioridad', '-fecha_recommendacion'] if hasattr(models, 'fecha_recommendacion') else ['-prioridad'] # Pequeño fix por si acaso
-        ordering = ['-prioridad', '-fecha_recomendacion']
+        ordering = ['prioridad_rango', '-fecha_recomendacion']
+        indexes = [
+            # Sirve la consulta "top 10 no vistos" de recursos_recomendados como un
+            # recorrido de rango del índice, con las prioridades altas primero
+            models.Index(
+                fields=['estudiante', 'visto', 'prioridad_rango', '-fecha_recomendacion'],
+                name='recrec_est_visto_rango_idx',
+            ),
+        ]
         verbose_name = 'Recurso Recomendado por IA'
         verbose_name_plural = 'Recursos Recomendados por IA'
 
+    def save(self, *args, **kwargs):
+        self.prioridad_rango = self.PRIORIDAD_RANGO.get(self.prioridad, self.PRIORIDAD_RANGO['media'])
+        super().save(*args, **kwargs)
+
     def __str__(self):
         return f"{self.tipo} - {self.titulo} (Prioridad: {self.prioridad})"
 
@@ -209,3 +271,79 @@ class EvolucionEstudiante(models.Model):
 
     def __str__(self):
         return f"{self.estudiante.email} - {self.recurso.titulo} ({self.puntaje_evaluacion}%)"
+
+
+class EstadisticaPregunta(models.Model):
+    """
+    Estadísticas de ítem (dificultad, discriminación y distractores) de una pregunta generada,
+    agregadas sobre todos los intentos de un recurso y nivel. Se recalculan en lote.
+    """
+    recurso = models.ForeignKey(Recurso, on_delete=models.CASCADE, related_name='estadisticas_preguntas')
+    nivel = models.CharField(max_length=10)
+
+    # Huella del ítem: texto + opciones en orden + respuesta correcta
+    huella = models.CharField(max_length=40)
+    texto_pregunta = models.TextField()
+    opciones = models.JSONField(default=list)
+    correcta = models.CharField(max_length=1)
+
+    num_respuestas = models.PositiveIntegerField(default=0)
+    dificultad = models.FloatField(null=True, blank=True, help_text="Proporción de aciertos (0-1)")
+    discriminacion = models.FloatField(null=True, blank=True, help_text="Correlación ítem-resto (punto biserial)")
+    frecuencias_opciones = models.JSONField(default=dict, help_text="Veces que se eligió cada opción")
+    # Dificultad b en logits (Rasch) con la que el modo CAT elige la siguiente pregunta en SQL
+    dificultad_valor = models.FloatField(default=0.0, help_text="Dificultad en logits: empírica o la del nivel")
+
+    actualizado = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        ordering = ['recurso', 'nivel', 'dificultad']
+        constraints = [
+            models.UniqueConstraint(fields=['recurso', 'nivel', 'huella'], name='estpreg_unica_por_recurso_nivel'),
+        ]
+        verbose_name = 'Estadística de Pregunta'
+        verbose_name_plural = 'Estadísticas de Preguntas'
+
+    def __str__(self):
+        return f"{self.recurso.titulo} [{self.nivel}] p={self.dificultad}"
+
+
+class HabilidadEstudiante(models.Model):
+    """
+    Estimación de habilidad (escala logit, modelo de Rasch) de un estudiante en un recurso.
+    Se actualiza de forma incremental con cada evaluación calificada.
+    """
+    estudiante = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='habilidades')
+    recurso = models.ForeignKey(Recurso, on_delete=models.CASCADE, related_name='habilidades')
+
+    theta = models.FloatField(default=0.0, help_text="Habilidad estimada")
+    varianza = models.FloatField(default=1.0, help_text="Incertidumbre de la estimación")
+    respuestas_acumuladas = models.PositiveIntegerField(default=0)
+
+    actualizado = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['estudiante', 'recurso'], name='habilidad_unica_por_recurso'),
+        ]
+        verbose_name = 'Habilidad del Estudiante'
+        verbose_name_plural = 'Habilidades de Estudiantes'
+
+    def __str__(self):
+        return f"{self.estudiante.email} - {self.recurso.titulo} (θ={self.theta:.2f})"
+
+
+class VersionCatalogo(models.Model):
+    """
+    Contador global de versión del catálogo (Curso, Modulo, Recurso, PreguntaVideo).
+    Lo incrementan las señales de guardado/borrado; se usa para los ETag y la caché de cursos.
+    """
+    version = models.PositiveBigIntegerField(default=1)
+    actualizado = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name = 'Versión del Catálogo'
+        verbose_name_plural = 'Versión del Catálogo'
+
+    def __str__(self):
+        return f"v{self.version}"
@@ -0,0 +1,126 @@
+# backend/courses/motor_adaptativo.py
+"""
+Motor adaptativo de evaluaciones basado en una estimación de habilidad por estudiante y recurso.
+
+Usa el modelo de Rasch: P(acierto) = 1 / (1 + exp(-(theta - b))), donde b es la dificultad del ítem.
+Tras cada evaluación calificada la habilidad se actualiza con un paso bayesiano (tipo Elo con
+K = varianza posterior). Para la siguiente evaluación se elige el nivel cuya dificultad da más
+información sobre el estudiante y el menor número de preguntas que alcanza la precisión objetivo.
+"""
+from __future__ import annotations
+
+import math
+
+from django.db import transaction
+
+from .analisis_items import DIFICULTAD_NIVEL, huella_pregunta
+from .models import EstadisticaPregunta, HabilidadEstudiante
+from .views_evaluaciones import normalizar_respuesta_correcta
+
+# Habilidad inicial según el nivel de atención en videos (solo como punto de partida)
+THETA_INICIAL = {"alta": 0.5, "media": 0.0, "baja": -0.5}
+VARIANZA_INICIAL = 1.0
+
+# Incertidumbre que se añade antes de cada actualización: la habilidad cambia con el tiempo
+DERIVA = 0.1
+
+ERROR_ESTANDAR_OBJETIVO = 0.55
+PREGUNTAS_MIN = 5
+PREGUNTAS_MAX = 15
+
+
+def probabilidad_acierto(theta: float, b: float) -> float:
+    return 1.0 / (1.0 + math.exp(-(theta - b)))
+
+
+def obtener_habilidad(user, recurso, nivel_atencion="media") -> HabilidadEstudiante:
+    habilidad, _ = HabilidadEstudiante.objects.get_or_create(
+        estudiante=user,
+        recurso=recurso,
+        defaults={
+            "theta": THETA_INICIAL.get(nivel_atencion, 0.0),
+            "varianza": VARIANZA_INICIAL,
+        },
+    )
+    return habilidad
+
+
+def elegir_dificultad(theta: float) -> str:
+    """Nivel cuya dificultad está más cerca de theta (máxima información de Fisher)."""
+    return min(DIFICULTAD_NIVEL, key=lambda nivel: abs(DIFICULTAD_NIVEL[nivel] - theta))
+
+
+def preguntas_necesarias(theta: float, varianza: float, dificultad: str) -> int:
+    """Menor número de preguntas del nivel que deja el error estándar por debajo del objetivo."""
+    p = probabilidad_acierto(theta, DIFICULTAD_NIVEL[dificultad])
+    info_por_item = p * (1.0 - p)
+    precision_objetivo = 1.0 / ERROR_ESTANDAR_OBJETIVO ** 2
+    precision_actual = 1.0 / (varianza + DERIVA)
+
+    faltante = max(0.0, precision_objetivo - precision_actual)
+    n = math.ceil(faltante / info_por_item) if info_por_item > 0 else PREGUNTAS_MAX
+    return max(PREGUNTAS_MIN, min(PREGUNTAS_MAX, n))
+
+
+def planificar_evaluacion(habilidad: HabilidadEstudiante) -> tuple[str, int]:
+    dificultad = elegir_dificultad(habilidad.theta)
+    return dificultad, preguntas_necesarias(habilidad.theta, habilidad.varianza, dificultad)
+
+
+def _dificultades_items(evaluacion, preguntas) -> list[float]:
+    """Dificultad de cada pregunta: la guardada en el banco (EstadisticaPregunta), si no la del nivel."""
+    base = DIFICULTAD_NIVEL.get(evaluacion.nivel, 0.0)
+    huellas = [huella_pregunta(p) if isinstance(p, dict) else "" for p in preguntas]
+
+    guardadas = dict(
+        EstadisticaPregunta.objects.filter(
+            recurso_id=evaluacion.recurso_id,
+            nivel=evaluacion.nivel,
+            huella__in=[h for h in huellas if h],
+        ).values_list("huella", "dificultad_valor")
+    )
+    return [guardadas.get(h, base) for h in huellas]
+
+
+def actualizar_con_respuestas(theta, varianza, dificultades, aciertos, deriva=DERIVA) -> tuple[float, float]:
+    """
+    Un paso bayesiano (Laplace) sobre la habilidad con las respuestas calificadas.
+    aciertos: lista de 0/1 alineada con dificultades.
+    """
+    varianza = varianza + deriva
+    residuo = 0.0
+    informacion = 0.0
+    for b, x in zip(dificultades, aciertos):
+        p = probabilidad_acierto(theta, b)
+        residuo += x - p
+        informacion += p * (1.0 - p)
+
+    varianza_post = 1.0 / (1.0 / varianza + informacion)
+    return theta + varianza_post * residuo, varianza_post
+
+
+def actualizar_habilidad(user, evaluacion, respuestas) -> HabilidadEstudiante:
+    """Actualiza la habilidad del estudiante en el recurso de la evaluación con un intento calificado."""
+    preguntas = evaluacion.preguntas_json or []
+    respuestas = respuestas if isinstance(respuestas, list) else []
+
+    dificultades = []
+    aciertos = []
+    for b, pregunta, resp in zip(_dificultades_items(evaluacion, preguntas), preguntas, respuestas):
+        enviada = normalizar_respuesta_correcta(resp)
+        if enviada is None or not isinstance(pregunta, dict):
+            continue
+        dificultades.append(b)
+        aciertos.append(1 if enviada == normalizar_respuesta_correcta(pregunta.get("correcta")) else 0)
+
+    with transaction.atomic():
+        obtener_habilidad(user, evaluacion.recurso, (evaluacion.contexto_atencion or {}).get("nivel", "media"))
+        habilidad = HabilidadEstudiante.objects.select_for_update().get(estudiante=user, recurso=evaluacion.recurso)
+        if aciertos:
+            habilidad.theta, habilidad.varianza = actualizar_con_respuestas(
+                habilidad.theta, habilidad.varianza, dificultades, aciertos
+            )
+            habilidad.respuestas_acumuladas += len(aciertos)
+            habilidad.save(update_fields=["theta", "varianza", "respuestas_acumuladas", "actualizado"])
+
+    return habilidad
@@ -0,0 +1,90 @@
+# backend/courses/resumenes.py
+"""
+Piezas de estado del estudiante compartidas por varios endpoints (recursos recomendados,
+evaluaciones adaptativas y /api/bootstrap/), cada una con un costo fijo de consultas:
+
+- nivel_atencion: promedio de las últimas sesiones, en la caché compartida hasta la
+  próxima sesión registrada (la invalida signals.py; en una caché por proceso los demás
+  workers seguirían usando el nivel viejo para generar evaluaciones)
+- cursos_resumen: cursos visibles para el usuario, en caché por versión del catálogo
+  (inscribir, crear o editar un curso incrementa la versión)
+- recomendaciones_pendientes: recursos recomendados sin ver (una consulta; se marcan
+  vistos con UPDATE directos, sin señales que permitan invalidar una caché)
+"""
+from django.core.cache import cache
+
+from core.cache_compartida import cache_compartida
+
+from .models import Curso, RecursoRecomendado
+
+CACHE_TIMEOUT = 60 * 60
+SESIONES_NIVEL = 5
+MAX_RECOMENDACIONES = 10
+
+
+def _clave_atencion(user_id):
+    return f"resumen:atencion:{user_id}"
+
+
+def invalidar_nivel_atencion(user_id):
+    cache_compartida.delete(_clave_atencion(user_id))
+
+
+def nivel_atencion(user):
+    """(nivel, promedio) de las últimas SESIONES_NIVEL sesiones; ('media', 50.0) si no hay."""
+    from evaluaciones.models import SesionAtencion
+
+    clave = _clave_atencion(user.pk)
+    guardado = cache_compartida.get(clave)
+    if guardado is not None:
+        return tuple(guardado)
+
+    porcentajes = list(
+        SesionAtencion.objects.filter(estudiante=user).order_by("-fecha")
+        .values_list("porcentaje_atencion", flat=True)[:SESIONES_NIVEL]
+    )
+    if not porcentajes:
+        resultado = ("media", 50.0)
+    else:
+        promedio = sum(float(p) for p in porcentajes) / len(porcentajes)
+        if promedio >= 75:
+            nivel = "alta"
+        elif promedio >= 50:
+            nivel = "media"
+        else:
+            nivel = "baja"
+        resultado = (nivel, round(float(promedio), 2))
+
+    cache_compartida.set(clave, resultado, CACHE_TIMEOUT)
+    return resultado
+
+
+def cursos_resumen(user, version):
+    """Resumen (sin módulos) de los cursos visibles para el usuario en la versión del catálogo dada."""
+    clave = f"resumen:cursos:{user.pk}:v{version.version}"
+    cursos = cache.get(clave)
+    if cursos is None:
+        cursos = list(
+            Curso.objects.visibles_para(user).filter(activo=True).order_by("id")
+            .values("id", "nombre", "descripcion", "icon", "profesor_id", "num_estudiantes")
+        )
+        cache.set(clave, cursos, CACHE_TIMEOUT)
+    return cursos
+
+
+def recomendaciones_pendientes(user, limite=MAX_RECOMENDACIONES):
+    return [
+        {
+            "id": rec.id,
+            "titulo": rec.titulo,
+            "descripcion": rec.descripcion,
+            "tipo": rec.tipo,
+            "prioridad": rec.prioridad,
+            "visto": rec.visto,
+            "url": getattr(rec, "url", None),
+            "tema": getattr(rec, "tema", None),
+            "razon_recomendacion": getattr(rec, "razon_recomendacion", None),
+        }
+        for rec in RecursoRecomendado.objects.filter(estudiante=user, visto=False)
+        .order_by("prioridad_rango", "-fecha_recomendacion")[:limite]
+    ]
@@ -1,6 +1,44 @@
 from rest_framework import serializers
+from .expansion import expandido, sub_expansion
 from .models import Curso, Modulo, Recurso, PreguntaVideo
 
+_SIN_DEFINIR = object()
+
+
+class ExpandibleSerializerMixin:
+    """
+    Quita los campos de 'campos_expandibles' que no se pidieron en context['expand']
+    y propaga la sub-expansión a los serializers anidados. En el primer nivel
+    aplica además context['fields'].
+    """
+    campos_expandibles = ()
+    _expand = _SIN_DEFINIR
+
+    def _es_raiz(self):
+        parent = self.parent
+        return parent is None or (isinstance(parent, serializers.ListSerializer) and parent.parent is None)
+
+    def get_fields(self):
+        fields = super().get_fields()
+        es_raiz = self._es_raiz()
+        expand = self.context.get('expand') if self._expand is _SIN_DEFINIR else self._expand
+
+        for nombre in self.campos_expandibles:
+            if not expandido(expand, nombre):
+                fields.pop(nombre, None)
+
+        for nombre, field in fields.items():
+            hijo = getattr(field, 'child', field)
+            if isinstance(hijo, ExpandibleSerializerMixin):
+                hijo._expand = sub_expansion(expand, nombre)
+
+        solo = self.context.get('fields') if es_raiz else None
+        if solo:
+            fields = {nombre: field for nombre, field in fields.items() if nombre in solo or nombre == 'id'}
+
+        return fields
+
+
 class PreguntaVideoSerializer(serializers.ModelSerializer):
     # Creamos un campo calculado para devolver las opciones como una lista limpia
     opciones = serializers.SerializerMethodField()
@@ -18,33 +56,45 @@ class PreguntaVideoSerializer(serializers.ModelSerializer):
             opts.append(obj.opcion_d)
         return opts
 
-class RecursoSerializer(serializers.ModelSerializer):
+class RecursoSerializer(ExpandibleSerializerMixin, serializers.ModelSerializer):
     # Incrustamos las preguntas dentro del recurso automáticamente
     # Esto es clave para que el SmartVideo funcione sin hacer peticiones extra
     preguntas = PreguntaVideoSerializer(many=True, read_only=True)
 
+    # Las preguntas y el texto de las lecturas solo se envían si se piden (?expand=)
+    campos_expandibles = ('preguntas', 'contenido_texto')
+
     class Meta:
         model = Recurso
         fields = '__all__'
 
-class ModuloSerializer(serializers.ModelSerializer):
+class ModuloSerializer(ExpandibleSerializerMixin, serializers.ModelSerializer):
     # Incrusta la lista de recursos dentro de cada módulo
     recursos = RecursoSerializer(many=True, read_only=True)
 
+    campos_expandibles = ('recursos',)
+
     class Meta:
         model = Modulo
         fields = ['id', 'nombre', 'orden', 'recursos', 'curso']
 
-class CursoSerializer(serializers.ModelSerializer):
+class CursoSerializer(ExpandibleSerializerMixin, serializers.ModelSerializer):
     # Campo calculado para obtener el nombre del profesor de forma segura
     nombre_profesor = serializers.SerializerMethodField()
 
     # Incrusta la lista de módulos completos dentro del curso
     modulos = ModuloSerializer(many=True, read_only=True)
 
+    # La lista de ids de estudiantes puede ser enorme: en listados solo va num_estudiantes
+    campos_expandibles = ('modulos', 'estudiantes')
+
     class Meta:
         model = Curso
-        fields = ['id', 'nombre', 'descripcion', 'icon', 'profesor', 'nombre_profesor', 'estudiantes', 'modulos', 'activo', 'creado_en']
+        fields = [
+            'id', 'nombre', 'descripcion', 'icon', 'profesor', 'nombre_profesor',
+            'estudiantes', 'num_estudiantes', 'modulos', 'activo', 'creado_en',
+        ]
+        read_only_fields = ('num_estudiantes',)
 
     def get_nombre_profesor(self, obj):
         if obj.profesor:
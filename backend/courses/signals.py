@@ -0,0 +1,45 @@
+# backend/courses/signals.py
+from django.db.models.signals import m2m_changed, post_delete, post_save
+from django.dispatch import receiver
+
+from evaluaciones.models import SesionAtencion
+from .catalogo_cache import incrementar_version
+from .models import Curso, Modulo, PreguntaVideo, Recurso
+from .resumenes import invalidar_nivel_atencion
+
+
+@receiver(post_save, sender=Curso)
+@receiver(post_delete, sender=Curso)
+@receiver(post_save, sender=Modulo)
+@receiver(post_delete, sender=Modulo)
+@receiver(post_save, sender=Recurso)
+@receiver(post_delete, sender=Recurso)
+@receiver(post_save, sender=PreguntaVideo)
+@receiver(post_delete, sender=PreguntaVideo)
+def catalogo_modificado(sender, **kwargs):
+    incrementar_version()
+
+
+@receiver(m2m_changed, sender=Curso.estudiantes.through)
+def inscripciones_modificadas(sender, instance, action, reverse, pk_set, **kwargs):
+    # Desde el lado del usuario (user.cursos_inscritos.clear()) post_clear no trae los cursos
+    if action == 'pre_clear' and reverse:
+        instance._cursos_antes_de_clear = list(instance.cursos_inscritos.values_list('id', flat=True))
+        return
+    if action not in ('post_add', 'post_remove', 'post_clear'):
+        return
+
+    if reverse:
+        cursos = pk_set if pk_set is not None else getattr(instance, '_cursos_antes_de_clear', [])
+    else:
+        cursos = [instance.pk]
+    Curso.objects.filter(pk__in=cursos).actualizar_num_estudiantes()
+
+    # La lista de estudiantes forma parte de la representación del curso
+    incrementar_version()
+
+
+@receiver(post_save, sender=SesionAtencion)
+@receiver(post_delete, sender=SesionAtencion)
+def sesion_atencion_modificada(sender, instance, **kwargs):
+    invalidar_nivel_atencion(instance.estudiante_id)
@@ -0,0 +1,645 @@
+import json
+import logging
+import math
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import connection
+from django.test import override_settings
+import numpy as np
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APITestCase
+
+from core.registro import FormatoJSON, IdPeticionFilter, MuestreoFilter
+
+from .analisis_items import (
+    calcular_estadisticas, construir_matriz, es_problematica, filtro_no_problematicas, recalcular_estadisticas,
+)
+from .evaluacion_cat import BANCO_MINIMO, siguiente_item
+from .models import (
+    Curso, EstadisticaPregunta, EvaluacionAdaptativa, HabilidadEstudiante, Modulo, PreguntaVideo, Recurso,
+    RecursoRecomendado, ResultadoEvaluacion,
+)
+from .motor_adaptativo import (
+    PREGUNTAS_MAX, PREGUNTAS_MIN, actualizar_con_respuestas, planificar_evaluacion, probabilidad_acierto,
+)
+
+User = get_user_model()
+
+
+class CursoViewSetQueryCountTests(APITestCase):
+    """El listado de cursos debe armar el árbol anidado en un número fijo de consultas."""
+
+    def setUp(self):
+        cache.clear()
+        self.profesor = User.objects.create_user(
+            email='profe@test.com', username='profe', password='x', rol='docente', first_name='Ana'
+        )
+        self.estudiante = User.objects.create_user(
+            email='est@test.com', username='est', password='x', rol='estudiante'
+        )
+        self.client.force_authenticate(self.estudiante)
+
+    def crear_curso(self, n):
+        curso = Curso.objects.create(nombre=f'Curso {n}', profesor=self.profesor)
+        curso.estudiantes.add(self.estudiante)
+        for m in range(2):
+            modulo = Modulo.objects.create(curso=curso, nombre=f'Módulo {m}', orden=m)
+            for r in range(2):
+                recurso = Recurso.objects.create(modulo=modulo, titulo=f'Recurso {r}', tipo='video')
+                PreguntaVideo.objects.create(
+                    recurso=recurso, segundo=10, texto_pregunta='¿?', opcion_a='a', opcion_b='b'
+                )
+
+    def contar_consultas(self, url='/api/cursos/?expand=modulos.recursos.preguntas,estudiantes'):
+        cache.clear()  # medir la serialización, no la caché de cursos
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        return len(ctx.captured_queries), response.json()['results']
+
+    def test_consultas_constantes_al_crecer_el_catalogo(self):
+        self.crear_curso(1)
+        consultas_uno, data = self.contar_consultas()
+        self.assertEqual(len(data), 1)
+
+        for n in range(2, 6):
+            self.crear_curso(n)
+        consultas_cinco, data = self.contar_consultas()
+
+        self.assertEqual(len(data), 5)
+        self.assertEqual(consultas_uno, consultas_cinco)
+
+    def test_listado_paginado_por_cursor(self):
+        for n in range(1, 4):
+            self.crear_curso(n)
+        primera = self.client.get('/api/cursos/?page_size=2').json()
+        self.assertEqual([c['nombre'] for c in primera['results']], ['Curso 1', 'Curso 2'])
+
+        segunda = self.client.get(primera['next']).json()
+        self.assertEqual([c['nombre'] for c in segunda['results']], ['Curso 3'])
+        self.assertIsNone(segunda['next'])
+
+    def test_modulos_paginados_por_id_sin_offset(self):
+        for n in range(1, 4):
+            self.crear_curso(n)
+        ids, url = [], '/api/modulos/?page_size=2'
+        while url:
+            with CaptureQueriesContext(connection) as ctx:
+                pagina = self.client.get(url).json()
+            self.assertFalse([c for c in ctx.captured_queries if 'OFFSET' in c['sql']])
+            ids += [m['id'] for m in pagina['results']]
+            url = pagina['next']
+        self.assertEqual(ids, sorted(Modulo.objects.values_list('id', flat=True)))
+
+    def test_arbol_anidado_completo(self):
+        self.crear_curso(1)
+        _, data = self.contar_consultas()
+
+        curso = data[0]
+        self.assertEqual(curso['nombre_profesor'], 'Ana')
+        self.assertEqual(curso['estudiantes'], [self.estudiante.id])
+        self.assertEqual(len(curso['modulos']), 2)
+        self.assertEqual(len(curso['modulos'][0]['recursos']), 2)
+        self.assertEqual(len(curso['modulos'][0]['recursos'][0]['preguntas']), 1)
+
+
+class CatalogoExpansionTests(APITestCase):
+    """?expand= y ?fields= en el catálogo: listado superficial por defecto, detalle completo."""
+
+    def setUp(self):
+        cache.clear()
+        self.estudiante = User.objects.create_user(
+            email='est@test.com', username='est', password='x', rol='estudiante'
+        )
+        self.client.force_authenticate(self.estudiante)
+        self.curso = Curso.objects.create(nombre='Curso')
+        self.curso.estudiantes.add(self.estudiante)
+        modulo = Modulo.objects.create(curso=self.curso, nombre='Módulo')
+        self.recurso = Recurso.objects.create(
+            modulo=modulo, titulo='Lectura', tipo='lectura', contenido_texto='texto largo ' * 100
+        )
+        PreguntaVideo.objects.create(
+            recurso=self.recurso, segundo=5, texto_pregunta='¿?', opcion_a='a', opcion_b='b'
+        )
+
+    def test_listado_superficial_por_defecto(self):
+        data = self.client.get('/api/cursos/').json()['results']
+        self.assertNotIn('modulos', data[0])
+
+    def test_expand_anidado(self):
+        data = self.client.get('/api/cursos/?expand=modulos.recursos').json()['results']
+        recurso = data[0]['modulos'][0]['recursos'][0]
+        self.assertEqual(recurso['titulo'], 'Lectura')
+        self.assertNotIn('contenido_texto', recurso)
+        self.assertNotIn('preguntas', recurso)
+
+    def test_fields_limita_el_primer_nivel(self):
+        data = self.client.get('/api/cursos/?fields=nombre').json()['results']
+        self.assertEqual(set(data[0]), {'id', 'nombre'})
+
+    def test_detalle_completo_por_defecto(self):
+        data = self.client.get(f'/api/recursos/{self.recurso.id}/').json()
+        self.assertIn('contenido_texto', data)
+        self.assertEqual(len(data['preguntas']), 1)
+
+        data = self.client.get(f'/api/cursos/{self.curso.id}/').json()
+        self.assertIn('preguntas', data['modulos'][0]['recursos'][0])
+
+
+class CatalogoCondicionalTests(APITestCase):
+    """ETag / 304 del catálogo e invalidación por versión al modificar el contenido."""
+
+    def setUp(self):
+        cache.clear()
+        self.estudiante = User.objects.create_user(
+            email='est@test.com', username='est', password='x', rol='estudiante'
+        )
+        self.client.force_authenticate(self.estudiante)
+        self.curso = Curso.objects.create(nombre='Curso')
+        self.curso.estudiantes.add(self.estudiante)
+        self.modulo = Modulo.objects.create(curso=self.curso, nombre='Módulo')
+
+    def test_304_si_el_catalogo_no_cambio(self):
+        response = self.client.get('/api/cursos/?expand=modulos')
+        etag = response['ETag']
+
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get('/api/cursos/?expand=modulos', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        self.assertLessEqual(len(ctx.captured_queries), 2)
+
+    def test_modificar_el_catalogo_cambia_el_etag(self):
+        etag = self.client.get(f'/api/cursos/{self.curso.id}/')['ETag']
+
+        self.modulo.nombre = 'Módulo renombrado'
+        self.modulo.save()
+
+        response = self.client.get(f'/api/cursos/{self.curso.id}/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
+        self.assertEqual(response.json()['modulos'][0]['nombre'], 'Módulo renombrado')
+
+    def test_curso_no_visible_da_404(self):
+        otro = Curso.objects.create(nombre='Ajeno')
+        self.assertEqual(self.client.get(f'/api/cursos/{otro.id}/').status_code, 404)
+
+
+class InscripcionesTests(APITestCase):
+    """num_estudiantes se mantiene con m2m_changed desde ambos lados de la relación."""
+
+    def setUp(self):
+        cache.clear()
+        self.profesor = User.objects.create_user(
+            email='profe@test.com', username='profe', password='x', rol='docente'
+        )
+        self.curso = Curso.objects.create(nombre='Curso', profesor=self.profesor)
+        self.otro = Curso.objects.create(nombre='Otro', profesor=self.profesor)
+        self.alumnos = [
+            User.objects.create_user(email=f'a{i}@test.com', username=f'a{i}', password='x', rol='estudiante')
+            for i in range(3)
+        ]
+
+    def num(self, curso):
+        curso.refresh_from_db(fields=['num_estudiantes'])
+        return curso.num_estudiantes
+
+    def test_contador_de_inscripciones(self):
+        self.curso.estudiantes.add(*self.alumnos)
+        self.assertEqual(self.num(self.curso), 3)
+
+        self.curso.estudiantes.remove(self.alumnos[0], self.alumnos[0])
+        self.assertEqual(self.num(self.curso), 2)
+
+        self.alumnos[1].cursos_inscritos.add(self.otro)
+        self.assertEqual(self.num(self.otro), 1)
+
+        self.alumnos[1].cursos_inscritos.clear()
+        self.assertEqual((self.num(self.curso), self.num(self.otro)), (1, 0))
+
+        self.curso.estudiantes.clear()
+        self.assertEqual(self.num(self.curso), 0)
+
+    def test_directorio_del_docente(self):
+        self.curso.estudiantes.add(self.alumnos[0])
+        self.otro.estudiantes.add(self.alumnos[0], self.alumnos[1])
+        self.client.force_authenticate(self.profesor)
+
+        data = self.client.get('/api/users/?mis_estudiantes=true').json()['results']
+        self.assertEqual([u['id'] for u in data], [self.alumnos[0].id, self.alumnos[1].id])
+
+        cursos = self.client.get('/api/cursos/').json()['results']
+        self.assertEqual([(c['num_estudiantes'], 'estudiantes' in c) for c in cursos], [(1, False), (2, False)])
+
+    @override_settings(PASSWORD_HASHERS=['django.contrib.auth.hashers.MD5PasswordHasher'])
+    def test_importar_lista_de_estudiantes(self):
+        self.curso.estudiantes.add(self.alumnos[0])
+        User.objects.create_user(email='profe2@test.com', username='profe2', password='x', rol='docente')
+        filas = ['email,nombre,apellido,password', 'A0@test.com,,,', 'a1@test.com,,,', 'profe2@test.com,,,']
+        filas += [f'nuevo{i}@test.com,Nombre{i},Apellido,clave-{i}' for i in range(40)]
+        filas += ['sin-arroba,,,', 'nuevo0@test.com,,,', 'otro@test.com,,,']
+        self.client.force_authenticate(self.profesor)
+
+        data = self.client.post(
+            f'/api/cursos/{self.curso.id}/importar-estudiantes/', {'csv': '\n'.join(filas)}, format='json'
+        ).json()
+
+        self.assertEqual((data['creados'], data['inscritos'], data['ya_inscritos']), (41, 42, 1))
+        self.assertEqual([e['fila'] for e in data['errores']], [4, 45, 46])
+        self.assertEqual([c['email'] for c in data['credenciales']], ['otro@test.com'])
+        self.assertEqual(self.num(self.curso), 43)
+        self.assertTrue(User.objects.get(email='nuevo7@test.com').check_password('clave-7'))
+
+
+class RecomendacionesTests(APITestCase):
+    """Marcado de recomendaciones como vistas y su orden por prioridad."""
+
+    def setUp(self):
+        docente = User.objects.create_user(email='doc@test.com', username='doc', password='x', rol='docente')
+        self.estudiante = User.objects.create_user(email='est@test.com', username='est', password='x', rol='estudiante')
+        self.otro = User.objects.create_user(email='otro@test.com', username='otro', password='x', rol='estudiante')
+        curso = Curso.objects.create(nombre='Curso', profesor=docente)
+        self.recurso = Recurso.objects.create(
+            modulo=Modulo.objects.create(curso=curso, nombre='M', orden=0), titulo='Video', tipo='video'
+        )
+        self.client.force_authenticate(self.estudiante)
+
+    def recomendar(self, estudiante=None, prioridad='media', **extra):
+        return RecursoRecomendado.objects.create(
+            estudiante=estudiante or self.estudiante, recurso_original=self.recurso, tipo='video_youtube',
+            titulo=f'Rec {prioridad}', descripcion='d', prioridad=prioridad, **extra,
+        )
+
+    def marcar(self, ids):
+        return self.client.post('/api/marcar-recursos-vistos/', {'recurso_ids': ids}, format='json')
+
+    def test_marcar_varios_en_un_update(self):
+        propios = [self.recomendar() for _ in range(3)]
+        ya_visto = self.recomendar(visto=True)
+        ajeno = self.recomendar(estudiante=self.otro)
+
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.marcar([r.id for r in propios] + [ya_visto.id, ajeno.id])
+        self.assertEqual(response.json(), {'success': True, 'actualizados': 3})
+        updates = [c for c in ctx.captured_queries if c['sql'].startswith('UPDATE "courses_recursorecomendado"')]
+        self.assertEqual(len(updates), 1)
+
+        self.assertEqual(RecursoRecomendado.objects.filter(estudiante=self.estudiante, visto=False).count(), 0)
+        ajeno.refresh_from_db()
+        self.assertFalse(ajeno.visto)
+
+        # Repetir no vuelve a contar los ya vistos
+        self.assertEqual(self.marcar([propios[0].id]).json()['actualizados'], 0)
+
+    def test_marcar_valida_la_lista(self):
+        rec = self.recomendar()
+        for ids in ([], 'abc', [rec.id, 'x'], None, list(range(1, 502))):
+            self.assertEqual(self.marcar(ids).status_code, 400, ids)
+        rec.refresh_from_db()
+        self.assertFalse(rec.visto)
+
+    def test_rango_de_prioridad_en_save(self):
+        rec = self.recomendar(prioridad='baja')
+        self.assertEqual(rec.prioridad_rango, 2)
+        rec.prioridad = 'alta'
+        rec.save()
+        rec.refresh_from_db()
+        self.assertEqual(rec.prioridad_rango, 0)
+
+    def test_orden_alta_media_baja(self):
+        # Creadas en el orden que daría ordenar el texto (media > baja > alta) al revés
+        for prioridad in ('baja', 'alta', 'media', 'alta'):
+            self.recomendar(prioridad=prioridad)
+        esperado = ['alta', 'alta', 'media', 'baja']
+
+        self.assertEqual(list(RecursoRecomendado.objects.values_list('prioridad', flat=True)), esperado)
+        recursos = self.client.get('/api/recursos-recomendados/').json()['recursos']
+        self.assertEqual([r['prioridad'] for r in recursos], esperado)
+
+    def test_migracion_rellena_el_rango(self):
+        import importlib
+
+        from django.apps import apps
+
+        migracion = importlib.import_module('courses.migrations.0006_recursorecomendado_prioridad_rango')
+        for prioridad in ('alta', 'media', 'baja'):
+            self.recomendar(prioridad=prioridad)
+        # Filas previas a la migración: todas con el default
+        RecursoRecomendado.objects.update(prioridad_rango=1)
+
+        migracion.rellenar_prioridad_rango(apps, None)
+        self.assertEqual(
+            dict(RecursoRecomendado.objects.values_list('prioridad', 'prioridad_rango')),
+            {'alta': 0, 'media': 1, 'baja': 2},
+        )
+
+
+class BootstrapTests(APITestCase):
+    """/api/bootstrap/ arma el estado inicial con un número fijo de consultas."""
+
+    def setUp(self):
+        cache.clear()
+        from evaluaciones.models import SesionAtencion
+
+        self.SesionAtencion = SesionAtencion
+        docente = User.objects.create_user(email='doc@test.com', username='doc', password='x', rol='docente')
+        self.estudiante = User.objects.create_user(email='est@test.com', username='est', password='x', rol='estudiante')
+        for i in range(3):
+            curso = Curso.objects.create(nombre=f'Curso {i}', profesor=docente)
+            curso.estudiantes.add(self.estudiante)
+        self.recurso = Recurso.objects.create(
+            modulo=Modulo.objects.create(curso=curso, nombre='M', orden=0), titulo='Video', tipo='video'
+        )
+        for i in range(4):
+            RecursoRecomendado.objects.create(
+                estudiante=self.estudiante, recurso_original=self.recurso, tipo='video_youtube',
+                titulo=f'Rec {i}', descripcion='d', visto=i == 0,
+            )
+        self.sesion(80.0)
+        self.client.force_authenticate(self.estudiante)
+
+    def sesion(self, porcentaje):
+        self.SesionAtencion.objects.create(
+            estudiante=self.estudiante, recurso=self.recurso, duracion_total=60,
+            segundos_distraido=0, porcentaje_atencion=porcentaje, nivel='ALTA',
+        )
+
+    def pedir(self):
+        with CaptureQueriesContext(connection) as ctx:
+            data = self.client.get('/api/bootstrap/').json()
+        # En los tests la caché compartida es una tabla de la base (con sus savepoints); en
+        # producción, Redis
+        consultas = [c for c in ctx.captured_queries if 'cache_compartida' not in c['sql'] and 'SAVEPOINT' not in c['sql']]
+        return data, len(consultas)
+
+    def test_respuesta_y_consultas(self):
+        data, consultas = self.pedir()
+        self.assertEqual(data['rol'], 'estudiante')
+        self.assertEqual(data['user']['email'], 'est@test.com')
+        self.assertEqual(len(data['cursos']), 3)
+        self.assertEqual(len(data['recomendaciones']), 3)
+        self.assertEqual(data['atencion'], {'nivel': 'alta', 'promedio': 80.0})
+        self.assertLessEqual(consultas, 5)
+
+        # En caché quedan la versión del catálogo y las recomendaciones
+        self.assertLessEqual(self.pedir()[1], 2)
+
+        # Una sesión nueva invalida el nivel de atención
+        self.sesion(20.0)
+        self.assertEqual(self.pedir()[0]['atencion'], {'nivel': 'media', 'promedio': 50.0})
+
+
+class RegistroTests(APITestCase):
+    """Logging estructurado (core/registro.py)."""
+
+    def registro(self, nivel=logging.INFO, **extra):
+        record = logging.LogRecord('courses', nivel, __file__, 1, 'Evento %s', ('x',), None)
+        record.__dict__.update(extra)
+        return record
+
+    def test_request_id_en_respuesta_y_en_el_log(self):
+        user = User.objects.create_user(email='est@test.com', username='est', password='x', rol='estudiante')
+        self.client.force_authenticate(user)
+        response = self.client.get('/api/bootstrap/', HTTP_X_REQUEST_ID='abc123')
+        self.assertEqual(response['X-Request-ID'], 'abc123')
+        self.assertTrue(self.client.get('/api/bootstrap/')['X-Request-ID'])
+
+        record = self.registro(curso_id=7)
+        IdPeticionFilter().filter(record)
+        datos = json.loads(FormatoJSON().format(record))
+        self.assertEqual(datos['mensaje'], 'Evento x')
+        self.assertEqual(datos['curso_id'], 7)
+        self.assertNotIn('request_id', datos)
+
+    def test_muestreo_no_descarta_advertencias(self):
+        filtro = MuestreoFilter()
+        self.assertFalse(filtro.filter(self.registro(muestreo=0)))
+        self.assertTrue(filtro.filter(self.registro(logging.WARNING, muestreo=0)))
+        self.assertTrue(filtro.filter(self.registro()))
+
+
+class AnalisisItemsTests(APITestCase):
+    """Dificultad, discriminación y distractores por pregunta, y su consulta por el docente."""
+
+    PREGUNTAS = [
+        {'pregunta': '¿Primera pregunta?', 'opciones': ['a', 'b', 'c', 'd'], 'correcta': 'A'},
+        {'pregunta': '¿Segunda pregunta?', 'opciones': ['a', 'b', 'c', 'd'], 'correcta': 'B'},
+    ]
+    RESPUESTAS = [['A', 'B'], ['A', 'B'], ['A', 'C'], ['B', 'B'], ['C', 'D'], ['A', 'B']]
+
+    def setUp(self):
+        self.docente = User.objects.create_user(email='doc@test.com', username='doc', password='x', rol='docente')
+        curso = Curso.objects.create(nombre='Curso', profesor=self.docente)
+        modulo = Modulo.objects.create(curso=curso, nombre='M', orden=0)
+        self.recurso = Recurso.objects.create(modulo=modulo, titulo='Video', tipo='video')
+        for i, respuestas in enumerate(self.RESPUESTAS):
+            est = User.objects.create_user(email=f'e{i}@test.com', username=f'e{i}', password='x', rol='estudiante')
+            evaluacion = EvaluacionAdaptativa.objects.create(
+                recurso=self.recurso, nivel='Medio', generada_para=est, preguntas_json=self.PREGUNTAS,
+            )
+            ResultadoEvaluacion.objects.create(evaluacion=evaluacion, estudiante=est, respuestas_json=respuestas, puntaje=0)
+
+    def test_estadisticas_vectorizadas(self):
+        items, elecciones, claves = construir_matriz([(self.PREGUNTAS, r) for r in self.RESPUESTAS])
+        n, dificultad, discriminacion, frecuencias = calcular_estadisticas(elecciones, claves)
+
+        aciertos = (elecciones == claves).astype(float)
+        self.assertEqual(list(n), [6, 6])
+        np.testing.assert_allclose(dificultad, aciertos.mean(axis=0))
+        # Con dos preguntas el "resto" de cada una es la otra
+        self.assertAlmostEqual(discriminacion[0], np.corrcoef(aciertos[:, 0], aciertos[:, 1])[0, 1])
+        self.assertEqual(list(frecuencias[:, 0]), [4, 1, 1, 0])
+
+    def test_recalcular_y_consultar(self):
+        self.assertEqual(recalcular_estadisticas(), 2)
+        primera = EstadisticaPregunta.objects.get(texto_pregunta='¿Primera pregunta?')
+        self.assertEqual((primera.nivel, primera.num_respuestas), ('Medio', 6))
+        self.assertAlmostEqual(primera.dificultad, 0.6667)
+        self.assertAlmostEqual(primera.dificultad_valor, math.log(0.3333 / 0.6667), places=3)
+
+        url = f'/api/analisis-preguntas/?recurso_id={self.recurso.id}'
+        self.client.force_authenticate(self.docente)
+        preguntas = {p['pregunta']: p for p in self.client.get(url).json()['preguntas']}
+        self.assertEqual(len(preguntas), 2)
+        self.assertEqual(preguntas['¿Primera pregunta?']['frecuencias_opciones'], {'A': 4, 'B': 1, 'C': 1, 'D': 0})
+        self.assertFalse(preguntas['¿Primera pregunta?']['problematica'])
+
+        otro = User.objects.create_user(email='otro@test.com', username='otro', password='x', rol='docente')
+        self.client.force_authenticate(otro)
+        self.assertEqual(self.client.get(url).status_code, 403)
+
+
+class MotorAdaptativoTests(APITestCase):
+    """Rasch + paso bayesiano (tipo Elo) sobre la habilidad, y el plan de la siguiente evaluación."""
+
+    def test_actualizacion_bayesiana(self):
+        self.assertEqual(probabilidad_acierto(0.0, 0.0), 0.5)
+        # p = 0.5, información 0.25: varianza 1 / (1 + 0.25) y theta = varianza * (1 - 0.5)
+        theta, varianza = actualizar_con_respuestas(0.0, 1.0, [0.0], [1], deriva=0.0)
+        self.assertAlmostEqual(varianza, 0.8)
+        self.assertAlmostEqual(theta, 0.4)
+
+        # Fallar un ítem fácil baja más la habilidad que fallar uno difícil
+        facil, _ = actualizar_con_respuestas(0.0, 1.0, [-1.0], [0])
+        dificil, _ = actualizar_con_respuestas(0.0, 1.0, [1.0], [0])
+        self.assertLess(facil, dificil)
+        self.assertLess(dificil, 0)
+
+    def test_plan_segun_habilidad(self):
+        self.assertEqual(planificar_evaluacion(HabilidadEstudiante(theta=0.9, varianza=1.0))[0], 'Difícil')
+        self.assertEqual(planificar_evaluacion(HabilidadEstudiante(theta=-0.8, varianza=1.0))[0], 'Fácil')
+        # Ya precisa: el mínimo de preguntas; muy incierta: el máximo
+        self.assertEqual(planificar_evaluacion(HabilidadEstudiante(theta=0.0, varianza=0.01))[1], PREGUNTAS_MIN)
+        self.assertEqual(planificar_evaluacion(HabilidadEstudiante(theta=4.0, varianza=50.0))[1], PREGUNTAS_MAX)
+
+    def test_enviar_respuestas_actualiza_habilidad(self):
+        docente = User.objects.create_user(email='doc@test.com', username='doc', password='x', rol='docente')
+        est = User.objects.create_user(email='est@test.com', username='est', password='x', rol='estudiante')
+        modulo = Modulo.objects.create(curso=Curso.objects.create(nombre='C', profesor=docente), nombre='M', orden=0)
+        recurso = Recurso.objects.create(modulo=modulo, titulo='Video', tipo='video')
+        preguntas = [
+            {'pregunta': f'¿Pregunta {i}?', 'opciones': ['a', 'b', 'c', 'd'], 'correcta': 'A'} for i in range(4)
+        ]
+        evaluacion = EvaluacionAdaptativa.objects.create(
+            recurso=recurso, nivel='Medio', generada_para=est, preguntas_json=preguntas,
+            contexto_atencion={'nivel': 'media'},
+        )
+
+        self.client.force_authenticate(est)
+        data = self.client.post(
+            '/api/enviar-respuestas/', {'evaluacion_id': evaluacion.id, 'respuestas': ['A'] * 4}, format='json'
+        ).json()
+        self.assertTrue(data['aprobado'])
+
+        habilidad = HabilidadEstudiante.objects.get(estudiante=est, recurso=recurso)
+        self.assertEqual(habilidad.respuestas_acumuladas, 4)
+        self.assertGreater(habilidad.theta, 0)
+        self.assertLess(habilidad.varianza, 1.0)
+        self.assertEqual(data['habilidad'], round(habilidad.theta, 3))
+
+
+class EvaluacionCATTests(APITestCase):
+    """CAT: una pregunta a la vez desde el banco, sin llamar a la IA en la petición."""
+
+    def setUp(self):
+        docente = User.objects.create_user(email='doc@test.com', username='doc', password='x', rol='docente')
+        self.est = User.objects.create_user(email='est@test.com', username='est', password='x', rol='estudiante')
+        modulo = Modulo.objects.create(curso=Curso.objects.create(nombre='C', profesor=docente), nombre='M', orden=0)
+        self.recurso = Recurso.objects.create(modulo=modulo, titulo='Video', tipo='video')
+        self.client.force_authenticate(self.est)
+
+    def item(self, i, b, **campos):
+        return EstadisticaPregunta.objects.create(
+            recurso=self.recurso, nivel='Medio', huella=f'h{i}', texto_pregunta=f'¿Pregunta {i}?',
+            opciones=['a', 'b', 'c', 'd'], correcta='A', dificultad_valor=b, **campos,
+        )
+
+    def llenar_banco(self):
+        for i in range(BANCO_MINIMO):
+            self.item(i, -2.0 + i * 4.0 / (BANCO_MINIMO - 1))
+        # La más cercana a theta = 0, pero problemática (casi todos aciertan)
+        self.item('mala', 0.0, num_respuestas=10, dificultad=0.99)
+
+    def test_banco_insuficiente_sin_llamar_a_la_ia(self):
+        self.item(0, 0.0)
+        with mock.patch('courses.evaluacion_cat.generar_preguntas_ia') as generar:
+            response = self.client.post('/api/cat/iniciar/', {'recurso_id': self.recurso.id}, format='json')
+        self.assertEqual(response.status_code, 409)
+        generar.assert_not_called()
+
+    def test_evaluaciones_sin_ia_no_llenan_el_banco(self):
+        with mock.patch('courses.views_evaluaciones.GEMINI_DISPONIBLE', False):
+            for _ in range(3):
+                response = self.client.post('/api/generar-evaluacion/', {'recurso_id': self.recurso.id}, format='json')
+                self.assertEqual(response.status_code, 200)
+        self.assertFalse(EstadisticaPregunta.objects.exists())
+
+        preguntas = [{'pregunta': f'¿Pregunta {i}?', 'opciones': ['a', 'b', 'c', 'd'], 'correcta': 'A'} for i in range(5)]
+        with mock.patch('courses.views_evaluaciones.generar_preguntas_ia', return_value=(preguntas, 'Listo (Generada con IA - Gemini)')):
+            self.client.post('/api/generar-evaluacion/', {'recurso_id': self.recurso.id}, format='json')
+        self.assertEqual(EstadisticaPregunta.objects.filter(recurso=self.recurso).count(), 5)
+
+    def test_historial_sin_cat_en_curso(self):
+        self.llenar_banco()
+        clasica = EvaluacionAdaptativa.objects.create(
+            recurso=self.recurso, nivel='Medio', preguntas_json=[{}, {}], generada_para=self.est,
+            contexto_atencion={'nivel': 'media'},
+        )
+        ResultadoEvaluacion.objects.create(evaluacion=clasica, estudiante=self.est, respuestas_json=[], puntaje=2)
+        for _ in range(2):
+            data = self.client.post('/api/cat/iniciar/', {'recurso_id': self.recurso.id}, format='json').json()
+
+        historial = self.client.get('/api/historial-evaluaciones/').json()['evaluaciones']
+        self.assertEqual([e['nivel'] for e in historial], ['Medio'])
+
+        evaluacion_id = data['evaluacion_id']
+        while not data.get('finalizada'):
+            data = self.client.post(
+                '/api/cat/responder/', {'evaluacion_id': evaluacion_id, 'respuesta': 'A'}, format='json'
+            ).json()
+        historial = self.client.get('/api/historial-evaluaciones/').json()['evaluaciones']
+        self.assertEqual([e['nivel'] for e in historial], ['Medio', 'CAT'])
+        self.assertEqual(ResultadoEvaluacion.objects.terminados().count(), 2)
+
+    def test_finalizar_no_pisa_la_habilidad_actualizada_entretanto(self):
+        self.llenar_banco()
+        data = self.client.post('/api/cat/iniciar/', {'recurso_id': self.recurso.id}, format='json').json()
+        # Una evaluación clásica calificada mientras el CAT sigue abierto
+        HabilidadEstudiante.objects.filter(estudiante=self.est, recurso=self.recurso).update(theta=1.5, varianza=0.5)
+
+        evaluacion_id = data['evaluacion_id']
+        respuestas = ['A', 'B']
+        while not data.get('finalizada'):
+            data = self.client.post(
+                '/api/cat/responder/', {'evaluacion_id': evaluacion_id, 'respuesta': respuestas[0]}, format='json'
+            ).json()
+            respuestas.reverse()
+
+        evaluacion = EvaluacionAdaptativa.objects.get(id=evaluacion_id)
+        resultado = ResultadoEvaluacion.objects.get(evaluacion=evaluacion)
+        aciertos = [int(r == 'A') for r in resultado.respuestas_json]
+        esperado = actualizar_con_respuestas(1.5, 0.5, [p['b'] for p in evaluacion.preguntas_json], aciertos)
+        habilidad = HabilidadEstudiante.objects.get(estudiante=self.est, recurso=self.recurso)
+        self.assertAlmostEqual(habilidad.theta, esperado[0])
+        self.assertAlmostEqual(habilidad.varianza, esperado[1])
+
+    def test_siguiente_item_en_una_consulta(self):
+        self.llenar_banco()
+        with CaptureQueriesContext(connection) as ctx:
+            item = siguiente_item(self.recurso, 0.1, servidas=['h7'])
+        self.assertEqual(len(ctx.captured_queries), 1)
+        # h7 (b = 0) ya se sirvió y 'hmala' es problemática: queda la de b = 0.286
+        self.assertEqual(item.huella, 'h8')
+
+    def test_filtro_sql_igual_a_es_problematica(self):
+        for i, (n, p, d) in enumerate([(2, 0.99, -0.5), (10, 0.99, 0.5), (10, 0.1, 0.5), (10, 0.5, 0.0),
+                                       (10, 0.5, 0.5), (10, None, None), (10, 0.5, None)]):
+            self.item(i, 0.0, num_respuestas=n, dificultad=p, discriminacion=d)
+        sanas = set(EstadisticaPregunta.objects.filter(filtro_no_problematicas()).values_list('huella', flat=True))
+        esperadas = {e.huella for e in EstadisticaPregunta.objects.all() if not es_problematica(e)}
+        self.assertEqual(sanas, esperadas)
+        self.assertEqual(sanas, {'h0', 'h4', 'h5', 'h6'})
+
+    def test_flujo_completo(self):
+        self.llenar_banco()
+        data = self.client.post('/api/cat/iniciar/', {'recurso_id': self.recurso.id}, format='json').json()
+        evaluacion = EvaluacionAdaptativa.objects.get(id=data['evaluacion_id'])
+        evaluacion.full_clean()
+        self.assertEqual(evaluacion.get_nivel_display(), 'Adaptativa ítem a ítem (CAT)')
+        self.assertNotIn('correcta', data['pregunta'])
+
+        vistas = [data['pregunta']['pregunta']]
+        while not data.get('finalizada'):
+            data = self.client.post(
+                '/api/cat/responder/', {'evaluacion_id': evaluacion.id, 'respuesta': 'A'}, format='json'
+            ).json()
+            if not data['finalizada']:
+                vistas.append(data['pregunta']['pregunta'])
+
+        self.assertEqual(len(vistas), len(set(vistas)))
+        self.assertNotIn('¿Pregunta mala?', vistas)
+        self.assertEqual((data['aciertos'], data['total']), (len(vistas), len(vistas)))
+        habilidad = HabilidadEstudiante.objects.get(estudiante=self.est, recurso=self.recurso)
+        self.assertEqual(habilidad.respuestas_acumuladas, len(vistas))
+        self.assertGreater(habilidad.theta, 0)
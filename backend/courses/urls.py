@@ -10,19 +10,24 @@ router.register(r'cursos', views.CursoViewSet, basename='curso')
 router.register(r'modulos', views.ModuloViewSet, basename='modulo')
 router.register(r'recursos', views.RecursoViewSet, basename='recurso')
 
-print(">>> [DEBUG] Loading courses/urls.py...")
-
 urlpatterns = [
     # ✅ Evaluaciones adaptativas IA (MOVIDO ARRIBA)
     path('generar-evaluacion/', views_evaluaciones.generar_evaluacion_adaptativa, name='generar-evaluacion'),
     path('enviar-respuestas/', views_evaluaciones.enviar_respuestas_evaluacion, name='enviar-respuestas'),
+    path('cat/iniciar/', views_evaluaciones.iniciar_evaluacion_cat, name='cat-iniciar'),
+    path('cat/responder/', views_evaluaciones.responder_evaluacion_cat, name='cat-responder'),
     path('historial-evaluaciones/', views_evaluaciones.historial_evaluaciones, name='historial-evaluaciones'),
     path('recursos-recomendados/', views_evaluaciones.recursos_recomendados, name='recursos-recomendados'),
     path('marcar-recurso-visto/', views_evaluaciones.marcar_recurso_visto, name='marcar-recurso-visto'),
+    path('marcar-recursos-vistos/', views_evaluaciones.marcar_recursos_vistos, name='marcar-recursos-vistos'),
+    path('analisis-preguntas/', views_evaluaciones.analisis_preguntas, name='analisis-preguntas'),
 
     # Recomendaciones IA
     path('recomendaciones/', views.recomendaciones_ia, name='recomendaciones-ia'),
 
+    # Estado inicial de la sesión en una sola petición
+    path('bootstrap/', views.bootstrap, name='bootstrap'),
+
     # ViewSets (al final para evitar shadowing)
     path('', include(router.urls)),
 ]
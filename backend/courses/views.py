@@ -1,16 +1,25 @@
 # backend/courses/views.py
-from rest_framework import viewsets
-from rest_framework.decorators import api_view, permission_classes
+from rest_framework import status, viewsets
+from rest_framework.decorators import action, api_view, permission_classes
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
-from django.db.models import Avg, Count, Q
+from django.db.models import Avg, Count, Prefetch, Q
+from django.shortcuts import get_object_or_404
+from django.contrib.auth import get_user_model
 from django.conf import settings
 import json
+import logging
 
 # Importamos modelos locales
+from core.filtros import filtrar_por_ids
+from core.metricas import medir_llm
+from .catalogo_cache import CatalogoCondicionalMixin, CursoCacheMixin
+from .expansion import ExpansionViewMixin, expandido, sub_expansion
 from .models import Curso, Modulo, Recurso
 from .serializers import CursoSerializer, ModuloSerializer, RecursoSerializer
 
+logger = logging.getLogger(__name__)
+
 # Importamos Google Gemini
 # Importar Google Gemini (API oficial)
 try:
@@ -18,38 +27,126 @@ try:
     GEMINI_DISPONIBLE = True
 except ImportError:
     GEMINI_DISPONIBLE = False
-    print("[INFO] library google-genai not found (using fallback)")
+    logger.info("google-genai no está instalado: recomendaciones con el sistema de respaldo")
+
+# ---------------------------------------------------------------------
+# QUERYSETS CON EL ÁRBOL PRECARGADO
+# ---------------------------------------------------------------------
+# Los serializers anidan Curso -> Modulo -> Recurso -> PreguntaVideo. Con estos
+# Prefetch el árbol se arma en un número fijo de consultas, sin importar cuántos
+# cursos, módulos o recursos haya, y solo se cargan los niveles pedidos en ?expand=.
+
+def recursos_con_preguntas(expand=None):
+    queryset = Recurso.objects.all()
+    if not expandido(expand, 'contenido_texto'):
+        queryset = queryset.defer('contenido_texto')
+    if expandido(expand, 'preguntas'):
+        queryset = queryset.prefetch_related('preguntas')
+    return queryset
+
+
+def modulos_con_recursos(expand=None):
+    queryset = Modulo.objects.all()
+    if expandido(expand, 'recursos'):
+        queryset = queryset.prefetch_related(
+            Prefetch('recursos', queryset=recursos_con_preguntas(sub_expansion(expand, 'recursos')))
+        )
+    return queryset
+
+
+def cursos_con_arbol(queryset, expand=None):
+    queryset = queryset.select_related('profesor')
+    if expandido(expand, 'estudiantes'):
+        queryset = queryset.prefetch_related(
+            Prefetch('estudiantes', queryset=get_user_model().objects.only('id')),
+        )
+    if expandido(expand, 'modulos'):
+        queryset = queryset.prefetch_related(
+            Prefetch('modulos', queryset=modulos_con_recursos(sub_expansion(expand, 'modulos')))
+        )
+    return queryset
+
 
-class CursoViewSet(viewsets.ModelViewSet):
+class CursoViewSet(CursoCacheMixin, ExpansionViewMixin, viewsets.ModelViewSet):
     serializer_class = CursoSerializer
     permission_classes = [IsAuthenticated]
+    ordering = 'id'
+    ordering_fields = ['id', 'nombre', 'creado_en']
 
     def get_queryset(self):
         user = self.request.user
+        expand = self.obtener_expansion()
 
-        print(f"🔍 API CURSOS: Usuario solicitando: {user.email}")
-        print(f"   Rol detectado: {getattr(user, 'rol', 'Sin rol')}")
+        logger.debug("Listado de cursos", extra={"user_id": user.id, "rol": getattr(user, 'rol', None)})
 
-        # 1. Si es Admin
-        if user.is_staff or getattr(user, 'rol', '') == 'admin':
-            return Curso.objects.all()
+        # Admin: todos; Docente: los que dicta; Estudiante: aquellos en los que está inscrito
+        queryset = Curso.objects.visibles_para(user)
 
-        # 2. Si es Docente
-        if getattr(user, 'rol', '') == 'docente':
-            return Curso.objects.filter(profesor=user)
+        activo = self.request.query_params.get('activo')
+        if activo in ('true', 'false'):
+            queryset = queryset.filter(activo=(activo == 'true'))
+        queryset = filtrar_por_ids(queryset, self.request.query_params, {'profesor': 'profesor_id'})
 
-        # 3. Si es Estudiante
-        return Curso.objects.filter(estudiantes=user)
+        return cursos_con_arbol(queryset, expand)
 
-class ModuloViewSet(viewsets.ModelViewSet):
-    queryset = Modulo.objects.all()
+    @action(detail=True, methods=['post'], url_path='importar-estudiantes')
+    def importar_estudiantes(self, request, pk=None):
+        """
+        POST /api/cursos/<id>/importar-estudiantes/
+        Body: archivo CSV en 'archivo' (multipart) o el texto en 'csv'.
+        Columnas: email (obligatoria), nombre, apellido, username, password.
+        """
+        from .inscripciones import ErrorImportacion, importar_estudiantes
+
+        user = request.user
+        if getattr(user, 'rol', '') not in ['admin', 'docente'] and not user.is_staff:
+            return Response({'error': 'No autorizado'}, status=status.HTTP_403_FORBIDDEN)
+
+        # Docente: solo los cursos que dicta
+        curso = get_object_or_404(Curso.objects.visibles_para(user), pk=pk)
+
+        archivo = request.FILES.get('archivo')
+        try:
+            texto = archivo.read().decode('utf-8-sig') if archivo else request.data.get('csv', '')
+        except UnicodeDecodeError:
+            return Response({'error': 'El archivo debe estar en UTF-8'}, status=status.HTTP_400_BAD_REQUEST)
+        if not texto:
+            return Response({'error': 'Envíe el CSV en "archivo" o "csv"'}, status=status.HTTP_400_BAD_REQUEST)
+
+        try:
+            resultado = importar_estudiantes(curso, texto)
+        except ErrorImportacion as e:
+            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+        return Response(resultado, status=status.HTTP_201_CREATED if resultado['creados'] else status.HTTP_200_OK)
+
+class ModuloViewSet(CatalogoCondicionalMixin, ExpansionViewMixin, viewsets.ModelViewSet):
     serializer_class = ModuloSerializer
     permission_classes = [IsAuthenticated]
+    # El cursor pagina por rango sobre un campo único: "orden" se repite en cada curso (0, 1, 2...)
+    # y DRF resolvería los empates con OFFSET. Los clientes ordenan por "orden" al mostrar
+    ordering = 'id'
+    ordering_fields = ['id']
 
-class RecursoViewSet(viewsets.ModelViewSet):
-    queryset = Recurso.objects.all()
+    def get_queryset(self):
+        queryset = modulos_con_recursos(self.obtener_expansion())
+        return filtrar_por_ids(queryset, self.request.query_params, {'curso': 'curso_id'})
+
+class RecursoViewSet(CatalogoCondicionalMixin, ExpansionViewMixin, viewsets.ModelViewSet):
     serializer_class = RecursoSerializer
     permission_classes = [IsAuthenticated]
+    ordering = 'id'
+    ordering_fields = ['id', 'titulo']
+
+    def get_queryset(self):
+        queryset = recursos_con_preguntas(self.obtener_expansion())
+        tipo = self.request.query_params.get('tipo')
+        if tipo:
+            queryset = queryset.filter(tipo=tipo)
+        return filtrar_por_ids(queryset, self.request.query_params, {
+            'modulo': 'modulo_id',
+            'curso': 'modulo__curso_id',
+        })
 
 # ---------------------------------------------------------------------
 # SISTEMA DE RECOMENDACIONES INTELIGENTE CON IA
@@ -69,6 +166,8 @@ def obtener_ultimo_d2r(user):
             'ta_total': ultimo_d2r.ta_total,
             'eo_total': ultimo_d2r.eo_total,
             'ec_total': ultimo_d2r.ec_total,
+            'e_porcentaje': ultimo_d2r.e_porcentaje,
+            'percentil_con': ultimo_d2r.percentil_con,
             'fecha': ultimo_d2r.fecha.strftime('%Y-%m-%d %H:%M'),
             'interpretacion': ultimo_d2r.interpretacion or 'Sin interpretación'
         }
@@ -123,6 +222,13 @@ def obtener_estadisticas_atencion(sesiones):
         'total_sesiones': total
     }
 
+# Umbrales de detectar_patron_estudiante (también los usa el cálculo por lotes de analytics/patrones.py)
+PERCENTIL_CON_ALTO = 25 # Percentil de CON según el baremo (evaluaciones.d2r)
+CON_ALTO = 100          # CON bruto, para resultados aún sin percentil
+ATENCION_ALTA = 75
+SESIONES_RECIENTES = 10
+
+
 def detectar_patron_estudiante(d2r_data, sesiones, estadisticas):
     """
     Detecta el patrón de comportamiento del estudiante basado en D2R y atención.
@@ -153,13 +259,14 @@ def detectar_patron_estudiante(d2r_data, sesiones, estadisticas):
             'sugerencia': 'Ver al menos 3 videos para obtener análisis de atención'
         }
 
-    # Clasificamos D2R (CON = índice de concentración)
+    # Clasificamos D2R (CON = índice de concentración) por su percentil en el baremo
     con = d2r_data['con']
-    d2r_alto = con >= 100  # Según estándares del test D2R
+    percentil_con = d2r_data.get('percentil_con')
+    d2r_alto = percentil_con >= PERCENTIL_CON_ALTO if percentil_con is not None else con >= CON_ALTO
 
     # Clasificamos atención promedio
     prom_atencion = estadisticas['promedio_atencion']
-    atencion_alta = prom_atencion >= 75
+    atencion_alta = prom_atencion >= ATENCION_ALTA
 
     # Detectamos patrón
     if not d2r_alto and not atencion_alta:
@@ -205,13 +312,13 @@ def generar_recomendaciones_ia(user, d2r_data, sesiones, estadisticas, patron):
 
     # Verificar si Gemini está disponible
     if not GEMINI_DISPONIBLE:
-        print("[INFO] Fallback: Gemini no disponible en views.py")
+        logger.info("Recomendaciones sin IA: Gemini no disponible")
         return generar_recomendaciones_fallback(sesiones, patron)
 
     # Configurar Gemini client
     api_key = getattr(settings, "GEMINI_API_KEY", None) or getattr(settings, "GOOGLE_API_KEY", None)
     if not api_key:
-        print("[INFO] Fallback: API Key vacía")
+        logger.info("Recomendaciones sin IA: falta la API key de Gemini")
         return generar_recomendaciones_fallback(sesiones, patron)
 
     try:
@@ -283,11 +390,11 @@ Responde SOLO con el JSON, sin markdown, sin explicaciones adicionales:
 """
 
         # Llamar a Gemini (Nueva sintaxis)
-        print("🤖 Llamando a Gemini AI (views.py)...")
-        response = client.models.generate_content(
-            model="gemini-2.0-flash", 
-            contents=prompt
-        )
+        with medir_llm():
+            response = client.models.generate_content(
+                model="gemini-2.0-flash", 
+                contents=prompt
+            )
         texto_respuesta = response.text.strip()
 
         # Limpiar posibles markdown
@@ -298,22 +405,20 @@ Responde SOLO con el JSON, sin markdown, sin explicaciones adicionales:
 
         # Parsear JSON
         resultado = json.loads(texto_respuesta)
-        print(f"✅ Gemini generó recomendaciones correctamente")
 
         return resultado
 
     except json.JSONDecodeError as e:
-        print(f"[ERROR] Gemini no retornó JSON válido - {str(e)}")
+        logger.warning("Gemini no devolvió JSON válido en recomendaciones: %s", e)
         return generar_recomendaciones_fallback(sesiones, patron)
     except Exception as e:
-        print(f"[ERROR] Error en Gemini AI: {str(e)}")
+        logger.exception("Error de Gemini generando recomendaciones")
         return generar_recomendaciones_fallback(sesiones, patron)
 
 def generar_recomendaciones_fallback(sesiones, patron):
     """
     Sistema de recomendaciones básico sin IA (fallback)
     """
-    print("⚙️ Usando sistema de recomendaciones fallback (sin IA)")
     recomendaciones = []
 
     # 1. Videos con baja atención
@@ -394,11 +499,9 @@ def recomendaciones_ia(request):
 
     user = request.user
 
-    print(f"🤖 Generando recomendaciones IA para: {user.email}")
-
     # 1. Obtener datos del estudiante
     d2r_data = obtener_ultimo_d2r(user)
-    sesiones = obtener_sesiones_atencion(user, limit=10)
+    sesiones = obtener_sesiones_atencion(user, limit=SESIONES_RECIENTES)
     estadisticas = obtener_estadisticas_atencion(sesiones)
 
     # 2. Detectar patrón de comportamiento
@@ -418,6 +521,49 @@ def recomendaciones_ia(request):
         'recomendaciones': resultado.get('recomendaciones', [])
     }
 
-    print(f"✅ Recomendaciones generadas: {len(respuesta['recomendaciones'])} items")
+    logger.info(
+        "Recomendaciones generadas",
+        extra={"user_id": user.id, "patron": patron['patron'], "recomendaciones": len(respuesta['recomendaciones'])},
+    )
+
+    return Response(respuesta)
+
+
+# ---------------------------------------------------------------------
+# ARRANQUE DE SESIÓN
+# ---------------------------------------------------------------------
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def bootstrap(request):
+    """
+    Todo lo que el frontend necesita tras el login en una sola respuesta: usuario y rol,
+    resumen de sus cursos, recomendaciones sin ver y nivel de atención.
+
+    Reemplaza la ráfaga /api/me/ + /api/cursos/ + /api/recursos-recomendados/ al arrancar.
+    Se arma con las piezas compartidas de courses.resumenes, así que el número de consultas
+    es fijo (a lo sumo 5) e independiente de cuántos cursos o recomendaciones haya.
+    """
+    from users.serializers import UserSerializer
+    from .catalogo_cache import obtener_version
+    from .resumenes import cursos_resumen, nivel_atencion, recomendaciones_pendientes
+
+    user = request.user
+    rol = getattr(user, 'rol', 'estudiante')
+    version = obtener_version()
+
+    datos_usuario = UserSerializer(user).data
+    datos_usuario['rol'] = rol
+
+    respuesta = {
+        'user': datos_usuario,
+        'rol': rol,
+        'version_catalogo': version.version,
+        'cursos': cursos_resumen(user, version),
+    }
+    if rol == 'estudiante':
+        nivel, promedio = nivel_atencion(user)
+        respuesta['recomendaciones'] = recomendaciones_pendientes(user)
+        respuesta['atencion'] = {'nivel': nivel, 'promedio': promedio}
 
     return Response(respuesta)
@@ -8,11 +8,13 @@ from rest_framework import status
 from django.conf import settings
 from django.db.models import Max
 import json
-import traceback
+import logging
 import random
 import threading
 import time
 
+from core.metricas import medir_llm
+
 from .models import (
     Recurso,
     EvaluacionAdaptativa,
@@ -20,6 +22,9 @@ from .models import (
     RecursoRecomendado,
     EvolucionEstudiante,
 )
+from .resumenes import nivel_atencion, recomendaciones_pendientes
+
+logger = logging.getLogger(__name__)
 
 # Importar Google Gemini (API oficial nueva)
 try:
@@ -27,14 +32,12 @@ try:
     api_key = getattr(settings, "GEMINI_API_KEY", None) or getattr(settings, "GOOGLE_API_KEY", None)
     client = genai.Client(api_key=api_key) if api_key else None
     GEMINI_DISPONIBLE = bool(client)
-    if GEMINI_DISPONIBLE:
-        print(f"[OK] Gemini disponible (views_evaluaciones)")
-    else:
-        print("[WARNING] No API key found for Gemini (views_evaluaciones)")
+    if not GEMINI_DISPONIBLE:
+        logger.warning("Sin API key de Gemini: evaluaciones en modo sin IA")
 except Exception:
     GEMINI_DISPONIBLE = False
     client = None
-    print("[WARNING]: google-genai no está disponible")
+    logger.warning("google-genai no está disponible: evaluaciones en modo sin IA")
 
 
 # ====================================================================
@@ -42,23 +45,8 @@ except Exception:
 # ====================================================================
 
 def calcular_nivel_atencion(user):
-    from evaluaciones.models import SesionAtencion
-
-    sesiones = SesionAtencion.objects.filter(estudiante=user).order_by("-fecha")[:5]
-
-    if not sesiones:
-        return "media", 50.0
-
-    promedio = sum(float(s.porcentaje_atencion) for s in sesiones) / len(sesiones)
-
-    if promedio >= 75:
-        nivel = "alta"
-    elif promedio >= 50:
-        nivel = "media"
-    else:
-        nivel = "baja"
-
-    return nivel, round(float(promedio), 2)
+    # Compartido con /api/bootstrap/ y en caché hasta la próxima sesión (ver resumenes.py)
+    return nivel_atencion(user)
 
 
 
@@ -76,6 +64,8 @@ def obtener_contexto_d2r(user):
                 "ta_total": ultimo.ta_total,
                 "eo_total": ultimo.eo_total,
                 "ec_total": ultimo.ec_total,
+                "e_porcentaje": ultimo.e_porcentaje,
+                "percentil_con": ultimo.percentil_con,
                 "fecha": ultimo.fecha.isoformat(),
             }
     except Exception:
@@ -171,6 +161,10 @@ def _normalizar_opciones(opciones):
     return out
 
 
+# Mensaje de las evaluaciones armadas con plantillas cuando no hay IA (ver es_modo_sin_ia)
+MENSAJE_SIN_IA = "Evaluación generada automáticamente (modo sin IA)."
+
+
 def generar_preguntas_fallback(recurso, dificultad, num_preguntas):
     """
     Fallback mejorado: genera preguntas distintas y opciones coherentes.
@@ -240,13 +234,17 @@ def generar_preguntas_fallback(recurso, dificultad, num_preguntas):
             "correcta": letra_correcta,
         })
 
-    return preguntas, "Evaluación generada automáticamente (modo sin IA)."
+    return preguntas, MENSAJE_SIN_IA
+
+
+def es_modo_sin_ia(mensaje) -> bool:
+    """True si las preguntas vienen de las plantillas de generar_preguntas_fallback y no de la IA."""
+    return mensaje == MENSAJE_SIN_IA
 
 
 def generar_preguntas_ia(recurso, dificultad, num_preguntas, contexto_atencion=None, contexto_d2r=None):
-    print(f"[GEMINI] generar_preguntas_ia CALLED. Disponible: {GEMINI_DISPONIBLE}")
     if not GEMINI_DISPONIBLE or not client:
-        print("[GEMINI] No disponible en este entorno, usando fallback")
+        logger.info("Preguntas sin IA: Gemini no disponible")
         return generar_preguntas_fallback(recurso, dificultad, num_preguntas)
 
     # Preparar contexto del estudiante para el prompt
@@ -323,42 +321,37 @@ Devuelve SOLO JSON válido, sin markdown, sin texto adicional:
 
     for intento in range(1, 3):
         try:
-            print(f"[GEMINI] Intento {intento}: Iniciando llamada a Gemini...")
             inicio = time.time()
-
-            try:
+            with medir_llm():
                 response = client.models.generate_content(
                     model="gemini-2.0-flash",
                     contents=prompt
                 )
-            except Exception as ex:
-                print(f"[GEMINI] Error directo en la llamada de la API: {str(ex)}")
-                raise ex
-
             duracion = round(time.time() - inicio, 2)
-            print(f"[GEMINI] Respuesta recibida de Gemini ({duracion}s)")
 
             texto_raw = (response.text or "").strip()
-            print(f"[GEMINI] Contenido respuesta: {texto_raw[:200]}")
+            logger.debug("Respuesta de Gemini", extra={"intento": intento, "duracion": duracion, "preview": texto_raw[:200]})
 
             json_txt = _extraer_json_de_texto(texto_raw)
 
             if not json_txt:
-                print(f"[GEMINI] Intento {intento}: no devolvio JSON valido. Preview: {texto_raw[:180]}")
+                logger.warning("Gemini no devolvió JSON válido", extra={"intento": intento, "preview": texto_raw[:180]})
                 continue
 
             try:
                 data = json.loads(json_txt)
             except json.JSONDecodeError as je:
-                print(f"[GEMINI] Intento {intento}: ERROR parsing JSON: {je}")
-                print(f"[GEMINI] JSON texto: {json_txt[:300]}")
+                logger.warning("JSON de Gemini mal formado: %s", je, extra={"intento": intento, "preview": json_txt[:300]})
                 continue
 
             preguntas = data.get("preguntas", [])
             mensaje = (data.get("mensaje", "") or "").strip()
 
             if not isinstance(preguntas, list) or len(preguntas) != int(num_preguntas):
-                print(f"[GEMINI] Intento {intento}: cantidad incorrecta ({len(preguntas) if isinstance(preguntas, list) else 'N/A'} vs {num_preguntas} esperadas)")
+                logger.warning(
+                    "Gemini devolvió una cantidad incorrecta de preguntas",
+                    extra={"intento": intento, "recibidas": len(preguntas) if isinstance(preguntas, list) else None, "esperadas": num_preguntas},
+                )
                 continue
 
             letras_validas = {"A", "B", "C", "D"}
@@ -390,25 +383,27 @@ Devuelve SOLO JSON válido, sin markdown, sin texto adicional:
                 textos.append(pregunta)
 
             if len(preguntas_ok) != int(num_preguntas):
-                print(f"[GEMINI] Intento {intento}: estructura invalida ({len(preguntas_ok)} validas de {num_preguntas})")
+                logger.warning(
+                    "Preguntas de Gemini con estructura inválida",
+                    extra={"intento": intento, "validas": len(preguntas_ok), "esperadas": num_preguntas},
+                )
                 continue
 
             if len(set(textos)) != len(textos):
-                print(f"[GEMINI] Intento {intento}: preguntas repetidas")
+                logger.warning("Gemini devolvió preguntas repetidas", extra={"intento": intento})
                 continue
 
             # Éxito
             mensaje_final = mensaje or "Evaluacion generada."
             if "(Sin IA)" not in mensaje_final and "(sin IA)" not in mensaje_final:
                 mensaje_final = f"{mensaje_final} (Generada con IA - Gemini)"
-            print(f"[GEMINI] EXITO: {len(preguntas_ok)} preguntas generadas en {duracion}s")
+            logger.info("Preguntas generadas con IA", extra={"preguntas": len(preguntas_ok), "duracion": duracion, "intento": intento})
             return preguntas_ok, mensaje_final
 
-        except Exception as e:
-            print(f"[GEMINI] ERROR intento {intento}: {str(e)}")
-            traceback.print_exc()
+        except Exception:
+            logger.exception("Error de Gemini generando preguntas", extra={"intento": intento})
 
-    print("[GEMINI] Todos los intentos fallaron, usando fallback")
+    logger.warning("Gemini falló en todos los intentos: preguntas sin IA")
     return generar_preguntas_fallback(recurso, dificultad, num_preguntas)
 
 
@@ -521,22 +516,23 @@ Genera al menos 3 videos de YouTube y 2 articulos. Responde SOLO con el JSON.
 
     for intento in range(1, 3):
         try:
-            response = client.models.generate_content(
-                model="gemini-2.0-flash",
-                contents=prompt
-            )
+            with medir_llm():
+                response = client.models.generate_content(
+                    model="gemini-2.0-flash",
+                    contents=prompt
+                )
 
             texto = (response.text or "").strip()
             json_txt = _extraer_json_de_texto(texto)
 
             if not json_txt:
-                print(f"[WARNING] Gemini recomendaciones intento {intento}: No JSON")
+                logger.warning("Gemini no devolvió JSON en recursos recomendados", extra={"intento": intento})
                 continue
 
             data = json.loads(json_txt)
 
             if not isinstance(data, list) or len(data) == 0:
-                print(f"[WARNING] Gemini recomendaciones intento {intento}: Lista vacía o formato incorrecto")
+                logger.warning("Recursos recomendados de Gemini vacíos o con formato incorrecto", extra={"intento": intento})
                 continue
 
             lista_front = []
@@ -579,9 +575,8 @@ Genera al menos 3 videos de YouTube y 2 articulos. Responde SOLO con el JSON.
 
             return lista_front
 
-        except Exception as e:
-            print(f"[ERROR] Error Gemini recomendaciones intento {intento}: {str(e)}")
-            traceback.print_exc()
+        except Exception:
+            logger.exception("Error de Gemini generando recursos recomendados", extra={"intento": intento})
 
     return generar_recursos_recomendados_fallback(estudiante, recurso, nivel_atencion)
 
@@ -593,53 +588,32 @@ Genera al menos 3 videos de YouTube y 2 articulos. Responde SOLO con el JSON.
 @api_view(["POST"])
 @permission_classes([IsAuthenticated])
 def generar_evaluacion_adaptativa(request):
-    print("=" * 60)
-    print(">>> ENDPOINT generar_evaluacion_adaptativa LLAMADO <<<")
-    print("=" * 60)
     user = request.user
     recurso_id = request.data.get("recurso_id")
-    print(f">>> Usuario: {user}, recurso_id: {recurso_id}")
 
     try:
         if recurso_id:
             recurso = Recurso.objects.get(id=recurso_id)
-            print(f">>> Recurso encontrado por ID: {recurso.titulo}")
         else:
             from evaluaciones.models import SesionAtencion
             ultima = SesionAtencion.objects.filter(estudiante=user).order_by("-fecha").first()
 
             if ultima and ultima.recurso:
                 recurso = ultima.recurso
-                print(f">>> Recurso encontrado por sesion: {recurso.titulo}")
             else:
                 recurso = Recurso.objects.first()
-                print(f">>> Recurso por defecto: {recurso}")
 
         if not recurso:
-            print(">>> ERROR: No hay recursos disponibles")
             return Response({"error": "No hay recursos disponibles"}, status=status.HTTP_404_NOT_FOUND)
 
-        print(f">>> Calculando nivel de atencion...")
         nivel_atencion, promedio_atencion = calcular_nivel_atencion(user)
-        print(f">>> Nivel: {nivel_atencion}, promedio: {promedio_atencion}")
-
-        if nivel_atencion == "baja":
-            dificultad = "Difícil"
-            num_preguntas = 15
-        elif nivel_atencion == "media":
-            dificultad = "Medio"
-            num_preguntas = 10
-        else:
-            dificultad = "Fácil"
-            num_preguntas = 5
-
-        print(f">>> Dificultad: {dificultad}, num_preguntas: {num_preguntas}")
 
-        print(">>> Obteniendo contexto D2R...")
+        # Dificultad y cantidad según la habilidad estimada del estudiante en este recurso
+        from .motor_adaptativo import obtener_habilidad, planificar_evaluacion
+        habilidad = obtener_habilidad(user, recurso, nivel_atencion)
+        dificultad, num_preguntas = planificar_evaluacion(habilidad)
         contexto_d2r = obtener_contexto_d2r(user)
-        print(f">>> Contexto D2R: {contexto_d2r}")
 
-        print(">>> A PUNTO DE LLAMAR A GENERAR_PREGUNTAS_IA <<<")
         preguntas_json, mensaje_ia = generar_preguntas_ia(
             recurso,
             dificultad,
@@ -647,16 +621,22 @@ def generar_evaluacion_adaptativa(request):
             contexto_atencion={"nivel": nivel_atencion, "promedio": promedio_atencion},
             contexto_d2r=contexto_d2r
         )
-        print(f">>> generar_preguntas_ia RETORNO: {len(preguntas_json) if preguntas_json else 0} preguntas")
-        print(f">>> Mensaje IA: {mensaje_ia}")
 
         if not preguntas_json:
             return Response({"error": "No se pudieron generar preguntas"}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
+        # Las preguntas generadas con IA alimentan el banco que usa el modo CAT; las plantillas
+        # del modo sin IA no, porque se repiten entre recursos y no evalúan el contenido
+        modo_ia = not es_modo_sin_ia(mensaje_ia)
+        if modo_ia:
+            from .analisis_items import registrar_en_banco
+            registrar_en_banco(recurso, dificultad, preguntas_json)
+
         contexto_atencion_db = {
             "nivel": nivel_atencion,
             "promedio": promedio_atencion,
             "mensaje": mensaje_ia,
+            "habilidad": {"theta": round(habilidad.theta, 3), "varianza": round(habilidad.varianza, 3)},
         }
 
         evaluacion = EvaluacionAdaptativa.objects.create(
@@ -668,8 +648,13 @@ def generar_evaluacion_adaptativa(request):
             contexto_atencion=contexto_atencion_db,
         )
 
-        modo_ia = "(Sin IA)" not in mensaje_ia and "(sin IA)" not in mensaje_ia
-        print(f">>> EVALUACION CREADA: id={evaluacion.id}, modo_ia={modo_ia}")
+        logger.info(
+            "Evaluación adaptativa creada",
+            extra={
+                "evaluacion_id": evaluacion.id, "recurso_id": recurso.id, "nivel": dificultad,
+                "preguntas": len(preguntas_json), "modo_ia": modo_ia,
+            },
+        )
 
         return Response({
             "success": True,
@@ -685,11 +670,9 @@ def generar_evaluacion_adaptativa(request):
         })
 
     except Recurso.DoesNotExist:
-        print(">>> EXCEPTION: Recurso no encontrado")
         return Response({"error": "Recurso no encontrado"}, status=status.HTTP_404_NOT_FOUND)
     except Exception as e:
-        print(f">>> EXCEPTION GENERAL: {str(e)}")
-        traceback.print_exc()
+        logger.exception("Error generando evaluación adaptativa", extra={"recurso_id": recurso_id})
         return Response({"error": str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
 
@@ -700,20 +683,19 @@ def generar_evaluacion_adaptativa(request):
 @api_view(["POST"])
 @permission_classes([IsAuthenticated])
 def enviar_respuestas_evaluacion(request):
-    print("=" * 60)
-    print(">>> ENDPOINT enviar_respuestas_evaluacion LLAMADO <<<")
-    print("=" * 60)
     user = request.user
     evaluacion_id = request.data.get("evaluacion_id")
     respuestas = request.data.get("respuestas", [])
     tiempo_invertido = request.data.get("tiempo_invertido", 0)
-    print(f">>> Usuario: {user}, evaluacion_id: {evaluacion_id}, respuestas: {len(respuestas)}")
 
     try:
         if not evaluacion_id:
             return Response({"error": "evaluacion_id es requerido"}, status=status.HTTP_400_BAD_REQUEST)
 
-        evaluacion = EvaluacionAdaptativa.objects.get(id=evaluacion_id, generada_para=user)
+        evaluacion = (
+            EvaluacionAdaptativa.objects.exclude(nivel=EvaluacionAdaptativa.NIVEL_CAT)
+            .get(id=evaluacion_id, generada_para=user)
+        )
 
         preguntas = evaluacion.preguntas_json or []
         total = len(preguntas)
@@ -744,16 +726,19 @@ def enviar_respuestas_evaluacion(request):
 
         nivel_atencion = (evaluacion.contexto_atencion or {}).get("nivel", "media")
 
+        from .motor_adaptativo import actualizar_habilidad
+        habilidad = actualizar_habilidad(user, evaluacion, respuestas)
+
         recursos_rec = []
         if not aprobado:
             try:
                 recursos_rec = generar_recursos_recomendados_ia(user, evaluacion.recurso, nivel_atencion, porcentaje)
             except Exception as rec_err:
-                print(f"[WARNING] Error generando recursos recomendados (no crítico): {rec_err}")
+                logger.warning("Error generando recursos recomendados (no crítico): %s", rec_err)
                 try:
                     recursos_rec = generar_recursos_recomendados_fallback(user, evaluacion.recurso, nivel_atencion)
-                except Exception as fb_err:
-                    print(f"[WARNING] Fallback de recomendaciones también falló: {fb_err}")
+                except Exception:
+                    logger.exception("Falló también el respaldo de recursos recomendados")
                     recursos_rec = []
 
         return Response({
@@ -764,6 +749,7 @@ def enviar_respuestas_evaluacion(request):
             "porcentaje": porcentaje,
             "nivel_atencion": nivel_atencion,
             "intento_numero": intento,
+            "habilidad": round(habilidad.theta, 3),
             "recursos_recomendados": recursos_rec,
             "mensaje_ia": f"Obtuviste {porcentaje}%.",
         })
@@ -771,7 +757,7 @@ def enviar_respuestas_evaluacion(request):
     except EvaluacionAdaptativa.DoesNotExist:
         return Response({"error": "Evaluación no encontrada"}, status=status.HTTP_404_NOT_FOUND)
     except Exception as e:
-        traceback.print_exc()
+        logger.exception("Error registrando respuestas de evaluación", extra={"evaluacion_id": evaluacion_id})
         return Response({"error": str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
 
@@ -786,6 +772,7 @@ def historial_evaluaciones(request):
 
     resultados = (
         ResultadoEvaluacion.objects.filter(estudiante=user)
+        .terminados()
         .select_related("evaluacion", "evaluacion__recurso")
         .order_by("fecha_realizacion")
     )
@@ -824,24 +811,7 @@ def historial_evaluaciones(request):
 def recursos_recomendados(request):
     user = request.user
 
-    recursos = (
-        RecursoRecomendado.objects.filter(estudiante=user, visto=False)
-        .order_by("-prioridad", "-fecha_recomendacion")[:10]
-    )
-
-    recursos_lista = []
-    for rec in recursos:
-        recursos_lista.append({
-            "id": rec.id,
-            "titulo": rec.titulo,
-            "descripcion": rec.descripcion,
-            "tipo": rec.tipo,
-            "prioridad": rec.prioridad,
-            "visto": rec.visto,
-            "url": getattr(rec, "url", None),
-            "tema": getattr(rec, "tema", None),
-            "razon_recomendacion": getattr(rec, "razon_recomendacion", None),
-        })
+    recursos_lista = recomendaciones_pendientes(user)
 
     nivel_atencion, promedio = calcular_nivel_atencion(user)
 
@@ -862,10 +832,199 @@ def marcar_recurso_visto(request):
     if not recurso_id:
         return Response({"error": "recurso_id es requerido"}, status=status.HTTP_400_BAD_REQUEST)
 
-    try:
-        rec = RecursoRecomendado.objects.get(id=recurso_id, estudiante=user)
-        rec.visto = True
-        rec.save()
-        return Response({"success": True})
-    except RecursoRecomendado.DoesNotExist:
+    # UPDATE directo: evita cargar la fila y reescribir todas sus columnas con save()
+    actualizados = RecursoRecomendado.objects.filter(id=recurso_id, estudiante=user).update(visto=True)
+    if not actualizados:
         return Response({"error": "No encontrado"}, status=status.HTTP_404_NOT_FOUND)
+    return Response({"success": True})
+
+
+# Tope de ids por llamada: el IN (...) no debe pasar el límite de parámetros de la base
+MAX_RECURSOS_POR_MARCADO = 500
+
+
+@api_view(["POST"])
+@permission_classes([IsAuthenticated])
+def marcar_recursos_vistos(request):
+    """
+    Marca varios recursos recomendados como vistos en un solo UPDATE ... WHERE id IN (...).
+
+    Body: {"recurso_ids": [1, 2, 3]}
+    """
+    user = request.user
+    recurso_ids = request.data.get("recurso_ids")
+
+    if not isinstance(recurso_ids, list) or not recurso_ids:
+        return Response({"error": "recurso_ids debe ser una lista no vacía"}, status=status.HTTP_400_BAD_REQUEST)
+    if len(recurso_ids) > MAX_RECURSOS_POR_MARCADO:
+        return Response(
+            {"error": f"recurso_ids admite como máximo {MAX_RECURSOS_POR_MARCADO} ids"},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+
+    try:
+        ids = {int(i) for i in recurso_ids}
+    except (TypeError, ValueError):
+        return Response({"error": "recurso_ids debe contener solo enteros"}, status=status.HTTP_400_BAD_REQUEST)
+
+    actualizados = (
+        RecursoRecomendado.objects.filter(estudiante=user, id__in=ids, visto=False)
+        .update(visto=True)
+    )
+
+    return Response({"success": True, "actualizados": actualizados})
+
+
+@api_view(["GET"])
+@permission_classes([IsAuthenticated])
+def analisis_preguntas(request):
+    """
+    Estadísticas de ítem de las preguntas generadas para un recurso (solo docentes/admin).
+
+    Query params: recurso_id (requerido), nivel (opcional), recalcular=1 (opcional).
+    """
+    from .analisis_items import es_problematica, recalcular_estadisticas
+    from .models import EstadisticaPregunta
+
+    user = request.user
+    if not (user.is_staff or getattr(user, "rol", "") in ["admin", "docente"]):
+        return Response({"error": "No autorizado"}, status=status.HTTP_403_FORBIDDEN)
+
+    recurso_id = request.query_params.get("recurso_id")
+    if not recurso_id:
+        return Response({"error": "recurso_id es requerido"}, status=status.HTTP_400_BAD_REQUEST)
+
+    try:
+        recurso = Recurso.objects.select_related("modulo__curso").get(id=recurso_id)
+    except (Recurso.DoesNotExist, ValueError):
+        return Response({"error": "Recurso no encontrado"}, status=status.HTTP_404_NOT_FOUND)
+
+    if getattr(user, "rol", "") == "docente" and not user.is_staff and recurso.modulo.curso.profesor_id != user.id:
+        return Response({"error": "No autorizado"}, status=status.HTTP_403_FORBIDDEN)
+
+    if request.query_params.get("recalcular") == "1":
+        recalcular_estadisticas(recurso_id=recurso.id)
+
+    estadisticas = EstadisticaPregunta.objects.filter(recurso=recurso)
+    nivel = request.query_params.get("nivel")
+    if nivel:
+        estadisticas = estadisticas.filter(nivel=nivel)
+
+    preguntas = [
+        {
+            "huella": e.huella,
+            "nivel": e.nivel,
+            "pregunta": e.texto_pregunta,
+            "opciones": e.opciones,
+            "correcta": e.correcta,
+            "num_respuestas": e.num_respuestas,
+            "dificultad": e.dificultad,
+            "discriminacion": e.discriminacion,
+            "frecuencias_opciones": e.frecuencias_opciones,
+            "problematica": es_problematica(e),
+            "actualizado": e.actualizado.isoformat(),
+        }
+        for e in estadisticas
+    ]
+
+    return Response({
+        "success": True,
+        "recurso": {"id": recurso.id, "titulo": recurso.titulo},
+        "preguntas": preguntas,
+    })
+
+
+# ====================================================================
+# EVALUACIÓN ADAPTATIVA ÍTEM A ÍTEM (CAT)
+# ====================================================================
+
+@api_view(["POST"])
+@permission_classes([IsAuthenticated])
+def iniciar_evaluacion_cat(request):
+    """
+    Inicia una evaluación CAT para un recurso y devuelve la primera pregunta (sin la respuesta).
+
+    Body: {"recurso_id": 1}
+    """
+    from . import evaluacion_cat
+
+    user = request.user
+    recurso_id = request.data.get("recurso_id")
+    if not recurso_id:
+        return Response({"error": "recurso_id es requerido"}, status=status.HTTP_400_BAD_REQUEST)
+
+    try:
+        recurso = Recurso.objects.get(id=recurso_id)
+    except (Recurso.DoesNotExist, ValueError):
+        return Response({"error": "Recurso no encontrado"}, status=status.HTTP_404_NOT_FOUND)
+
+    nivel_atencion, promedio_atencion = calcular_nivel_atencion(user)
+    try:
+        evaluacion, _ = evaluacion_cat.iniciar(
+            user,
+            recurso,
+            {"nivel": nivel_atencion, "promedio": promedio_atencion},
+            obtener_contexto_d2r(user),
+        )
+    except evaluacion_cat.BancoInsuficiente:
+        # El banco se completa fuera de la petición (comando completar_banco_cat)
+        return Response(
+            {"error": "Este recurso todavía no tiene suficientes preguntas para una evaluación CAT"},
+            status=status.HTTP_409_CONFLICT,
+        )
+    if evaluacion is None:
+        return Response({"error": "No hay preguntas disponibles para este recurso"}, status=status.HTTP_404_NOT_FOUND)
+
+    return Response({
+        "success": True,
+        "evaluacion_id": evaluacion.id,
+        "pregunta": evaluacion_cat.pregunta_para_estudiante(evaluacion),
+        "recurso": {"id": recurso.id, "titulo": recurso.titulo, "tipo": recurso.tipo},
+    })
+
+
+@api_view(["POST"])
+@permission_classes([IsAuthenticated])
+def responder_evaluacion_cat(request):
+    """
+    Responde la pregunta actual de una evaluación CAT. Devuelve la siguiente pregunta
+    o, si la estimación ya convergió, el resultado final.
+
+    Body: {"evaluacion_id": 1, "respuesta": "B"}
+    """
+    from . import evaluacion_cat
+
+    user = request.user
+    evaluacion_id = request.data.get("evaluacion_id")
+    if not evaluacion_id:
+        return Response({"error": "evaluacion_id es requerido"}, status=status.HTTP_400_BAD_REQUEST)
+
+    try:
+        evaluacion, resultado, correcta, finalizada = evaluacion_cat.responder(
+            user, evaluacion_id, request.data.get("respuesta")
+        )
+    except (EvaluacionAdaptativa.DoesNotExist, ResultadoEvaluacion.DoesNotExist, ValueError):
+        return Response({"error": "Evaluación no encontrada"}, status=status.HTTP_404_NOT_FOUND)
+
+    estado = (evaluacion.contexto_atencion or {}).get("cat", {})
+    respuesta = {
+        "success": True,
+        "correcta": correcta,
+        "finalizada": finalizada,
+        "respondidas": len(resultado.respuestas_json or []),
+        "habilidad": round(estado.get("theta", 0.0), 3),
+    }
+
+    if finalizada:
+        total = len(resultado.respuestas_json or [])
+        porcentaje = round((resultado.puntaje / total) * 100, 2) if total else 0.0
+        respuesta.update({
+            "aciertos": int(resultado.puntaje),
+            "total": total,
+            "porcentaje": porcentaje,
+            "aprobado": porcentaje >= 70,
+        })
+    else:
+        respuesta["pregunta"] = evaluacion_cat.pregunta_para_estudiante(evaluacion)
+
+    return Response(respuesta)
@@ -0,0 +1,193 @@
+# backend/evaluaciones/d2r.py
+"""
+Reglas y puntuación del test D2-R, compartidas por el envío de resultados y los cálculos
+posteriores (re-puntuación del histórico, patrones, analítica).
+
+La puntuación trabaja sobre una matriz numpy (tests x NUM_FILAS x 4) con las columnas
+TR, TA, EO, EC de cada fila; las filas que un test no tiene van como NaN. Así puntuar un
+test, una cohorte o todo el histórico es la misma llamada vectorizada.
+
+Índices:
+- TR, TA, EO, EC: sumas por test
+- TOT = TR - (EO + EC)    efectividad total
+- CON = TA - EC           concentración
+- VAR = max(TR fila) - min(TR fila)
+- E%  = (EO + EC) / TR * 100
+
+Los percentiles salen de tablas de normas por grupo de edad: para cada índice se
+precalcula la lista ordenada de puntajes de corte de PERCENTILES y la búsqueda es una
+bisección (bisect para un valor, np.searchsorted para un array).
+"""
+import bisect
+from statistics import NormalDist
+
+import numpy as np
+from rest_framework.exceptions import ValidationError
+
+# El D2-R tiene 14 filas de estímulos
+NUM_FILAS = 14
+
+# Columnas de la matriz de filas
+COLUMNAS_FILA = ('tr', 'ta', 'eo', 'ec')
+
+PERCENTILES = (1, 2, 5, 10, 16, 25, 50, 75, 84, 90, 95, 98, 99)
+
+# (media, desviación) de CON y TOT por grupo de edad. Son valores de referencia
+# aproximados para el formato de 14 filas x 57 estímulos; si se dispone del baremo del
+# manual basta con reemplazar estos parámetros (o las tablas generadas) por los oficiales.
+NORMAS = {
+    '9-12': {'con': (95, 30), 'tot': (330, 70)},
+    '13-16': {'con': (135, 35), 'tot': (420, 80)},
+    '17-19': {'con': (165, 38), 'tot': (480, 85)},
+    '20-39': {'con': (175, 40), 'tot': (500, 90)},
+    '40-59': {'con': (160, 38), 'tot': (460, 85)},
+    '60+': {'con': (130, 35), 'tot': (390, 80)},
+}
+GRUPOS_EDAD = tuple(NORMAS)
+GRUPO_POR_DEFECTO = '20-39'
+
+
+def _tabla_cortes(media, desviacion):
+    distribucion = NormalDist(media, desviacion)
+    return [round(distribucion.inv_cdf(p / 100), 1) for p in PERCENTILES]
+
+
+# grupo -> índice -> puntajes de corte ordenados (uno por percentil de PERCENTILES)
+TABLAS_NORMAS = {
+    grupo: {indice: _tabla_cortes(*parametros) for indice, parametros in indices.items()}
+    for grupo, indices in NORMAS.items()
+}
+
+
+def validar_numeracion_filas(filas):
+    """
+    Las filas deben venir numeradas 1..n, sin huecos ni repetidos, con 1 <= n <= NUM_FILAS.
+    Devuelve las filas ordenadas por numero_fila. Lanza ValidationError.
+    """
+    if not filas:
+        raise ValidationError('El test debe incluir al menos una fila')
+    if len(filas) > NUM_FILAS:
+        raise ValidationError(f'El test tiene como máximo {NUM_FILAS} filas')
+
+    numeros = sorted(f['numero_fila'] for f in filas)
+    if numeros != list(range(1, len(filas) + 1)):
+        raise ValidationError('numero_fila debe ir de 1 a n sin huecos ni repetidos')
+    return sorted(filas, key=lambda f: f['numero_fila'])
+
+
+def matriz_desde_filas(filas):
+    """Matriz (1 x NUM_FILAS x 4) de un test a partir de sus filas (dicts con numero_fila)."""
+    matriz = np.full((1, NUM_FILAS, len(COLUMNAS_FILA)), np.nan)
+    for f in filas:
+        matriz[0, int(f['numero_fila']) - 1] = [int(f.get(c, 0)) for c in COLUMNAS_FILA]
+    return matriz
+
+
+def matriz_desde_tuplas(tuplas):
+    """
+    Matriz de varios tests desde tuplas (test_id, numero_fila, tr, ta, eo, ec), p. ej. un
+    values_list de DetalleFilaD2R. Devuelve (ids ordenados, matriz alineada con ids).
+    """
+    datos = np.asarray(tuplas, dtype=np.float64).reshape(-1, 2 + len(COLUMNAS_FILA))
+    ids, pos = np.unique(datos[:, 0].astype(np.int64), return_inverse=True)
+    matriz = np.full((len(ids), NUM_FILAS, len(COLUMNAS_FILA)), np.nan)
+    matriz[pos, datos[:, 1].astype(np.int64) - 1] = datos[:, 2:]
+    return ids, matriz
+
+
+def percentiles(indice, valores, grupos=GRUPO_POR_DEFECTO):
+    """
+    Percentil de cada valor según la tabla del grupo de edad: el mayor percentil de
+    PERCENTILES cuyo corte se alcanza (0 si está por debajo del primero).
+    `grupos` puede ser un grupo para todos o un array alineado con `valores`.
+    """
+    valores = np.asarray(valores, dtype=np.float64)
+    grupos = np.broadcast_to(np.asarray(grupos), valores.shape)
+    tabla_percentiles = np.array((0,) + PERCENTILES)
+    resultado = np.zeros(valores.shape, dtype=np.int64)
+    for grupo in np.unique(grupos):
+        mascara = grupos == grupo
+        cortes = TABLAS_NORMAS[str(grupo)][indice]
+        resultado[mascara] = tabla_percentiles[np.searchsorted(cortes, valores[mascara], side='right')]
+    return resultado
+
+
+def percentil(indice, valor, grupo=GRUPO_POR_DEFECTO):
+    """Versión escalar de percentiles()."""
+    return ((0,) + PERCENTILES)[bisect.bisect_right(TABLAS_NORMAS[grupo][indice], valor)]
+
+
+def puntuar(matriz, grupos=GRUPO_POR_DEFECTO):
+    """
+    Índices de cada test de la matriz (tests x NUM_FILAS x 4). Devuelve un dict de arrays
+    alineados con los tests: tr_total, ta_total, eo_total, ec_total, tot, con, var,
+    e_porcentaje, percentil_con y percentil_tot.
+    """
+    matriz = np.asarray(matriz, dtype=np.float64)
+    tr, ta, eo, ec = np.moveaxis(np.nansum(matriz, axis=1), -1, 0).astype(np.int64)
+    tr_filas = matriz[..., 0]
+    ausente = np.isnan(tr_filas)
+
+    with np.errstate(invalid='ignore', divide='ignore'):
+        maximo = np.where(ausente, -np.inf, tr_filas).max(axis=1)
+        minimo = np.where(ausente, np.inf, tr_filas).min(axis=1)
+        var = np.where(ausente.all(axis=1), 0.0, maximo - minimo)
+        e_porcentaje = np.where(tr > 0, np.round((eo + ec) / tr * 100, 2), 0.0)
+
+    tot = tr - (eo + ec)
+    con = (ta - ec).astype(np.float64)
+    return {
+        'tr_total': tr,
+        'ta_total': ta,
+        'eo_total': eo,
+        'ec_total': ec,
+        'tot': tot,
+        'con': con,
+        'var': var,
+        'e_porcentaje': e_porcentaje,
+        'percentil_con': percentiles('con', con, grupos),
+        'percentil_tot': percentiles('tot', tot, grupos),
+    }
+
+
+def totales_desde_filas(filas, grupo=GRUPO_POR_DEFECTO):
+    """Totales, índices y percentiles de un test calculados desde sus filas (fuente de verdad)."""
+    indices = puntuar(matriz_desde_filas(filas), grupo)
+    return {campo: valores[0].item() for campo, valores in indices.items()}
+
+
+CAMPOS_PUNTAJE = (
+    'tr_total', 'ta_total', 'eo_total', 'ec_total', 'tot', 'con', 'var',
+    'e_porcentaje', 'percentil_con', 'percentil_tot',
+)
+
+
+def repuntuar(queryset=None, lote=2000) -> int:
+    """
+    Vuelve a puntuar resultados guardados desde sus filas: una consulta trae las filas de
+    todo el lote, puntuar() calcula los índices de todos a la vez y se guardan con
+    bulk_update. Devuelve cuántos resultados se actualizaron.
+    """
+    from .models import DetalleFilaD2R, ResultadoD2R
+
+    if queryset is None:
+        queryset = ResultadoD2R.objects.all()
+    ids_pendientes = list(queryset.filter(filas__isnull=False).distinct().order_by('id').values_list('id', flat=True))
+
+    total = 0
+    for inicio in range(0, len(ids_pendientes), lote):
+        ids_lote = ids_pendientes[inicio:inicio + lote]
+        tuplas = DetalleFilaD2R.objects.filter(test_id__in=ids_lote).values_list(
+            'test_id', 'numero_fila', *COLUMNAS_FILA
+        )
+        ids, matriz = matriz_desde_tuplas(list(tuplas))
+        grupos = dict(ResultadoD2R.objects.filter(id__in=ids_lote).values_list('id', 'grupo_edad'))
+        indices = puntuar(matriz, np.array([grupos[int(i)] for i in ids]))
+
+        resultados = [ResultadoD2R(id=int(i)) for i in ids]
+        for campo in CAMPOS_PUNTAJE:
+            for resultado, valor in zip(resultados, indices[campo].tolist()):
+                setattr(resultado, campo, valor)
+        ResultadoD2R.objects.bulk_update(resultados, CAMPOS_PUNTAJE, batch_size=500)
+        total += len(resultados)
+    return total
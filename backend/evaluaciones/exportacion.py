@@ -0,0 +1,119 @@
+# backend/evaluaciones/exportacion.py
+"""
+Exportación de datos de atención, D2-R y evaluaciones para investigación.
+
+Cada conjunto se lee con values_list(...).iterator(chunk_size=...) y se escribe a medida
+que llega, así la memoria usada no depende del tamaño de la exportación.
+
+Formatos:
+- csv: una fila por registro, con cabecera
+- columnar: JSON por líneas; la primera línea describe el conjunto y cada línea siguiente
+  es un bloque de hasta TAMANO_BLOQUE registros en columnas: {"n": 3, "datos": {"id": [..], ...}}
+"""
+import csv
+import json
+from datetime import date, datetime
+
+from core.filtros import filtrar_por_ids, filtrar_rango_fechas
+from courses.models import ResultadoEvaluacion
+from .models import DetalleAtencion, DetalleFilaD2R, ResultadoD2R, SesionAtencion
+
+CHUNK_SIZE = 2000
+TAMANO_BLOQUE = 5000
+
+FORMATOS = {
+    "csv": "text/csv; charset=utf-8",
+    "columnar": "application/x-ndjson; charset=utf-8",
+}
+
+# nombre -> (modelo, columnas, lookup del curso, campo de fecha, orden)
+CONJUNTOS = {
+    "atencion": (
+        SesionAtencion,
+        ["id", "estudiante_id", "recurso_id", "recurso__modulo__curso_id", "fecha",
+         "duracion_total", "segundos_distraido", "porcentaje_atencion", "nivel"],
+        "recurso__modulo__curso_id", "fecha", ["id"],
+    ),
+    "atencion-detalle": (
+        DetalleAtencion,
+        ["sesion_id", "sesion__estudiante_id", "sesion__recurso_id", "segundo", "es_distraido"],
+        "sesion__recurso__modulo__curso_id", "sesion__fecha", ["sesion_id", "segundo"],
+    ),
+    "d2r": (
+        ResultadoD2R,
+        ["id", "estudiante_id", "curso_id", "recurso_id", "fecha", "tr_total", "ta_total",
+         "eo_total", "ec_total", "tot", "con", "var"],
+        "curso_id", "fecha", ["id"],
+    ),
+    "d2r-filas": (
+        DetalleFilaD2R,
+        ["test_id", "test__estudiante_id", "test__curso_id", "numero_fila", "tr", "ta", "eo", "ec"],
+        "test__curso_id", "test__fecha", ["test_id", "numero_fila"],
+    ),
+    "evaluaciones": (
+        ResultadoEvaluacion,
+        ["id", "evaluacion_id", "estudiante_id", "evaluacion__recurso_id", "evaluacion__nivel",
+         "fecha_realizacion", "intento_numero", "puntaje", "tiempo_invertido", "respuestas_json"],
+        "evaluacion__recurso__modulo__curso_id", "fecha_realizacion", ["id"],
+    ),
+}
+
+
+def consultar(conjunto, params):
+    """
+    Queryset de tuplas del conjunto con ?curso=, ?desde= y ?hasta= aplicados.
+    Devuelve (columnas, queryset). Lanza ValidationError si los filtros son inválidos.
+    """
+    modelo, columnas, lookup_curso, campo_fecha, orden = CONJUNTOS[conjunto]
+    queryset = modelo.objects.all()
+    queryset = filtrar_por_ids(queryset, params, {"curso": lookup_curso})
+    queryset = filtrar_rango_fechas(queryset, params, campo_fecha)
+    return columnas, queryset.order_by(*orden).values_list(*columnas)
+
+
+def _valor(v):
+    if isinstance(v, (datetime, date)):
+        return v.isoformat()
+    return v
+
+
+class _Eco:
+    """Pseudo-archivo para csv.writer: devuelve lo escrito en vez de acumularlo."""
+
+    def write(self, valor):
+        return valor
+
+
+def lineas_csv(columnas, queryset):
+    writer = csv.writer(_Eco())
+    yield writer.writerow(columnas)
+    for fila in queryset.iterator(chunk_size=CHUNK_SIZE):
+        yield writer.writerow([
+            json.dumps(v, ensure_ascii=False) if isinstance(v, (dict, list)) else _valor(v)
+            for v in fila
+        ])
+
+
+def lineas_columnar(conjunto, columnas, queryset):
+    yield json.dumps({"conjunto": conjunto, "columnas": columnas}, ensure_ascii=False) + "\n"
+
+    bloque = [[] for _ in columnas]
+    n = 0
+    for fila in queryset.iterator(chunk_size=CHUNK_SIZE):
+        for i, v in enumerate(fila):
+            bloque[i].append(_valor(v))
+        n += 1
+        if n == TAMANO_BLOQUE:
+            yield json.dumps({"n": n, "datos": dict(zip(columnas, bloque))}, ensure_ascii=False) + "\n"
+            bloque = [[] for _ in columnas]
+            n = 0
+    if n:
+        yield json.dumps({"n": n, "datos": dict(zip(columnas, bloque))}, ensure_ascii=False) + "\n"
+
+
+def exportar(conjunto, formato, params):
+    """Generador de líneas de texto del conjunto en el formato pedido (los filtros se validan antes)."""
+    columnas, queryset = consultar(conjunto, params)
+    if formato == "csv":
+        return lineas_csv(columnas, queryset)
+    return lineas_columnar(conjunto, columnas, queryset)
@@ -0,0 +1,151 @@
+# backend/evaluaciones/interpretacion.py
+"""
+Interpretación con IA (Gemini) de un resultado D2-R, generada una sola vez por resultado.
+
+- La primera petición llama a Gemini, parsea el JSON y lo guarda en el resultado
+  (interpretacion_ia con el JSON, interpretacion con el texto legible). Las siguientes,
+  del mismo estudiante o de un docente, se sirven desde la base de datos.
+- Mientras una petición genera la interpretación de un resultado, las demás para ese mismo
+  resultado no llaman a Gemini: reciben InterpretacionEnCurso.
+- Cada usuario puede tener a lo sumo MAX_GENERACIONES_POR_USUARIO llamadas en curso; una
+  ráfaga de recargas recibe LimiteConcurrencia en vez de multiplicar llamadas.
+
+Los candados y los cupos viven en la caché compartida entre workers (core.cache_compartida)
+y se toman con add, que es atómico tanto en Redis como en la tabla de caché. Tienen un
+timeout por si el proceso muere a mitad de la llamada.
+"""
+import json
+
+from django.utils import timezone
+
+from core.cache_compartida import cache_compartida
+from core.metricas import medir_llm
+
+from .models import ResultadoD2R
+
+MODELO_GEMINI = "gemini-2.0-flash"
+MAX_GENERACIONES_POR_USUARIO = 1
+TIMEOUT_GENERACION = 60
+MAX_RECOMENDACIONES = 5
+
+
+class InterpretacionEnCurso(Exception):
+    pass
+
+
+class LimiteConcurrencia(Exception):
+    pass
+
+
+class InterpretacionInvalida(Exception):
+    pass
+
+
+def datos_analisis(resultado):
+    return {
+        "tr_total": resultado.tr_total,
+        "ta_total": resultado.ta_total,
+        "errores": (resultado.eo_total + resultado.ec_total),
+        "con": resultado.con,
+        "var": resultado.var,
+        "tot": resultado.tot,
+        "e_porcentaje": resultado.e_porcentaje,
+        "percentil_con": resultado.percentil_con,
+        "percentil_tot": resultado.percentil_tot,
+    }
+
+
+def construir_prompt(datos):
+    return f"""
+Eres un tutor experto.
+Analiza el test D2-R del estudiante:
+
+DATOS:
+{datos}
+
+Devuelve JSON válido:
+{{
+  "diagnostico": "1 frase",
+  "recomendaciones": ["rec1", "rec2", "rec3"]
+}}
+""".strip()
+
+
+def parsear_respuesta(texto):
+    """{'diagnostico': str, 'recomendaciones': [str]} desde la respuesta de Gemini. Lanza InterpretacionInvalida."""
+    from courses.views_evaluaciones import _extraer_json_de_texto
+
+    json_txt = _extraer_json_de_texto((texto or "").strip())
+    try:
+        data = json.loads(json_txt) if json_txt else None
+    except ValueError:
+        data = None
+    if not isinstance(data, dict):
+        raise InterpretacionInvalida("La respuesta de Gemini no es un JSON válido")
+
+    diagnostico = str(data.get("diagnostico") or "").strip()
+    recomendaciones = data.get("recomendaciones") or []
+    if not isinstance(recomendaciones, list):
+        recomendaciones = [recomendaciones]
+    recomendaciones = [str(r).strip() for r in recomendaciones if str(r).strip()][:MAX_RECOMENDACIONES]
+    if not diagnostico:
+        raise InterpretacionInvalida("La respuesta de Gemini no trae diagnóstico")
+    return {"diagnostico": diagnostico, "recomendaciones": recomendaciones}
+
+
+def texto_interpretacion(datos):
+    return "\n".join([datos["diagnostico"]] + [f"- {r}" for r in datos["recomendaciones"]])
+
+
+def _reservar_cupo_usuario(user_id):
+    # Un candado por cupo: add no pisa uno tomado, así que dos workers no comparten cupo
+    for cupo in range(MAX_GENERACIONES_POR_USUARIO):
+        clave = f"d2r:interpretacion:usuario:{user_id}:{cupo}"
+        if cache_compartida.add(clave, 1, TIMEOUT_GENERACION):
+            return clave
+    raise LimiteConcurrencia()
+
+
+def _liberar_cupo_usuario(clave):
+    cache_compartida.delete(clave)
+
+
+def obtener_interpretacion(resultado, user, client):
+    """
+    Devuelve (interpretacion_ia, generada_ahora). Si el resultado no la tiene, la genera con
+    `client` (cliente de google-genai) y la guarda. Lanza InterpretacionEnCurso,
+    LimiteConcurrencia o InterpretacionInvalida; los errores de la API se propagan.
+    """
+    if resultado.interpretacion_ia:
+        return resultado.interpretacion_ia, False
+
+    candado = f"d2r:interpretacion:resultado:{resultado.pk}"
+    if not cache_compartida.add(candado, 1, TIMEOUT_GENERACION):
+        raise InterpretacionEnCurso()
+    try:
+        # Otra petición pudo terminar justo antes de tomar el candado
+        guardada = ResultadoD2R.objects.filter(pk=resultado.pk).values_list("interpretacion_ia", flat=True).first()
+        if guardada:
+            return guardada, False
+
+        cupo = _reservar_cupo_usuario(user.pk)
+        try:
+            with medir_llm():
+                respuesta = client.models.generate_content(
+                    model=MODELO_GEMINI,
+                    contents=construir_prompt(datos_analisis(resultado)),
+                )
+        finally:
+            _liberar_cupo_usuario(cupo)
+
+        datos = parsear_respuesta(respuesta.text)
+        datos["generada"] = timezone.now().isoformat()
+        # update() y no save(): no es un resultado nuevo para las señales de analytics
+        ResultadoD2R.objects.filter(pk=resultado.pk).update(
+            interpretacion=texto_interpretacion(datos), interpretacion_ia=datos
+        )
+        resultado.interpretacion = texto_interpretacion(datos)
+        resultado.interpretacion_ia = datos
+        return datos, True
+    finally:
+        cache_compartida.delete(candado)
@@ -0,0 +1,34 @@
+from django.core.management.base import BaseCommand, CommandError
+from rest_framework.exceptions import ValidationError
+
+from evaluaciones.exportacion import CONJUNTOS, FORMATOS, exportar
+
+
+class Command(BaseCommand):
+    help = "Exporta datos de atención, D2-R o evaluaciones en CSV o formato columnar (memoria constante)"
+
+    def add_arguments(self, parser):
+        parser.add_argument("conjunto", choices=list(CONJUNTOS))
+        parser.add_argument("--formato", choices=list(FORMATOS), default="csv")
+        parser.add_argument("--curso", default=None, help="Id del curso")
+        parser.add_argument("--desde", default=None, help="YYYY-MM-DD o ISO 8601")
+        parser.add_argument("--hasta", default=None, help="YYYY-MM-DD o ISO 8601 (inclusive)")
+        parser.add_argument("--salida", default=None, help="Archivo de salida (por defecto stdout)")
+
+    def handle(self, *args, **options):
+        params = {k: options[k] for k in ("curso", "desde", "hasta") if options[k]}
+        try:
+            lineas = exportar(options["conjunto"], options["formato"], params)
+        except ValidationError as e:
+            raise CommandError(e.detail)
+
+        if options["salida"]:
+            total = 0
+            with open(options["salida"], "w", encoding="utf-8", newline="") as f:
+                for linea in lineas:
+                    f.write(linea)
+                    total += 1
+            self.stderr.write(self.style.SUCCESS(f"{total} líneas escritas en {options['salida']}"))
+        else:
+            for linea in lineas:
+                self.stdout.write(linea, ending="")
@@ -0,0 +1,21 @@
+from django.core.management.base import BaseCommand
+
+from evaluaciones.d2r import repuntuar
+from evaluaciones.models import ResultadoD2R
+
+
+class Command(BaseCommand):
+    help = (
+        "Recalcula totales, índices (TOT, CON, VAR, E%) y percentiles de los resultados D2-R "
+        "guardados a partir de sus filas. Usar tras cambiar las tablas de normas."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--curso", type=int, default=None, help="Limitar a los resultados de un curso")
+
+    def handle(self, *args, **options):
+        queryset = ResultadoD2R.objects.all()
+        if options["curso"] is not None:
+            queryset = queryset.filter(curso_id=options["curso"])
+        total = repuntuar(queryset)
+        self.stdout.write(self.style.SUCCESS(f"{total} resultados D2-R re-puntuados"))
@@ -0,0 +1,40 @@
+# Generated by Django 5.2.8 on 2026-10-19 11:30
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('courses', '0009_versioncatalogo'),
+        ('evaluaciones', '0003_alter_detallefilad2r_ec_alter_detallefilad2r_eo_and_more'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='resultadod2r',
+            index=models.Index(fields=['estudiante', '-fecha'], name='d2r_estudiante_fecha_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='resultadod2r',
+            index=models.Index(fields=['curso', '-fecha'], name='d2r_curso_fecha_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='resultadod2r',
+            index=models.Index(fields=['-fecha'], name='d2r_fecha_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='sesionatencion',
+            index=models.Index(fields=['estudiante', '-fecha'], name='atencion_estudiante_fecha_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='sesionatencion',
+            index=models.Index(fields=['recurso', '-fecha'], name='atencion_recurso_fecha_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='sesionatencion',
+            index=models.Index(fields=['-fecha'], name='atencion_fecha_idx'),
+        ),
+    ]
@@ -0,0 +1,33 @@
+# Generated by Django 5.2.8 on 2026-10-19 11:47
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('evaluaciones', '0004_indices_fecha'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='resultadod2r',
+            name='e_porcentaje',
+            field=models.FloatField(default=0.0, verbose_name='Porcentaje de errores (E%)'),
+        ),
+        migrations.AddField(
+            model_name='resultadod2r',
+            name='grupo_edad',
+            field=models.CharField(choices=[('9-12', '9-12'), ('13-16', '13-16'), ('17-19', '17-19'), ('20-39', '20-39'), ('40-59', '40-59'), ('60+', '60+')], default='20-39', max_length=10),
+        ),
+        migrations.AddField(
+            model_name='resultadod2r',
+            name='percentil_con',
+            field=models.PositiveSmallIntegerField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='resultadod2r',
+            name='percentil_tot',
+            field=models.PositiveSmallIntegerField(blank=True, null=True),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.8 on 2026-10-19 11:51
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('evaluaciones', '0005_d2r_baremo'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='resultadod2r',
+            name='interpretacion_ia',
+            field=models.JSONField(blank=True, null=True),
+        ),
+    ]
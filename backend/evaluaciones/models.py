@@ -2,6 +2,7 @@ from django.db import models
 from django.conf import settings
 # ✅ Importamos los modelos de OTRA app, eso está bien
 from courses.models import Curso, Recurso
+from .d2r import GRUPO_POR_DEFECTO, GRUPOS_EDAD
 
 # ❌ BORRADA LA LÍNEA ERRÓNEA: "from .models import ResultadoD2R..."
 
@@ -21,8 +22,18 @@ class ResultadoD2R(models.Model):
     tot = models.IntegerField(verbose_name="Rendimiento Total (TOT)")
     con = models.FloatField(verbose_name="Concentración (CON)")
     var = models.FloatField(verbose_name="Variabilidad (VAR)", default=0.0)
+    e_porcentaje = models.FloatField(verbose_name="Porcentaje de errores (E%)", default=0.0)
+
+    # Baremo (evaluaciones.d2r.TABLAS_NORMAS)
+    grupo_edad = models.CharField(
+        max_length=10, choices=[(g, g) for g in GRUPOS_EDAD], default=GRUPO_POR_DEFECTO
+    )
+    percentil_con = models.PositiveSmallIntegerField(null=True, blank=True)
+    percentil_tot = models.PositiveSmallIntegerField(null=True, blank=True)
 
     interpretacion = models.TextField(blank=True, null=True)
+    # Diagnóstico y recomendaciones de Gemini; se genera una vez (ver interpretacion.py)
+    interpretacion_ia = models.JSONField(null=True, blank=True)
 
     def __str__(self):
         return f"D2R | {self.estudiante.email} | CON: {self.con}"
@@ -30,6 +41,11 @@ class ResultadoD2R(models.Model):
     class Meta:
         verbose_name = "Resultado Test D2-R"
         verbose_name_plural = "Resultados Tests D2-R"
+        indexes = [
+            models.Index(fields=['estudiante', '-fecha'], name='d2r_estudiante_fecha_idx'),
+            models.Index(fields=['curso', '-fecha'], name='d2r_curso_fecha_idx'),
+            models.Index(fields=['-fecha'], name='d2r_fecha_idx'),
+        ]
 
 class DetalleFilaD2R(models.Model):
     test = models.ForeignKey(ResultadoD2R, related_name='filas', on_delete=models.CASCADE)
@@ -54,6 +70,13 @@ class SesionAtencion(models.Model):
     NIVEL_CHOICES = [('ALTA', 'Alta'), ('MEDIA', 'Media'), ('BAJA', 'Baja')]
     nivel = models.CharField(max_length=10, choices=NIVEL_CHOICES)
 
+    class Meta:
+        indexes = [
+            models.Index(fields=['estudiante', '-fecha'], name='atencion_estudiante_fecha_idx'),
+            models.Index(fields=['recurso', '-fecha'], name='atencion_recurso_fecha_idx'),
+            models.Index(fields=['-fecha'], name='atencion_fecha_idx'),
+        ]
+
     def __str__(self):
         return f"{self.estudiante} - {self.nivel}"
 
@@ -1,4 +1,7 @@
+from django.db import transaction
 from rest_framework import serializers
+
+from .d2r import GRUPO_POR_DEFECTO, totales_desde_filas, validar_numeracion_filas
 from .models import ResultadoD2R, DetalleFilaD2R, SesionAtencion, DetalleAtencion
 
 
@@ -17,7 +20,11 @@ class ResultadoD2RSerializer(serializers.ModelSerializer):
     class Meta:
         model = ResultadoD2R
         fields = '__all__'
-        read_only_fields = ('fecha', 'estudiante')  # El estudiante se asigna automáticamente
+        # El estudiante se asigna automáticamente; los percentiles salen del baremo
+        read_only_fields = ('fecha', 'estudiante', 'percentil_con', 'percentil_tot', 'interpretacion_ia')
+
+    def validate_filas(self, filas):
+        return validar_numeracion_filas(filas)
 
     def create(self, validated_data):
         """
@@ -25,54 +32,25 @@ class ResultadoD2RSerializer(serializers.ModelSerializer):
         - El Frontend puede calcular y enviar totales/índices,
           pero el Backend SIEMPRE recalcula desde 'filas' y sobrescribe.
         - Esto evita manipulación de resultados y deja todo consistente.
-        """
 
-        # 1) Separamos los datos de las filas
+        Cabecera y filas se guardan en una sola transacción: un INSERT para el
+        resultado y un único bulk INSERT para las filas.
+        """
         filas_data = validated_data.pop('filas', [])
 
-        # 2) Asignamos el usuario logueado
-        user = self.context['request'].user
-        validated_data['estudiante'] = user
+        # El estudiante es siempre el usuario logueado
+        validated_data['estudiante'] = self.context['request'].user
 
-        # --- Recalcular totales desde filas (fuente de verdad) ---
-        def _to_int(v):
-            try:
-                return int(v)
-            except Exception:
-                return 0
-
-        tr_total_calc = sum(_to_int(f.get('tr', 0)) for f in filas_data)
-        ta_total_calc = sum(_to_int(f.get('ta', 0)) for f in filas_data)
-        eo_total_calc = sum(_to_int(f.get('eo', 0)) for f in filas_data)
-        ec_total_calc = sum(_to_int(f.get('ec', 0)) for f in filas_data)
-
-        # Fórmulas actuales según tu frontend:
-        # TOT = TR total
-        tot_calc = tr_total_calc
-
-        # CON = TA - EC
-        con_calc = ta_total_calc - ec_total_calc
-
-        # VAR = (max(TR fila) - min(TR fila))
-        tr_por_fila = [_to_int(f.get('tr', 0)) for f in filas_data]
-        var_calc = (max(tr_por_fila) - min(tr_por_fila)) if tr_por_fila else 0.0
-
-        # 3) Sobrescribimos siempre con cálculo del backend (seguro)
-        validated_data['tr_total'] = tr_total_calc
-        validated_data['ta_total'] = ta_total_calc
-        validated_data['eo_total'] = eo_total_calc
-        validated_data['ec_total'] = ec_total_calc
-        validated_data['tot'] = tot_calc
-        validated_data['con'] = float(con_calc)
-        validated_data['var'] = float(var_calc)
-
-        # 4) Creamos el resultado general (Cabecera)
+        # Totales, índices y percentiles recalculados desde las filas (fuente de verdad).
         # Nota: interpretacion puede venir del frontend y se guarda tal cual
-        resultado = ResultadoD2R.objects.create(**validated_data)
+        grupo = validated_data.get('grupo_edad', GRUPO_POR_DEFECTO)
+        validated_data.update(totales_desde_filas(filas_data, grupo))
 
-        # 5) Creamos el detalle fila por fila
-        for fila_data in filas_data:
-            DetalleFilaD2R.objects.create(test=resultado, **fila_data)
+        with transaction.atomic():
+            resultado = ResultadoD2R.objects.create(**validated_data)
+            DetalleFilaD2R.objects.bulk_create([
+                DetalleFilaD2R(test=resultado, **fila_data) for fila_data in filas_data
+            ])
 
         return resultado
 
@@ -85,6 +63,18 @@ class DetalleAtencionSerializer(serializers.ModelSerializer):
         fields = ['segundo', 'es_distraido']
 
 
+class SesionAtencionResumenSerializer(serializers.ModelSerializer):
+    """Representación para listados: solo el resumen de la sesión, sin el detalle por segundo."""
+
+    class Meta:
+        model = SesionAtencion
+        fields = [
+            'id', 'estudiante', 'recurso', 'fecha', 'duracion_total',
+            'segundos_distraido', 'porcentaje_atencion', 'nivel',
+        ]
+        read_only_fields = fields
+
+
 class SesionAtencionSerializer(serializers.ModelSerializer):
     # Campo de escritura: Recibe la lista gigante de segundos
     detalle_cronologico = serializers.ListField(
@@ -93,14 +83,26 @@ class SesionAtencionSerializer(serializers.ModelSerializer):
         required=False
     )
 
-    # Campo de lectura: Muestra los detalles si consultamos la API
-    detalles = DetalleAtencionSerializer(many=True, read_only=True)
+    # Campo de lectura: el detalle por segundo (solo en la ruta de detalle).
+    # Con context['detalles_compactos'] se devuelve en columnas:
+    # {"segundo": [...], "es_distraido": [...]} en lugar de un objeto por segundo.
+    detalles = serializers.SerializerMethodField()
 
     class Meta:
         model = SesionAtencion
         fields = '__all__'
         read_only_fields = ('fecha', 'estudiante', 'nivel')
 
+    def get_detalles(self, obj):
+        # Usa el prefetch de la vista si existe (ya ordenado por segundo)
+        filas = obj.detalles.all()
+        if self.context.get('detalles_compactos'):
+            return {
+                'segundo': [d.segundo for d in filas],
+                'es_distraido': [d.es_distraido for d in filas],
+            }
+        return DetalleAtencionSerializer(filas, many=True).data
+
     def create(self, validated_data):
         # 1. Extraemos el historial de segundos (no es campo del modelo)
         detalles_data = validated_data.pop('detalle_cronologico', [])
@@ -1,3 +1,250 @@
-from django.test import TestCase
+import json
+from unittest import mock
 
-# Create your tests here.
+import numpy as np
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APITestCase
+
+from core.cache_compartida import cache_compartida
+from courses.models import Curso, Modulo, Recurso
+from .d2r import matriz_desde_tuplas, percentil, puntuar, repuntuar, totales_desde_filas
+from .models import DetalleAtencion, DetalleFilaD2R, ResultadoD2R, SesionAtencion
+
+User = get_user_model()
+
+
+class SesionAtencionViewSetTests(APITestCase):
+    """El listado de sesiones muestra solo el resumen; el detalle por segundo va en la ruta de detalle."""
+
+    def setUp(self):
+        self.docente = User.objects.create_user(
+            email='doc@test.com', username='doc', password='x', rol='docente'
+        )
+        self.estudiante = User.objects.create_user(
+            email='est@test.com', username='est', password='x', rol='estudiante'
+        )
+        curso = Curso.objects.create(nombre='Curso', profesor=self.docente)
+        modulo = Modulo.objects.create(curso=curso, nombre='Módulo', orden=0)
+        self.recurso = Recurso.objects.create(modulo=modulo, titulo='Video', tipo='video')
+        self.client.force_authenticate(self.docente)
+
+    def crear_sesion(self, segundos=30):
+        sesion = SesionAtencion.objects.create(
+            estudiante=self.estudiante, recurso=self.recurso, duracion_total=segundos,
+            segundos_distraido=segundos // 3, porcentaje_atencion=66.0, nivel='MEDIA',
+        )
+        DetalleAtencion.objects.bulk_create([
+            DetalleAtencion(sesion=sesion, segundo=s, es_distraido=(s % 3 == 0)) for s in range(segundos)
+        ])
+        return sesion
+
+    def test_listado_sin_detalles_y_consultas_constantes(self):
+        self.crear_sesion()
+        with CaptureQueriesContext(connection) as ctx_uno:
+            self.client.get('/api/evaluaciones/atencion/')
+
+        for _ in range(4):
+            self.crear_sesion()
+        with CaptureQueriesContext(connection) as ctx_cinco:
+            response = self.client.get('/api/evaluaciones/atencion/')
+
+        resultados = response.json()['results']
+        self.assertEqual(len(resultados), 5)
+        self.assertNotIn('detalles', resultados[0])
+        self.assertEqual(len(ctx_uno.captured_queries), len(ctx_cinco.captured_queries))
+
+    def test_detalle_completo_y_compacto(self):
+        sesion = self.crear_sesion(segundos=6)
+
+        detalles = self.client.get(f'/api/evaluaciones/atencion/{sesion.id}/').json()['detalles']
+        self.assertEqual(detalles[1], {'segundo': 1, 'es_distraido': False})
+
+        compacto = self.client.get(f'/api/evaluaciones/atencion/{sesion.id}/?detalles=compacto').json()['detalles']
+        self.assertEqual(compacto['segundo'], list(range(6)))
+        self.assertEqual(compacto['es_distraido'], [True, False, False, True, False, False])
+
+
+class ResultadoD2RCreacionTests(APITestCase):
+    """El envío del D2-R se guarda en una transacción con un bulk INSERT para las filas."""
+
+    def setUp(self):
+        self.estudiante = User.objects.create_user(
+            email='est@test.com', username='est', password='x', rol='estudiante'
+        )
+        self.client.force_authenticate(self.estudiante)
+
+    def enviar(self, numeros):
+        filas = [{'numero_fila': n, 'tr': 40 + n, 'ta': 30, 'eo': 2, 'ec': 1} for n in numeros]
+        return self.client.post('/api/evaluaciones/resultados-d2r/', {
+            'filas': filas, 'tr_total': 0, 'ta_total': 0, 'eo_total': 0, 'ec_total': 0, 'tot': 0, 'con': 0,
+        }, format='json')
+
+    def test_envio_completo(self):
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.enviar(range(14, 0, -1))
+        self.assertEqual(response.status_code, 201)
+
+        inserts = [q['sql'] for q in ctx.captured_queries if q['sql'].startswith('INSERT')]
+        self.assertEqual(len([q for q in inserts if 'detallefilad2r' in q]), 1)
+
+        resultado = response.json()
+        self.assertEqual((resultado['tr_total'], resultado['con'], resultado['var']), (14 * 40 + 105, 406.0, 13.0))
+        self.assertEqual((resultado['tot'], resultado['e_porcentaje']), (665 - 42, 6.32))
+        self.assertEqual(resultado['percentil_con'], percentil('con', 406.0))
+        self.assertEqual(DetalleFilaD2R.objects.filter(test_id=resultado['id']).count(), 14)
+
+    def test_numeracion_invalida(self):
+        for numeros in ([1, 2, 2], [1, 3], [], range(1, 16)):
+            response = self.enviar(numeros)
+            self.assertEqual(response.status_code, 400, numeros)
+        self.assertFalse(ResultadoD2R.objects.exists())
+
+
+class PuntuacionD2RTests(APITestCase):
+    """Puntuación vectorizada del D2-R y percentiles por baremo."""
+
+    def filas(self, n, desplazamiento=0):
+        return [
+            {'numero_fila': i, 'tr': 35 + i + desplazamiento, 'ta': 25 + desplazamiento, 'eo': i % 3, 'ec': i % 2}
+            for i in range(1, n + 1)
+        ]
+
+    def test_cohorte_igual_a_test_individual(self):
+        tests = {7: self.filas(14), 9: self.filas(10, 5), 12: self.filas(14, -10)}
+        tuplas = [(t, f['numero_fila'], f['tr'], f['ta'], f['eo'], f['ec']) for t, filas in tests.items() for f in filas]
+        ids, matriz = matriz_desde_tuplas(tuplas)
+        indices = puntuar(matriz, np.array(['20-39', '9-12', '60+']))
+
+        self.assertEqual(ids.tolist(), [7, 9, 12])
+        for i, (grupo, filas) in enumerate(zip(['20-39', '9-12', '60+'], tests.values())):
+            esperado = totales_desde_filas(filas, grupo)
+            self.assertEqual({k: v[i].item() for k, v in indices.items()}, esperado)
+            self.assertEqual(esperado['percentil_con'], percentil('con', esperado['con'], grupo))
+
+    def test_percentiles_por_grupo(self):
+        self.assertEqual(percentil('con', -50), 0)
+        self.assertEqual(percentil('con', 10_000), 99)
+        # El mismo CON rinde más en un grupo con normas más bajas
+        self.assertGreater(percentil('con', 150, '9-12'), percentil('con', 150, '20-39'))
+
+    def test_repuntuar_historico(self):
+        estudiante = User.objects.create_user(email='e@test.com', username='e', password='x', rol='estudiante')
+        resultado = ResultadoD2R.objects.create(
+            estudiante=estudiante, tr_total=0, ta_total=0, eo_total=0, ec_total=0, tot=0, con=0, grupo_edad='13-16',
+        )
+        filas = self.filas(14)
+        DetalleFilaD2R.objects.bulk_create([DetalleFilaD2R(test=resultado, **f) for f in filas])
+
+        self.assertEqual(repuntuar(), 1)
+        resultado.refresh_from_db()
+        esperado = totales_desde_filas(filas, '13-16')
+        self.assertEqual({campo: getattr(resultado, campo) for campo in esperado}, esperado)
+
+
+class InterpretacionD2RTests(APITestCase):
+    """Gemini se llama una vez por resultado; después se sirve lo guardado."""
+
+    def setUp(self):
+        cache.clear()
+        self.estudiante = User.objects.create_user(email='e@test.com', username='e', password='x', rol='estudiante')
+        self.docente = User.objects.create_user(email='d@test.com', username='d', password='x', rol='docente')
+        self.resultado = ResultadoD2R.objects.create(
+            estudiante=self.estudiante, tr_total=500, ta_total=200, eo_total=10, ec_total=5, tot=485, con=195,
+            interpretacion='Texto local del frontend',
+        )
+        self.url = f'/api/evaluaciones/resultados-d2r/{self.resultado.id}/recomendacion/'
+        self.client_gemini = mock.Mock()
+        self.client_gemini.models.generate_content.return_value = mock.Mock(
+            text='```json\n{"diagnostico": "Buena concentración", "recomendaciones": ["Pausas cortas", "Repasar"]}\n```'
+        )
+        parches = [
+            mock.patch('evaluaciones.views.client', self.client_gemini),
+            mock.patch('evaluaciones.views.GEMINI_DISPONIBLE', True),
+        ]
+        for parche in parches:
+            parche.start()
+            self.addCleanup(parche.stop)
+
+    def test_generada_una_vez_y_reutilizada(self):
+        self.client.force_authenticate(self.estudiante)
+        primera = self.client.post(self.url).json()
+        self.assertTrue(primera['generada_ahora'])
+        self.assertEqual(primera['interpretacion']['recomendaciones'], ['Pausas cortas', 'Repasar'])
+
+        self.client.force_authenticate(self.docente)
+        segunda = self.client.get(self.url).json()
+        self.assertFalse(segunda['generada_ahora'])
+        self.assertEqual(self.client_gemini.models.generate_content.call_count, 1)
+
+        self.resultado.refresh_from_db()
+        self.assertEqual(self.resultado.interpretacion, 'Buena concentración\n- Pausas cortas\n- Repasar')
+
+    def test_concurrencia_limitada(self):
+        self.client.force_authenticate(self.estudiante)
+        # Otra petición está generando este mismo resultado
+        cache_compartida.add(f'd2r:interpretacion:resultado:{self.resultado.id}', 1)
+        self.assertEqual(self.client.post(self.url).status_code, 202)
+        cache_compartida.clear()
+
+        # El usuario ya tiene una llamada en curso (de otro resultado, quizá en otro worker)
+        cache_compartida.set(f'd2r:interpretacion:usuario:{self.estudiante.id}:0', 1)
+        self.assertEqual(self.client.post(self.url).status_code, 429)
+        self.client_gemini.models.generate_content.assert_not_called()
+
+
+class ExportacionTests(APITestCase):
+    """Exportación en streaming: un docente solo exporta los cursos que dicta."""
+
+    def setUp(self):
+        self.docente = User.objects.create_user(email='doc@test.com', username='doc', password='x', rol='docente')
+        otro = User.objects.create_user(email='otro@test.com', username='otro', password='x', rol='docente')
+        self.estudiante = User.objects.create_user(email='est@test.com', username='est', password='x', rol='estudiante')
+        self.curso = Curso.objects.create(nombre='Curso', profesor=self.docente)
+        self.ajeno = Curso.objects.create(nombre='Ajeno', profesor=otro)
+        for curso, n in ((self.curso, 2), (self.ajeno, 1)):
+            recurso = Recurso.objects.create(
+                modulo=Modulo.objects.create(curso=curso, nombre='M', orden=0), titulo='Video', tipo='video'
+            )
+            for _ in range(n):
+                SesionAtencion.objects.create(
+                    estudiante=self.estudiante, recurso=recurso, duracion_total=60,
+                    segundos_distraido=6, porcentaje_atencion=90.0, nivel='ALTA',
+                )
+        self.client.force_authenticate(self.docente)
+
+    def exportar(self, parametros=''):
+        return self.client.get(f'/api/evaluaciones/exportar/atencion/{parametros}')
+
+    def test_docente_necesita_un_curso_propio(self):
+        self.assertEqual(self.exportar().status_code, 400)
+        self.assertEqual(self.exportar('?curso=abc').status_code, 400)
+        self.assertEqual(self.exportar(f'?curso={self.ajeno.id}').status_code, 403)
+        self.assertEqual(self.exportar('?curso=9999').status_code, 404)
+
+        self.client.force_authenticate(self.estudiante)
+        self.assertEqual(self.exportar(f'?curso={self.curso.id}').status_code, 403)
+
+    def test_csv_del_curso(self):
+        response = self.exportar(f'?curso={self.curso.id}')
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.streaming)
+        self.assertIn('attachment; filename="atencion_', response['Content-Disposition'])
+
+        filas = b''.join(response.streaming_content).decode().splitlines()
+        self.assertEqual(filas[0].split(',')[:4], ['id', 'estudiante_id', 'recurso_id', 'recurso__modulo__curso_id'])
+        self.assertEqual(len(filas), 3)
+        self.assertTrue(all(f.split(',')[3] == str(self.curso.id) for f in filas[1:]))
+
+    def test_columnar_por_bloques_sin_filtro_para_admin(self):
+        admin = User.objects.create_user(email='admin@test.com', username='admin', password='x', rol='admin')
+        self.client.force_authenticate(admin)
+        with mock.patch('evaluaciones.exportacion.TAMANO_BLOQUE', 2):
+            response = self.exportar('?formato=columnar')
+            lineas = [json.loads(l) for l in b''.join(response.streaming_content).decode().splitlines()]
+
+        self.assertEqual(lineas[0]['conjunto'], 'atencion')
+        self.assertEqual([l['n'] for l in lineas[1:]], [2, 1])
+        self.assertEqual(len(lineas[1]['datos']['id']), 2)
@@ -1,6 +1,6 @@
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
-from .views import ResultadoD2RViewSet, SesionAtencionViewSet
+from .views import ResultadoD2RViewSet, SesionAtencionViewSet, exportar_datos
 
 router = DefaultRouter()
 
@@ -12,5 +12,7 @@ router.register(r'resultados-d2r', ResultadoD2RViewSet)
 router.register(r'atencion', SesionAtencionViewSet)
 
 urlpatterns = [
+    # Ruta: /api/evaluaciones/exportar/<conjunto>/?formato=csv|columnar
+    path('exportar/<str:conjunto>/', exportar_datos, name='exportar-datos'),
     path('', include(router.urls)),
 ]
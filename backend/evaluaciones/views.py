@@ -1,14 +1,21 @@
 from rest_framework import viewsets, status
-from rest_framework.decorators import action
+from rest_framework.decorators import action, api_view, permission_classes
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated
 from django.conf import settings
-from django.db.models import Avg, Count
-import traceback
+from django.db.models import Avg, Count, Prefetch
+from django.http import StreamingHttpResponse
+from django.utils import timezone
 import json
+import logging
 
+from core.filtros import filtrar_por_ids, filtrar_rango_fechas
+from core.metricas import medir_llm
+from .exportacion import CONJUNTOS, FORMATOS, exportar
 from .models import ResultadoD2R, SesionAtencion, DetalleAtencion
-from .serializers import ResultadoD2RSerializer, SesionAtencionSerializer
+from .serializers import ResultadoD2RSerializer, SesionAtencionResumenSerializer, SesionAtencionSerializer
+
+logger = logging.getLogger(__name__)
 
 
 # ======================================================
@@ -19,14 +26,12 @@ try:
     api_key = getattr(settings, "GEMINI_API_KEY", None) or getattr(settings, "GOOGLE_API_KEY", None)
     client = genai.Client(api_key=api_key) if api_key else None
     GEMINI_DISPONIBLE = bool(client)
-    if GEMINI_DISPONIBLE:
-        print(f"[OK] Gemini disponible (evaluaciones/views)")
-    else:
-        print("[WARNING] No API key found for Gemini (evaluaciones/views)")
+    if not GEMINI_DISPONIBLE:
+        logger.warning("Gemini sin API key: las interpretaciones con IA no están disponibles")
 except Exception:
     GEMINI_DISPONIBLE = False
     client = None
-    print("⚠️ WARNING: google-genai no está disponible")
+    logger.warning("google-genai no está disponible: las interpretaciones con IA no están disponibles")
 
 
 # ======================================================
@@ -37,63 +42,74 @@ class ResultadoD2RViewSet(viewsets.ModelViewSet):
     queryset = ResultadoD2R.objects.all()
     serializer_class = ResultadoD2RSerializer
     permission_classes = [IsAuthenticated]
+    ordering = "-fecha"
+    ordering_fields = ["fecha", "id"]
 
     def get_queryset(self):
         user = self.request.user
-        if getattr(user, "rol", "") in ["admin", "docente"] or user.is_staff:
-            return ResultadoD2R.objects.all()
-        return ResultadoD2R.objects.filter(estudiante=user)
-
-    @action(detail=True, methods=["post"])
+        # Las filas se serializan anidadas: una sola consulta para todas
+        queryset = ResultadoD2R.objects.prefetch_related("filas")
+        if not (getattr(user, "rol", "") in ["admin", "docente"] or user.is_staff):
+            queryset = queryset.filter(estudiante=user)
+
+        params = self.request.query_params
+        queryset = filtrar_por_ids(queryset, params, {
+            "estudiante": "estudiante_id",
+            "curso": "curso_id",
+            "recurso": "recurso_id",
+        })
+        return filtrar_rango_fechas(queryset, params, "fecha")
+
+    @action(detail=True, methods=["get", "post"])
     def recomendacion(self, request, pk=None):
-        if not GEMINI_DISPONIBLE:
+        """
+        Interpretación de Gemini del resultado. Se genera la primera vez y después se sirve
+        guardada a cualquiera que pueda ver el resultado (ver interpretacion.py).
+        """
+        from .interpretacion import (
+            InterpretacionEnCurso, InterpretacionInvalida, LimiteConcurrencia,
+            datos_analisis, obtener_interpretacion,
+        )
+
+        resultado = self.get_object()
+        if not resultado.interpretacion_ia and not GEMINI_DISPONIBLE:
             return Response(
                 {"error": "Gemini AI no está disponible"},
                 status=status.HTTP_503_SERVICE_UNAVAILABLE
             )
 
-        resultado = self.get_object()
-
-        datos_analisis = {
-            "tr_total": resultado.tr_total,
-            "ta_total": resultado.ta_total,
-            "errores": (resultado.eo_total + resultado.ec_total),
-            "con": resultado.con,
-            "var": resultado.var,
-            "tot": getattr(resultado, "tot", None),
-        }
-
-        prompt = f"""
-Eres un tutor experto.
-Analiza el test D2-R del estudiante:
-
-DATOS:
-{datos_analisis}
-
-Devuelve JSON válido:
-{{
-  "diagnostico": "1 frase",
-  "recomendaciones": ["rec1", "rec2", "rec3"]
-}}
-""".strip()
-
         try:
-            response = client.models.generate_content(
-                model="gemini-2.0-flash",
-                contents=prompt
+            interpretacion, generada = obtener_interpretacion(resultado, request.user, client)
+        except InterpretacionEnCurso:
+            return Response(
+                {"ok": False, "estado": "generando"},
+                status=status.HTTP_202_ACCEPTED,
+                headers={"Retry-After": "3"},
             )
-            return Response({
-                "ok": True,
-                "raw": response.text,
-                "input": datos_analisis
-            })
+        except LimiteConcurrencia:
+            return Response(
+                {"error": "Ya hay una interpretación en curso, intenta en unos segundos"},
+                status=status.HTTP_429_TOO_MANY_REQUESTS,
+                headers={"Retry-After": "3"},
+            )
+        except InterpretacionInvalida as e:
+            return Response({"error": str(e)}, status=status.HTTP_502_BAD_GATEWAY)
         except Exception as e:
-            traceback.print_exc()
+            logger.exception("Error llamando a Gemini")
             return Response(
                 {"error": str(e)},
                 status=status.HTTP_503_SERVICE_UNAVAILABLE
             )
 
+        return Response({
+            "ok": True,
+            "interpretacion": interpretacion,
+            "generada_ahora": generada,
+            # Compatibilidad: antes se devolvía el texto crudo de Gemini
+            "raw": json.dumps(interpretacion, ensure_ascii=False),
+            "input": datos_analisis(resultado),
+        })
+
 
 # ======================================================
 # SESIÓN DE ATENCIÓN
@@ -103,12 +119,42 @@ class SesionAtencionViewSet(viewsets.ModelViewSet):
     queryset = SesionAtencion.objects.all()
     serializer_class = SesionAtencionSerializer
     permission_classes = [IsAuthenticated]
+    ordering = "-fecha"
+    ordering_fields = ["fecha", "id"]
 
     def get_queryset(self):
         user = self.request.user
         if getattr(user, "rol", "") in ["admin", "docente"] or user.is_staff:
-            return SesionAtencion.objects.all()
-        return SesionAtencion.objects.filter(estudiante=user)
+            queryset = SesionAtencion.objects.all()
+        else:
+            queryset = SesionAtencion.objects.filter(estudiante=user)
+
+        params = self.request.query_params
+        queryset = filtrar_por_ids(queryset, params, {
+            "estudiante": "estudiante_id",
+            "recurso": "recurso_id",
+            "curso": "recurso__modulo__curso_id",
+        })
+        queryset = filtrar_rango_fechas(queryset, params, "fecha")
+
+        # El detalle por segundo solo se carga en la ruta de detalle, en una sola consulta
+        if self.action == "retrieve":
+            queryset = queryset.prefetch_related(Prefetch(
+                "detalles",
+                queryset=DetalleAtencion.objects.only("sesion_id", "segundo", "es_distraido").order_by("segundo"),
+            ))
+        return queryset
+
+    def get_serializer_class(self):
+        # Los listados nunca serializan DetalleAtencion (pueden ser millones de filas)
+        if self.action == "list":
+            return SesionAtencionResumenSerializer
+        return SesionAtencionSerializer
+
+    def get_serializer_context(self):
+        context = super().get_serializer_context()
+        context["detalles_compactos"] = self.request.query_params.get("detalles") == "compacto"
+        return context
 
     @action(detail=False, methods=["post"])
     def ia(self, request):
@@ -143,13 +189,14 @@ Devuelve JSON:
 """.strip()
 
         try:
-            response = client.models.generate_content(
-                model="gemini-2.0-flash",
-                contents=prompt
-            )
+            with medir_llm():
+                response = client.models.generate_content(
+                    model="gemini-2.0-flash",
+                    contents=prompt
+                )
             return Response({"ok": True, "raw": response.text})
         except Exception as e:
-            traceback.print_exc()
+            logger.exception("Error llamando a Gemini")
             return Response(
                 {"error": str(e)},
                 status=status.HTTP_503_SERVICE_UNAVAILABLE
@@ -211,6 +258,8 @@ Devuelve JSON:
                 "tot": getattr(d2r, "tot", None),
                 "con": d2r.con,
                 "var": d2r.var,
+                "e_porcentaje": d2r.e_porcentaje,
+                "percentil_con": d2r.percentil_con,
             }
 
         prompt = f"""
@@ -233,18 +282,69 @@ Devuelve JSON:
 """.strip()
 
         try:
-            response = client.models.generate_content(
-                model="gemini-2.0-flash",
-                contents=prompt
-            )
+            with medir_llm():
+                response = client.models.generate_content(
+                    model="gemini-2.0-flash",
+                    contents=prompt
+                )
             return Response({
                 "ok": True,
                 "data": response.text,
                 "input": datos
             })
         except Exception as e:
-            traceback.print_exc()
+            logger.exception("Error llamando a Gemini")
             return Response(
                 {"error": str(e)},
                 status=status.HTTP_503_SERVICE_UNAVAILABLE
             )
+
+
+# ======================================================
+# EXPORTACIÓN PARA INVESTIGACIÓN (streaming)
+# ======================================================
+
+@api_view(["GET"])
+@permission_classes([IsAuthenticated])
+def exportar_datos(request, conjunto):
+    """
+    GET /api/evaluaciones/exportar/<conjunto>/?formato=csv|columnar&curso=&desde=&hasta=
+    conjunto: atencion, atencion-detalle, d2r, d2r-filas, evaluaciones
+
+    Un docente exporta solo sus propios cursos, así que para él ?curso= es obligatorio.
+    """
+    from analytics.views import _curso_del_docente
+
+    user = request.user
+    if getattr(user, "rol", "") not in ["admin", "docente"] and not user.is_staff:
+        return Response({"error": "No autorizado"}, status=status.HTTP_403_FORBIDDEN)
+
+    curso_id = request.query_params.get("curso")
+    if curso_id not in (None, ""):
+        if not str(curso_id).isdigit():
+            return Response({"error": "curso debe ser un id numérico"}, status=status.HTTP_400_BAD_REQUEST)
+        _, error = _curso_del_docente(request, int(curso_id))
+        if error:
+            return error
+    elif getattr(user, "rol", "") == "docente" and not user.is_staff:
+        return Response({"error": "curso es requerido"}, status=status.HTTP_400_BAD_REQUEST)
+
+    if conjunto not in CONJUNTOS:
+        return Response(
+            {"error": f"Conjunto inválido. Opciones: {', '.join(CONJUNTOS)}"},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+    formato = request.query_params.get("formato", "csv")
+    if formato not in FORMATOS:
+        return Response(
+            {"error": f"Formato inválido. Opciones: {', '.join(FORMATOS)}"},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+
+    lineas = exportar(conjunto, formato, request.query_params)
+    extension = "csv" if formato == "csv" else "jsonl"
+    nombre = f"{conjunto}_{timezone.now():%Y%m%d_%H%M%S}.{extension}"
+
+    response = StreamingHttpResponse(lineas, content_type=FORMATOS[formato])
+    response["Content-Disposition"] = f'attachment; filename="{nombre}"'
+    return response
@@ -1,6 +1,6 @@
 from django.contrib import admin
 from django.contrib.auth.admin import UserAdmin
-from .models import CustomUser
+from .models import CustomUser, TokenAcceso
 
 class CustomUserAdmin(UserAdmin):
     model = CustomUser
@@ -15,3 +15,11 @@ class CustomUserAdmin(UserAdmin):
     )
 
 admin.site.register(CustomUser, CustomUserAdmin)
+
+
+class TokenAccesoAdmin(admin.ModelAdmin):
+    list_display = ['user', 'created', 'last_used']
+    search_fields = ['user__email']
+    raw_id_fields = ['user']
+
+admin.site.register(TokenAcceso, TokenAccesoAdmin)
@@ -0,0 +1,169 @@
+# backend/users/autenticacion.py
+"""
+Autenticación por token con caché.
+
+TokenAuthentication de DRF hace un SELECT de Token + usuario en cada petición; con el
+registro de atención por segundo y los dashboards que refrescan, es buena parte de la carga
+de la base. Aquí el token se resuelve en este orden:
+
+1. LRU en memoria del proceso (acotado a MAX_ENTRADAS_LOCAL, cada entrada vive TTL_LOCAL s)
+2. caché compartida entre procesos (core.cache_compartida, TTL_COMPARTIDO s)
+3. base de datos, y el resultado se guarda en las dos anteriores
+
+Lo que se guarda es una foto de los campos del usuario (sin la contraseña) con la que se
+reconstruye una instancia nueva en cada petición. Borrar un token, desactivar o modificar
+al usuario invalida las entradas (ver signals.py): la LRU del proceso que atiende el
+cambio y la caché compartida. Los demás workers no se enteran de inmediato: su LRU puede
+aceptar el token revocado a lo sumo TTL_LOCAL segundos más; después leen la caché
+compartida, donde la entrada ya no está.
+
+El vencimiento (TokenAcceso.vencido) se comprueba con la foto. last_used se escribe como
+mucho cada INTERVALO_ULTIMO_USO, así que el camino caliente sigue sin consultas.
+"""
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+
+from django.contrib.auth import get_user_model
+from django.db import DEFAULT_DB_ALIAS
+from django.utils import timezone
+from rest_framework import exceptions
+from rest_framework.authentication import TokenAuthentication
+
+from core.cache_compartida import cache_compartida
+
+from .models import TokenAcceso
+
+User = get_user_model()
+
+MAX_ENTRADAS_LOCAL = 2048
+TTL_LOCAL = 15
+TTL_COMPARTIDO = 5 * 60
+INTERVALO_ULTIMO_USO = 5 * 60
+
+# La contraseña nunca va a la caché; si algo la pide se carga diferida desde la base
+CAMPOS_USUARIO = [f.attname for f in User._meta.concrete_fields if f.attname != 'password']
+
+
+class _LRU:
+    """Diccionario acotado con expiración, seguro entre hilos."""
+
+    def __init__(self, maximo, ttl):
+        self.maximo = maximo
+        self.ttl = ttl
+        self._datos = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, clave):
+        with self._lock:
+            entrada = self._datos.get(clave)
+            if entrada is None:
+                return None
+            vence, valor = entrada
+            if vence < time.monotonic():
+                del self._datos[clave]
+                return None
+            self._datos.move_to_end(clave)
+            return valor
+
+    def set(self, clave, valor):
+        with self._lock:
+            self._datos[clave] = (time.monotonic() + self.ttl, valor)
+            self._datos.move_to_end(clave)
+            while len(self._datos) > self.maximo:
+                self._datos.popitem(last=False)
+
+    def delete(self, clave):
+        with self._lock:
+            self._datos.pop(clave, None)
+
+    def clear(self):
+        with self._lock:
+            self._datos.clear()
+
+
+_local = _LRU(MAX_ENTRADAS_LOCAL, TTL_LOCAL)
+
+
+def clave_token(key):
+    # La clave del token no se guarda en claro en la caché
+    return 'auth:token:' + hashlib.sha256(key.encode('utf-8')).hexdigest()
+
+
+def invalidar_token(key):
+    clave = clave_token(key)
+    _local.delete(clave)
+    cache_compartida.delete(clave)
+
+
+def invalidar_tokens_de(user_id):
+    for key in TokenAcceso.objects.filter(user_id=user_id).values_list('key', flat=True):
+        invalidar_token(key)
+
+
+def _foto(token):
+    return {
+        'token': {
+            'key': token.key, 'user_id': token.user_id,
+            'created': token.created, 'last_used': token.last_used,
+        },
+        'usuario': [getattr(token.user, campo) for campo in CAMPOS_USUARIO],
+    }
+
+
+def _desde_foto(foto):
+    # Instancias nuevas en cada petición: nadie comparte un objeto mutable entre hilos
+    user = User.from_db(DEFAULT_DB_ALIAS, CAMPOS_USUARIO, foto['usuario'])
+    datos = foto['token']
+    token = TokenAcceso.from_db(DEFAULT_DB_ALIAS, list(datos), list(datos.values()))
+    token.user = user
+    return user, token
+
+
+def guardar_foto(token):
+    """Carga en las cachés la foto de un token recién creado (el login no paga el primer fallo)."""
+    clave = clave_token(token.key)
+    foto = _foto(token)
+    cache_compartida.set(clave, foto, TTL_COMPARTIDO)
+    _local.set(clave, foto)
+
+
+class TokenCacheAuthentication(TokenAuthentication):
+    """Drop-in de TokenAuthentication ('Authorization: Token <key>') sin consulta en el camino caliente."""
+
+    model = TokenAcceso
+
+    def authenticate_credentials(self, key):
+        clave = clave_token(key)
+        foto = _local.get(clave)
+        if foto is None:
+            foto = cache_compartida.get(clave)
+            if foto is None:
+                foto = self.foto_desde_db(key)
+                cache_compartida.set(clave, foto, TTL_COMPARTIDO)
+            _local.set(clave, foto)
+
+        user, token = _desde_foto(foto)
+        if not user.is_active:
+            raise exceptions.AuthenticationFailed('User inactive or deleted.')
+
+        ahora = timezone.now()
+        if token.vencido(ahora):
+            invalidar_token(key)
+            raise exceptions.AuthenticationFailed('Token expirado, inicia sesión de nuevo.')
+        if token.last_used is None or (ahora - token.last_used).total_seconds() > INTERVALO_ULTIMO_USO:
+            self.model.objects.filter(pk=key).update(last_used=ahora)
+            token.last_used = ahora
+            # Foto nueva: la anterior puede estar en uso por otro hilo
+            foto = dict(foto, token=dict(foto['token'], last_used=ahora))
+            cache_compartida.set(clave, foto, TTL_COMPARTIDO)
+            _local.set(clave, foto)
+        return user, token
+
+    def foto_desde_db(self, key):
+        try:
+            token = self.model.objects.select_related('user').get(key=key)
+        except self.model.DoesNotExist:
+            raise exceptions.AuthenticationFailed('Invalid token.')
+        return _foto(token)
@@ -0,0 +1,147 @@
+# backend/users/contrasenas.py
+"""
+Hash de contraseñas en lote y verificación acotada para el login.
+
+make_password (PBKDF2) tarda decenas de milisegundos por contraseña a propósito, así que
+crear cientos de usuarios de a uno es lento. Para lotes grandes se reparte el trabajo en un
+pool de procesos; los lotes chicos se procesan en el mismo proceso.
+
+En el login el problema es otro: al empezar una clase entran cientos de estudiantes a la vez
+y cada hash ocupa un hilo de gunicorn. PoolHash limita cuántos hashes corren a la vez por
+proceso y cuántos pueden esperar; el resto se rechaza enseguida (PoolSaturado) en lugar de
+acumularse y dejar sin hilos al registro de atención y a las evaluaciones.
+"""
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures import TimeoutError as FuturoVencido
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import check_password, identify_hasher, make_password
+
+# Por debajo de este tamaño arrancar procesos cuesta más de lo que ahorra
+LOTE_MINIMO_POOL = 32
+MAX_PROCESOS = 4
+
+
+def _inicializar_proceso(settings_module):
+    # Con 'spawn' (macOS/Windows) el proceso hijo no hereda Django configurado
+    import django
+    from django.conf import settings
+
+    if not settings.configured:
+        os.environ.setdefault('DJANGO_SETTINGS_MODULE', settings_module)
+        django.setup()
+
+
+def hashear_en_lote(contrasenas):
+    """Devuelve make_password(c) para cada contraseña, en el mismo orden."""
+    contrasenas = list(contrasenas)
+    if len(contrasenas) < LOTE_MINIMO_POOL:
+        return [make_password(c) for c in contrasenas]
+
+    procesos = max(1, min(MAX_PROCESOS, os.cpu_count() or 1))
+    with ProcessPoolExecutor(
+        max_workers=procesos,
+        initializer=_inicializar_proceso,
+        initargs=(os.environ.get('DJANGO_SETTINGS_MODULE', 'core.settings'),),
+    ) as pool:
+        return list(pool.map(make_password, contrasenas, chunksize=max(1, len(contrasenas) // (procesos * 4))))
+
+
+class PoolSaturado(Exception):
+    pass
+
+
+class PoolHash:
+    """
+    Pool de hilos acotado para hashear contraseñas: `hilos` trabajando y como mucho `cola`
+    esperando. hashlib.pbkdf2_hmac libera el GIL, así que los hilos hashean en paralelo
+    mientras los de gunicorn siguen atendiendo otras peticiones.
+    """
+
+    def __init__(self, hilos, cola, espera):
+        self.hilos = hilos
+        self.capacidad = hilos + cola
+        self.espera = espera
+        self._cupos = threading.BoundedSemaphore(self.capacidad)
+        self._executor = ThreadPoolExecutor(max_workers=hilos, thread_name_prefix='hash-login')
+        self._lock = threading.Lock()
+        self.en_curso = 0
+        self.completadas = 0
+        self.rechazadas = 0
+
+    def _contar(self, campo, delta):
+        with self._lock:
+            setattr(self, campo, getattr(self, campo) + delta)
+
+    def ejecutar(self, funcion, *args):
+        """Ejecuta funcion(*args) en el pool. Lanza PoolSaturado si no hay cupo o si tarda demasiado."""
+        if not self._cupos.acquire(blocking=False):
+            self._contar('rechazadas', 1)
+            raise PoolSaturado()
+        self._contar('en_curso', 1)
+        futuro = self._executor.submit(funcion, *args)
+        # El cupo se devuelve cuando la tarea termina de verdad, aunque el que espera se haya ido
+        futuro.add_done_callback(self._liberar)
+        try:
+            resultado = futuro.result(timeout=self.espera)
+        except FuturoVencido:
+            futuro.cancel()
+            self._contar('rechazadas', 1)
+            raise PoolSaturado()
+        self._contar('completadas', 1)
+        return resultado
+
+    def _liberar(self, futuro):
+        self._contar('en_curso', -1)
+        self._cupos.release()
+
+    def estadisticas(self):
+        with self._lock:
+            return {
+                'hilos': self.hilos,
+                'capacidad': self.capacidad,
+                'en_curso': self.en_curso,
+                'saturacion': round(self.en_curso / self.capacidad, 3),
+                'completadas': self.completadas,
+                'rechazadas': self.rechazadas,
+            }
+
+
+pool_login = PoolHash(
+    hilos=getattr(settings, 'LOGIN_HILOS_HASH', 2),
+    cola=getattr(settings, 'LOGIN_COLA_HASH', 16),
+    espera=getattr(settings, 'LOGIN_ESPERA_HASH', 10),
+)
+
+
+def autenticar(email, password):
+    """
+    Equivalente a authenticate(username=email, password=password) con el ModelBackend, pero
+    con el hash en pool_login: la consulta y el guardado quedan en el hilo de la petición y el
+    pool solo hace cálculo (sin conexiones a la base en sus hilos). Lanza PoolSaturado.
+    """
+    User = get_user_model()
+    try:
+        user = User._default_manager.get_by_natural_key(email)
+    except User.DoesNotExist:
+        # Mismo costo que con un usuario existente, para no revelar qué emails están registrados
+        pool_login.ejecutar(make_password, password)
+        return None
+
+    if not password or not pool_login.ejecutar(check_password, password, user.password):
+        return None
+    if not user.is_active:
+        return None
+
+    # Hash con un algoritmo o número de iteraciones viejo: se actualiza como haría set_password
+    try:
+        desactualizado = identify_hasher(user.password).must_update(user.password)
+    except ValueError:
+        desactualizado = False
+    if desactualizado:
+        user.password = pool_login.ejecutar(make_password, password)
+        user.save(update_fields=['password'])
+    return user
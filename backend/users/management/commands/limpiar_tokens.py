@@ -0,0 +1,22 @@
+from django.core.management.base import BaseCommand
+
+from users.models import TokenAcceso
+
+
+class Command(BaseCommand):
+    help = (
+        "Borra los tokens de acceso vencidos por lotes (usa los índices de created y last_used). "
+        "Pensado para ejecutarse periódicamente, por ejemplo con cron cada hora."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--lote", type=int, default=1000, help="Tokens borrados por consulta")
+
+    def handle(self, *args, **options):
+        total = 0
+        while True:
+            claves = list(TokenAcceso.objects.vencidos().values_list("key", flat=True)[:options["lote"]])
+            if not claves:
+                break
+            total += TokenAcceso.objects.filter(key__in=claves).delete()[0]
+        self.stdout.write(self.style.SUCCESS(f"{total} tokens vencidos borrados"))
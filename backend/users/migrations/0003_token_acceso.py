@@ -0,0 +1,45 @@
+# Generated by Django 5.2.8 on 2026-10-19 11:54
+
+import django.db.models.deletion
+import django.utils.timezone
+import users.models
+from django.conf import settings
+from django.db import migrations, models
+from django.utils import timezone
+
+
+def copiar_tokens(apps, schema_editor):
+    # Los tokens de rest_framework.authtoken pasan a TokenAcceso con la fecha del despliegue,
+    # para no cerrar todas las sesiones abiertas de golpe
+    Token = apps.get_model('authtoken', 'Token')
+    TokenAcceso = apps.get_model('users', 'TokenAcceso')
+    ahora = timezone.now()
+    TokenAcceso.objects.bulk_create(
+        [TokenAcceso(key=t.key, user_id=t.user_id, created=ahora) for t in Token.objects.all().iterator()],
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0002_rol_indice'),
+        ('authtoken', '0004_alter_tokenproxy_options'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TokenAcceso',
+            fields=[
+                ('key', models.CharField(default=users.models.generar_clave_token, max_length=40, primary_key=True, serialize=False)),
+                ('created', models.DateTimeField(db_index=True, default=django.utils.timezone.now)),
+                ('last_used', models.DateTimeField(blank=True, db_index=True, null=True)),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='tokens', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name': 'Token de acceso',
+                'verbose_name_plural': 'Tokens de acceso',
+            },
+        ),
+        migrations.RunPython(copiar_tokens, migrations.RunPython.noop),
+    ]
@@ -1,5 +1,44 @@
-from django.contrib.auth.models import AbstractUser
+import secrets
+from datetime import timedelta
+
+from django.conf import settings
+from django.contrib.auth.models import AbstractUser, UserManager
 from django.db import models
+from django.utils import timezone
+from django.db.models import Exists, OuterRef, Q
+
+
+class UsuarioQuerySet(models.QuerySet):
+    """Consultas por rol e inscripción (usan el índice (rol, id) y la tabla de inscripciones)."""
+
+    def estudiantes(self):
+        return self.filter(rol='estudiante')
+
+    def docentes(self):
+        return self.filter(rol='docente')
+
+    def inscritos_en(self, curso_id):
+        return self.filter(cursos_inscritos__id=curso_id)
+
+    def alumnos_de(self, docente):
+        """Estudiantes inscritos en algún curso del docente (sin duplicados ni DISTINCT)."""
+        from courses.models import Curso
+        return self.estudiantes().filter(
+            Exists(Curso.objects.filter(profesor=docente, estudiantes=OuterRef('pk')))
+        )
+
+    def visibles_para(self, user):
+        # Admin ve todo; docente, a sí mismo y a los estudiantes; estudiante, solo a sí mismo
+        if user.is_staff or getattr(user, 'rol', '') == 'admin':
+            return self.all()
+        if getattr(user, 'rol', '') == 'docente':
+            return self.filter(Q(rol='estudiante') | Q(pk=user.pk))
+        return self.filter(pk=user.pk)
+
+
+class CustomUserManager(UserManager.from_queryset(UsuarioQuerySet)):
+    pass
+
 
 class CustomUser(AbstractUser):
     # Definimos los roles posibles
@@ -15,5 +54,65 @@ class CustomUser(AbstractUser):
     USERNAME_FIELD = 'email'
     REQUIRED_FIELDS = ['username', 'rol']
 
+    objects = CustomUserManager()
+
+    class Meta(AbstractUser.Meta):
+        indexes = [
+            # Listados por rol paginados por id (directorio de estudiantes)
+            models.Index(fields=['rol', 'id'], name='usuario_rol_id_idx'),
+        ]
+
     def __str__(self):
         return self.email
+
+
+def generar_clave_token():
+    return secrets.token_hex(20)
+
+
+def duracion_token():
+    return timedelta(hours=getattr(settings, 'TOKEN_DURACION_HORAS', 24 * 7))
+
+
+def inactividad_token():
+    return timedelta(hours=getattr(settings, 'TOKEN_INACTIVIDAD_HORAS', 48))
+
+
+class TokenAccesoQuerySet(models.QuerySet):
+    def vencidos(self, ahora=None):
+        ahora = ahora or timezone.now()
+        return self.filter(
+            Q(created__lt=ahora - duracion_token())
+            | Q(last_used__lt=ahora - inactividad_token())
+            | Q(last_used__isnull=True, created__lt=ahora - inactividad_token())
+        )
+
+
+class TokenAcceso(models.Model):
+    """
+    Token de la API ('Authorization: Token <key>') con vencimiento.
+
+    Vence TOKEN_DURACION_HORAS después de creado o tras TOKEN_INACTIVIDAD_HORAS sin uso.
+    Cada login crea uno nuevo (un usuario puede tener varios, uno por dispositivo) y
+    /api/token/renovar/ lo rota sin volver a pedir la contraseña.
+    """
+    key = models.CharField(max_length=40, primary_key=True, default=generar_clave_token)
+    user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='tokens')
+    created = models.DateTimeField(default=timezone.now, db_index=True)
+    # Se actualiza como mucho cada pocos minutos (ver autenticacion.py), no en cada petición
+    last_used = models.DateTimeField(null=True, blank=True, db_index=True)
+
+    objects = TokenAccesoQuerySet.as_manager()
+
+    class Meta:
+        verbose_name = 'Token de acceso'
+        verbose_name_plural = 'Tokens de acceso'
+
+    def expira(self):
+        return min(self.created + duracion_token(), (self.last_used or self.created) + inactividad_token())
+
+    def vencido(self, ahora=None):
+        return (ahora or timezone.now()) >= self.expira()
+
+    def __str__(self):
+        return f"Token de {self.user_id} ({self.created:%Y-%m-%d %H:%M})"
@@ -0,0 +1,23 @@
+# backend/users/signals.py
+from django.contrib.auth import get_user_model
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .autenticacion import invalidar_token, invalidar_tokens_de
+from .models import TokenAcceso
+
+User = get_user_model()
+
+
+@receiver(post_delete, sender=TokenAcceso)
+def token_borrado(sender, instance, **kwargs):
+    invalidar_token(instance.key)
+
+
+@receiver(post_save, sender=User)
+def usuario_guardado(sender, instance, created, update_fields=None, **kwargs):
+    # update_last_login guarda solo last_login en cada login: no cambia lo que usa la autenticación
+    if created or (update_fields and set(update_fields) == {'last_login'}):
+        return
+    invalidar_tokens_de(instance.pk)
+
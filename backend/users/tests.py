@@ -1,3 +1,173 @@
-from django.test import TestCase
+import io
+import threading
+from datetime import timedelta
+from unittest import mock
 
-# Create your tests here.
+from django.contrib.auth import get_user_model
+from django.core.cache import cache, caches
+from django.core.cache.backends.locmem import LocMemCache
+from django.core.management import call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.test import APITestCase
+
+from .autenticacion import _LRU, _local
+from .contrasenas import PoolHash, PoolSaturado
+from .models import TokenAcceso
+
+User = get_user_model()
+
+
+def consultas_token(consultas):
+    return [c for c in consultas if 'users_tokenacceso' in c['sql'] or 'users_customuser' in c['sql']]
+
+
+class TokenCacheAuthenticationTests(APITestCase):
+    """El token se resuelve desde la caché y se invalida al borrarlo o desactivar al usuario."""
+
+    def setUp(self):
+        cache.clear()
+        _local.clear()
+        self.user = User.objects.create_user(email='e@test.com', username='e', password='x', rol='estudiante')
+        self.token = TokenAcceso.objects.create(user=self.user, last_used=timezone.now())
+        self.client.credentials(HTTP_AUTHORIZATION=f'Token {self.token.key}')
+
+    def consultas_me(self):
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get('/api/me/')
+        return response, ctx.captured_queries
+
+    def test_sin_consultas_en_el_camino_caliente(self):
+        response, consultas = self.consultas_me()
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(consultas_token(consultas)), 1)
+
+        response, consultas = self.consultas_me()
+        self.assertEqual(response.json()['email'], 'e@test.com')
+        self.assertEqual(consultas, [])
+
+        # Sin la LRU local, la caché compartida también evita las tablas de token y usuario
+        # (en los tests es la tabla de caché de la base)
+        _local.clear()
+        self.assertEqual(consultas_token(self.consultas_me()[1]), [])
+
+    def test_invalidacion(self):
+        self.assertEqual(self.consultas_me()[0].status_code, 200)
+        self.user.is_active = False
+        self.user.save()
+        self.assertEqual(self.consultas_me()[0].status_code, 401)
+
+        self.user.is_active = True
+        self.user.save()
+        self.assertEqual(self.consultas_me()[0].status_code, 200)
+        self.token.delete()
+        self.assertEqual(self.consultas_me()[0].status_code, 401)
+
+    def test_revocacion_desde_otro_proceso(self):
+        # Una caché LocMem sería otra caché local más: no llegaría a los demás workers
+        self.assertNotIsInstance(caches['compartida'], LocMemCache)
+        self.assertEqual(self.consultas_me()[0].status_code, 200)
+
+        # Otro worker cierra la sesión: tiene su propia LRU y solo comparte la caché compartida
+        with mock.patch('users.autenticacion._local', _LRU(10, 60)):
+            self.client.post('/api/logout/')
+
+        # Aquí la LRU puede aceptar el token hasta TTL_LOCAL segundos; vencida, se rechaza
+        self.assertEqual(self.consultas_me()[0].status_code, 200)
+        _local.clear()
+        self.assertEqual(self.consultas_me()[0].status_code, 401)
+
+
+class LoginTokensTests(APITestCase):
+    """Tokens con vencimiento, rotación y límite de intentos fallidos en el login."""
+
+    def setUp(self):
+        cache.clear()
+        _local.clear()
+        self.user = User.objects.create_user(email='e@test.com', username='e', password='clave-123', rol='estudiante')
+
+    def login(self, password='clave-123', **extra):
+        return self.client.post('/api/login/', {'username': 'e@test.com', 'password': password}, format='json', **extra)
+
+    def test_login_rotacion_y_logout(self):
+        token = self.login().json()['token']
+        auth = {'HTTP_AUTHORIZATION': f'Token {token}'}
+
+        # Un token vigente en la cabecera no reemplaza a la contraseña
+        self.assertEqual(self.login(password='mala', **auth).status_code, 401)
+        self.assertEqual(TokenAcceso.objects.count(), 1)
+
+        renovado = self.client.post('/api/token/renovar/', **auth).json()['token']
+        self.assertNotEqual(renovado, token)
+        self.assertEqual(self.client.get('/api/me/', **auth).status_code, 401)
+        self.assertEqual(list(TokenAcceso.objects.values_list('key', flat=True)), [renovado])
+
+        self.assertEqual(self.client.post('/api/logout/', HTTP_AUTHORIZATION=f'Token {renovado}').status_code, 204)
+        self.assertFalse(TokenAcceso.objects.exists())
+
+    def test_vencimiento_y_limpieza(self):
+        token = TokenAcceso.objects.create(user=self.user, created=timezone.now() - timedelta(days=30))
+        vigente = TokenAcceso.objects.create(user=self.user, last_used=timezone.now())
+
+        response = self.client.get('/api/me/', HTTP_AUTHORIZATION=f'Token {token.key}')
+        self.assertEqual(response.status_code, 401)
+
+        call_command('limpiar_tokens', stdout=io.StringIO())
+        self.assertEqual(list(TokenAcceso.objects.values_list('key', flat=True)), [vigente.key])
+
+    def test_limite_de_fallos_antes_del_hash(self):
+        for _ in range(5):
+            self.assertEqual(self.login('mala').status_code, 401)
+        with mock.patch('users.views.autenticar') as autenticar:
+            self.assertEqual(self.login().status_code, 429)
+        autenticar.assert_not_called()
+
+
+    def test_fallos_por_ip_con_cabecera_falsificada(self):
+        def intento(i):
+            # El cliente inventa la parte izquierda; el router agrega su IP real a la derecha
+            return self.client.post(
+                '/api/login/', {'username': f'nadie{i}@test.com', 'password': 'x'}, format='json',
+                HTTP_X_FORWARDED_FOR=f'10.0.0.{i}, 203.0.113.7',
+            ).status_code
+
+        with mock.patch('users.views.FALLOS_POR_IP', 3):
+            self.assertEqual([intento(i) for i in range(3)], [401, 401, 401])
+            self.assertEqual(intento(99), 429)
+            # Otra IP real no hereda el bloqueo
+            self.assertEqual(self.login(HTTP_X_FORWARDED_FOR='203.0.113.8').status_code, 200)
+
+class PoolHashTests(APITestCase):
+    """El pool de hash del login acota lo que corre y lo que espera, y rechaza el resto enseguida."""
+
+    def test_rechazo_rapido_al_saturarse(self):
+        pool = PoolHash(hilos=1, cola=1, espera=5)
+        liberar = threading.Event()
+        hilos = [threading.Thread(target=pool.ejecutar, args=(liberar.wait,)) for _ in range(2)]
+        for hilo in hilos:
+            hilo.start()
+        while pool.estadisticas()['en_curso'] < 2:
+            liberar.wait(0.01)
+
+        with self.assertRaises(PoolSaturado):
+            pool.ejecutar(len, 'x')
+        self.assertEqual(pool.estadisticas()['saturacion'], 1.0)
+
+        liberar.set()
+        for hilo in hilos:
+            hilo.join()
+        self.assertEqual(pool.ejecutar(len, 'abc'), 3)
+        estadisticas = pool.estadisticas()
+        self.assertEqual((estadisticas['completadas'], estadisticas['rechazadas']), (3, 1))
+
+    def test_login(self):
+        cache.clear()
+        User.objects.create_user(email='e@test.com', username='e', password='clave-123', rol='estudiante')
+        datos = {'username': 'e@test.com', 'password': 'clave-123'}
+        self.assertEqual(self.client.post('/api/login/', datos, format='json').status_code, 200)
+        self.assertEqual(self.client.post('/api/login/', dict(datos, password='otra'), format='json').status_code, 401)
+
+        with mock.patch('users.contrasenas.pool_login.ejecutar', side_effect=PoolSaturado):
+            response = self.client.post('/api/login/', datos, format='json')
+        self.assertEqual(response.status_code, 503)
@@ -1,7 +1,7 @@
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
 # ❌ Quitamos 'login_api' y agregamos 'CustomAuthToken'
-from .views import CustomAuthToken, UserViewSet, UserMeView
+from .views import CustomAuthToken, EstadoPoolLoginView, LogoutView, RenovarTokenView, UserViewSet, UserMeView
 
 # ✅ Creamos el router para las vistas basadas en ViewSet (UserViewSet)
 router = DefaultRouter()
@@ -14,6 +14,13 @@ urlpatterns = [
     # ✅ Ruta Login CORREGIDA: Usamos la clase personalizada que acepta Email
     path('login/', CustomAuthToken.as_view(), name='login'),
 
+    # Rotación del token (sin contraseña) y cierre de sesión
+    path('token/renovar/', RenovarTokenView.as_view(), name='renovar_token'),
+    path('logout/', LogoutView.as_view(), name='logout'),
+
+    # Métrica de saturación del pool de hash del login (admin)
+    path('login/pool/', EstadoPoolLoginView.as_view(), name='estado_pool_login'),
+
     # ✅ Ruta para recuperar usuario (Fix pantalla blanca)
     path('me/', UserMeView.as_view(), name='user_me'),
 ]
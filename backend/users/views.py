@@ -1,74 +1,172 @@
+import logging
+
 from rest_framework import viewsets, status, permissions
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework.authtoken.views import ObtainAuthToken
-from rest_framework.authtoken.models import Token
-from django.contrib.auth import get_user_model, authenticate
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from core import limites
+from core.filtros import filtrar_por_ids
+from .autenticacion import guardar_foto
+from .contrasenas import PoolSaturado, autenticar, pool_login
+from .models import TokenAcceso
 from .serializers import UserSerializer
 
 User = get_user_model()
+logger = logging.getLogger(__name__)
+
+# Límites del login: se comprueban ANTES de autenticar(), que es lo caro (hash PBKDF2).
+# Solo cuentan los intentos fallidos: un aula entera detrás de la misma IP puede entrar a la vez.
+FALLOS_POR_CUENTA = 5
+FALLOS_POR_IP = 50
+VENTANA_FALLOS = 15 * 60
+# Sesiones abiertas a la vez por usuario (un token por dispositivo)
+MAX_TOKENS_POR_USUARIO = 10
+
+
+def ip_cliente(request):
+    """
+    IP que agregó a X-Forwarded-For el primero de nuestros PROXIES_CONFIABLES, contando desde
+    la derecha. Las entradas anteriores las controla el cliente: usarlas dejaría esquivar
+    FALLOS_POR_IP cambiando la cabecera en cada intento.
+    """
+    proxies = settings.PROXIES_CONFIABLES
+    reenviada = [ip.strip() for ip in request.META.get('HTTP_X_FORWARDED_FOR', '').split(',') if ip.strip()]
+    if proxies > 0 and len(reenviada) >= proxies:
+        return reenviada[-proxies]
+    return request.META.get('REMOTE_ADDR', '')
+
+
+def emitir_token(user, anterior=None):
+    """Crea un token nuevo (borrando `anterior` si se rota) y poda los más viejos del usuario."""
+    token = TokenAcceso(user=user)
+    token.last_used = token.created
+    token.save(force_insert=True)
+    if anterior is not None:
+        anterior.delete()
+
+    sobrantes = list(
+        TokenAcceso.objects.filter(user=user).order_by('-created').values_list('key', flat=True)[MAX_TOKENS_POR_USUARIO:]
+    )
+    if sobrantes:
+        TokenAcceso.objects.filter(key__in=sobrantes).delete()
+
+    token.user = user
+    guardar_foto(token)
+    return token
+
+
+def respuesta_token(token, user):
+    return Response({
+        'token': token.key,
+        'expira': token.expira(),
+        'user_id': user.pk,
+        'email': user.email,
+        'username': user.username, # Devuelve el username interno por si acaso
+        'rol': getattr(user, 'rol', 'estudiante')
+    })
+
 
 # ✅ 1. VISTA DE LOGIN CORREGIDA PARA 'USERNAME_FIELD = email'
 class CustomAuthToken(ObtainAuthToken):
+    # Un token viejo o vencido en la cabecera no debe impedir iniciar sesión. El login siempre
+    # pide la contraseña; rotar un token vigente se hace en /api/token/renovar/
+    authentication_classes = ()
+
     def post(self, request, *args, **kwargs):
         # El frontend envía el email dentro del campo 'username'
-        email_recibido = request.data.get('username')
+        email_recibido = (request.data.get('username') or '').strip()
         password_recibido = request.data.get('password')
 
-        print(f"📩 Intentando login con Email: {email_recibido}")
-
-        # Como en models.py tienes USERNAME_FIELD = 'email',
-        # la función authenticate espera que el argumento 'username' SEA EL EMAIL.
-        user = authenticate(username=email_recibido, password=password_recibido)
+        clave_cuenta = f"login:cuenta:{email_recibido.lower()}"
+        clave_ip = f"login:ip:{ip_cliente(request)}"
+        if limites.excedido(clave_cuenta, FALLOS_POR_CUENTA) or limites.excedido(clave_ip, FALLOS_POR_IP):
+            return Response(
+                {'error': 'Demasiados intentos fallidos, intenta más tarde'},
+                status=status.HTTP_429_TOO_MANY_REQUESTS,
+                headers={'Retry-After': str(VENTANA_FALLOS)},
+            )
+
+        # USERNAME_FIELD = 'email'. El hash corre en el pool acotado de login
+        # (users.contrasenas): en un pico se rechaza rápido en vez de ocupar todos los hilos.
+        try:
+            user = autenticar(email_recibido, password_recibido)
+        except PoolSaturado:
+            return Response(
+                {'error': 'Hay muchos inicios de sesión en este momento, intenta en unos segundos'},
+                status=status.HTTP_503_SERVICE_UNAVAILABLE,
+                headers={'Retry-After': '2'},
+            )
 
         if not user:
-            print("❌ Falló authenticate(). Verifica contraseña.")
+            # Sin el email: los intentos fallidos ya se cuentan por cuenta en core.limites
+            logger.info("Login fallido", extra={"ip": ip_cliente(request)})
+            limites.contar(clave_cuenta, VENTANA_FALLOS)
+            limites.contar(clave_ip, VENTANA_FALLOS)
             return Response({'error': 'Credenciales inválidas'}, status=status.HTTP_401_UNAUTHORIZED)
 
         if not user.is_active:
             return Response({'error': 'Usuario inactivo'}, status=status.HTTP_401_UNAUTHORIZED)
 
-        # Si llegamos aquí, todo está bien
-        token, created = Token.objects.get_or_create(user=user)
+        # Si llegamos aquí, todo está bien: cada login emite un token nuevo con vencimiento
+        limites.reiniciar(clave_cuenta)
+        return respuesta_token(emitir_token(user), user)
 
-        return Response({
-            'token': token.key,
-            'user_id': user.pk,
-            'email': user.email,
-            'username': user.username, # Devuelve el username interno por si acaso
-            'rol': getattr(user, 'rol', 'estudiante')
-        })
 
-# ✅ 2. VIEWSET DE USUARIOS (Sin cambios)
-from django.db.models import Q
+class RenovarTokenView(APIView):
+    """Rota el token actual: devuelve uno nuevo y el anterior deja de valer."""
+    permission_classes = [permissions.IsAuthenticated]
 
-# ✅ 2. VIEWSET DE USUARIOS (Sin cambios)
+    def post(self, request):
+        if not isinstance(request.auth, TokenAcceso):
+            return Response({'error': 'Se requiere autenticación por token'}, status=status.HTTP_400_BAD_REQUEST)
+        return respuesta_token(emitir_token(request.user, request.auth), request.user)
+
+
+class EstadoPoolLoginView(APIView):
+    """Saturación del pool de hash del login en este proceso (solo admin)."""
+    permission_classes = [permissions.IsAdminUser]
+
+    def get(self, request):
+        return Response(pool_login.estadisticas())
+
+
+class LogoutView(APIView):
+    """Invalida el token con el que se hizo la petición."""
+    permission_classes = [permissions.IsAuthenticated]
+
+    def post(self, request):
+        if isinstance(request.auth, TokenAcceso):
+            request.auth.delete()
+        return Response(status=status.HTTP_204_NO_CONTENT)
+
+# ✅ 2. VIEWSET DE USUARIOS
 class UserViewSet(viewsets.ModelViewSet):
     queryset = User.objects.all()
     serializer_class = UserSerializer
     permission_classes = [permissions.IsAuthenticated]
+    ordering = 'id'
+    ordering_fields = ['id', 'email', 'date_joined']
 
     def get_queryset(self):
         user = self.request.user
-        queryset = User.objects.all()
-
-        # Si es Admin, ve todo
-        if user.is_staff or getattr(user, 'rol', '') == 'admin':
-            pass
-            
-        # Si es Docente, ve a sí mismo Y a los estudiantes
-        elif getattr(user, 'rol', '') == 'docente':
-            queryset = queryset.filter(Q(id=user.id) | Q(rol='estudiante'))
-            
-        # Si es Estudiante, solo se ve a sí mismo
-        else:
-            queryset = queryset.filter(id=user.id)
+
+        # Admin ve todo; Docente, a sí mismo y a los estudiantes; Estudiante, solo a sí mismo
+        queryset = User.objects.visibles_para(user)
 
         # Filtro por rol (opcional)
         rol_param = self.request.query_params.get('rol')
         if rol_param:
             queryset = queryset.filter(rol=rol_param)
 
+        # Solo los estudiantes inscritos en los cursos del docente (opcional)
+        if self.request.query_params.get('mis_estudiantes') == 'true':
+            queryset = queryset.alumnos_de(user)
+
+        # Filtro por curso (estudiantes inscritos) (opcional)
+        queryset = filtrar_por_ids(queryset, self.request.query_params, {'curso': 'cursos_inscritos__id'})
+
         return queryset
 
 # ✅ 3. VISTA "ME" (Sin cambios)
@@ -29,16 +29,25 @@ export default function DocenteDashboard() {
 
         // ✅ FUNCIÓN HELPER PARA EVITAR EL ERROR "Unexpected token <"
         // Si la API falla (404/500), devuelve un array vacío en lugar de romper la app.
+        // Las listas vienen paginadas por cursor ({ next, results }): se recorren todas las páginas.
         const safeFetch = async (endpoint) => {
           try {
-            const res = await fetch(`${API_URL}${endpoint}`, {
-              headers: { 'Authorization': `Token ${token}` }
-            });
-            if (!res.ok) {
-              console.error(`⚠️ Error ${res.status} en ${endpoint}`);
-              return [];
+            let url = `${API_URL}${endpoint}`;
+            const items = [];
+            while (url) {
+              const res = await fetch(url, {
+                headers: { 'Authorization': `Token ${token}` }
+              });
+              if (!res.ok) {
+                console.error(`⚠️ Error ${res.status} en ${endpoint}`);
+                return items;
+              }
+              const data = await res.json();
+              if (!Array.isArray(data.results)) return data;
+              items.push(...data.results);
+              url = data.next;
             }
-            return await res.json();
+            return items;
           } catch (err) {
             console.error(`❌ Error de conexión en ${endpoint}:`, err);
             return [];
@@ -46,7 +55,7 @@ export default function DocenteDashboard() {
         };
 
         // 1. Obtener Cursos del Docente
-        const dataCursos = await safeFetch('/api/cursos/');
+        const dataCursos = await safeFetch('/api/cursos/?expand=modulos.recursos,estudiantes');
         setCursos(dataCursos);
 
         // 2. Identificar qué estudiantes están inscritos en mis cursos
@@ -59,16 +68,20 @@ export default function DocenteDashboard() {
           });
         }
 
-        // 3. Obtener Usuarios (Estudiantes)
-        const allStudents = await safeFetch('/api/users/?rol=estudiante');
-        // Filtramos solo mis alumnos
+        // 3. Obtener solo los estudiantes inscritos en mis cursos (el backend filtra)
+        const allStudents = await safeFetch('/api/users/?mis_estudiantes=true');
         const myStudents = allStudents.filter(s => studentIds.has(s.id));
 
-        // 4. Obtener Resultados del Test D2-R (Capacidad)
-        const dataD2R = await safeFetch('/api/evaluaciones/resultados-d2r/');
-
-        // 5. Obtener Sesiones de Atención (Comportamiento en Video)
-        const dataAtencion = await safeFetch('/api/evaluaciones/atencion/');
+        // 4 y 5. Resultados del Test D2-R (Capacidad) y Sesiones de Atención (Comportamiento en Video),
+        // pedidos solo para mis cursos (?curso=) y no recorriendo toda la plataforma
+        const porCurso = async (endpoint) => {
+          const listas = await Promise.all(dataCursos.map(c => safeFetch(`${endpoint}?curso=${c.id}`)));
+          return listas.flat();
+        };
+        const [dataD2R, dataAtencion] = await Promise.all([
+          porCurso('/api/evaluaciones/resultados-d2r/'),
+          porCurso('/api/evaluaciones/atencion/'),
+        ]);
 
         // 6. PROCESAMIENTO INTELIGENTE (Cruzar todo)
         const estudiantesProcesados = myStudents.map(est => {
@@ -4,7 +4,7 @@ import { useAuth } from '../../../context/AuthContext';
 import { API_URL } from '@/config/api';
 
 export default function RecursosRecomendados() {
-  const { token } = useAuth();
+  const { token, bootstrap } = useAuth();
   const [loading, setLoading] = useState(true);
   const [recursos, setRecursos] = useState([]);
   const [nivelAtencion, setNivelAtencion] = useState(null);
@@ -16,6 +16,14 @@ export default function RecursosRecomendados() {
   const fetchRecursos = async () => {
     if (!token) return;
 
+    // El arranque de sesión ya trae las recomendaciones: se muestran enseguida y se piden
+    // igual, porque una evaluación o un recurso marcado como visto las cambia después
+    if (bootstrap?.recomendaciones) {
+      setRecursos(bootstrap.recomendaciones);
+      setNivelAtencion(bootstrap.atencion?.nivel || null);
+      setLoading(false);
+    }
+
     try {
       const res = await fetch(`${API_URL}/api/recursos-recomendados/`, {
         headers: { 'Authorization': `Token ${token}` }
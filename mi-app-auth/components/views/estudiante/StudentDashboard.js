@@ -25,13 +25,14 @@ export default function StudentDashboard() {
       if (!token) return;
 
       try {
-        const res = await fetch(`${API_URL}/api/cursos/`, {
+        const res = await fetch(`${API_URL}/api/cursos/?expand=modulos`, {
           headers: { 'Authorization': `Token ${token}` }
         });
 
         if (res.ok) {
           const data = await res.json();
-          setCursos(data);
+          // La API devuelve listas paginadas: { next, previous, results }
+          setCursos(data.results ?? data);
         }
       } catch (error) {
         console.error("Error de conexión:", error);
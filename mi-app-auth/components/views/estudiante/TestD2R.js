@@ -136,7 +136,8 @@ export default function TestD2R({ cursoId, recursoId, onFinished }) {
       return { numero_fila: index + 1, tr: trFila, ta: A, eo: EO, ec: EC };
     });
 
-    const tot_total = tr_total;
+    // TOT = TR - (EO + EC); el servidor lo recalcula y su valor reemplaza a este al guardar
+    const tot_total = tr_total - (eo_total + ec_total);
     const con_total = ta_total - ec_total;
     const var_total = tr_por_fila.length > 0 ? (Math.max(...tr_por_fila) - Math.min(...tr_por_fila)) : 0;
     const e_porcentaje = tr_total > 0 ? ((eo_total + ec_total) / tr_total) * 100 : 0;
@@ -187,6 +188,13 @@ export default function TestD2R({ cursoId, recursoId, onFinished }) {
         throw new Error(`HTTP ${res.status} - ${txt || 'Error al guardar'}`);
       }
 
+      // Se muestran las puntuaciones calculadas por el servidor, que son las que quedan guardadas
+      const guardado = await res.json().catch(() => null);
+      if (guardado) {
+        const campos = ['tr_total', 'ta_total', 'eo_total', 'ec_total', 'tot', 'con', 'var', 'e_porcentaje'];
+        const puntuaciones = Object.fromEntries(campos.filter(c => guardado[c] != null).map(c => [c, guardado[c]]));
+        setResultadosFinales(prev => ({ ...prev, ...puntuaciones }));
+      }
       console.log("✅ Resultados guardados");
 
     } catch (error) {
@@ -6,6 +6,8 @@ const AuthContext = createContext();
 
 export const AuthProvider = ({ children }) => {
   const [user, setUser] = useState(null);
+  // Estado inicial de la sesión (/api/bootstrap/): cursos, recomendaciones y nivel de atención
+  const [bootstrap, setBootstrap] = useState(null);
   const [token, setToken] = useState(null);
   const [loading, setLoading] = useState(true);
   const [authError, setAuthError] = useState(null);
@@ -27,13 +29,14 @@ export const AuthProvider = ({ children }) => {
     setToken(storedToken);
 
     try {
-      // ✅ CORREGIDO: Agregado /api/
-      const res = await fetch(`${API_URL}/api/me/`, {
+      // Una sola petición trae el usuario y el resto del estado inicial
+      const res = await fetch(`${API_URL}/api/bootstrap/`, {
         headers: { Authorization: `Token ${storedToken}` },
       });
       if (res.ok) {
         const data = await res.json();
-        setUser(data);
+        setUser(data.user);
+        setBootstrap(data);
       } else {
         localStorage.removeItem('token');
         setToken(null);
@@ -66,6 +69,7 @@ export const AuthProvider = ({ children }) => {
 
         const userData = { email, ...data };
         setUser(userData);
+        cargarBootstrap(data.token);
 
         // Redirección
         if (data.rol === 'admin') router.push('/admin');
@@ -85,10 +89,30 @@ export const AuthProvider = ({ children }) => {
     }
   };
 
+  const cargarBootstrap = async (tokenActual) => {
+    try {
+      const res = await fetch(`${API_URL}/api/bootstrap/`, {
+        headers: { Authorization: `Token ${tokenActual}` },
+      });
+      if (res.ok) setBootstrap(await res.json());
+    } catch (error) {
+      console.error("Error cargando estado inicial:", error);
+    }
+  };
+
   const logout = () => {
+    // Invalida el token también en el servidor (sin esperar la respuesta)
+    const storedToken = localStorage.getItem('token');
+    if (storedToken) {
+      fetch(`${API_URL}/api/logout/`, {
+        method: 'POST',
+        headers: { Authorization: `Token ${storedToken}` },
+      }).catch(() => {});
+    }
     localStorage.removeItem('token');
     setToken(null);
     setUser(null);
+    setBootstrap(null);
     router.push('/');
   };
 
@@ -98,6 +122,7 @@ export const AuthProvider = ({ children }) => {
     <AuthContext.Provider value={{
       user,
       token,
+      bootstrap,
       loading,
       login,
       logout,
@@ -24,14 +24,13 @@ function DetalleEstudianteDocente() {
         // Nota: Si no tienes endpoint de detalle de usuario, esto podría requerir ajuste en backend.
         // Usaremos el filtro de resultados que ya tienes implementado.
 
-        const res = await fetch(`${API_URL}/api/resultados-d2r/`, {
+        const res = await fetch(`${API_URL}/api/resultados-d2r/?estudiante=${id}`, {
           headers: { 'Authorization': `Token ${token}` }
         });
-        const dataResultados = await resResultados.json();
+        const dataResultados = await res.json();
 
-        // Filtramos los resultados de ESTE estudiante
-        const historial = dataResultados.filter(r => String(r.estudiante) === String(id));
-        setResultados(historial);
+        // El backend ya filtra por estudiante; la lista viene paginada ({ results })
+        setResultados(dataResultados.results ?? []);
 
         // Simulamos nombre por ahora si no tenemos endpoint de detalle de usuario
         setEstudiante({ id: id, nombre: "Estudiante Detalle" });